@@ -0,0 +1,47 @@
+"""
+Encode and decode time of the installed JSON codecs on a large list response
+built from the recorded ``tests/data/api_recordsets_data.json`` payload.
+
+Run: ``python -m benchmarks.bench_codec``
+"""
+
+import json
+import os
+import timeit
+
+from feihua import codec
+from feihua.codec import get_codec
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECORDS = 10000
+NUMBER = 20
+
+
+def make_response(count):
+    with open(os.path.join(ROOT_DIR, "tests/data/api_recordsets_data.json")) as f:
+        recorded = json.load(f)["data_list_right"]
+    rows = recorded["recordsets"]
+    recordsets = []
+    for index in range(count):
+        row = dict(rows[index % len(rows)])
+        row["id"] = f"{index:032x}"
+        row["name"] = f"auto-{index}.example."
+        recordsets.append(row)
+    return {**recorded, "recordsets": recordsets, "metadata": {"total_count": count}}
+
+
+def main():
+    response = make_response(RECORDS)
+    names = ["json"] + [name for name in ("orjson", "ujson") if getattr(codec, name) is not None]
+    print(f"{RECORDS} recordsets, {len(json.dumps(response)) / 2 ** 20:.1f} MiB")
+    for name in names:
+        json_codec = get_codec(name)
+        body = json_codec.dumps(response)
+        assert json_codec.loads(body) == response
+        encode = min(timeit.repeat(lambda: json_codec.dumps(response), number=NUMBER, repeat=3)) / NUMBER
+        decode = min(timeit.repeat(lambda: json_codec.loads(body), number=NUMBER, repeat=3)) / NUMBER
+        print(f"{name:<8} encode {encode * 1000:>8.2f} ms  decode {decode * 1000:>8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Memory used by the recordsets of a 100k-record list response:
+the former deep copy with a ``__dict__`` object per record, fully materialized
+``__slots__`` recordsets and the lazy ``RecordsetList``.
+
+Run: ``python -m benchmarks.bench_recordset_memory``
+"""
+
+import asyncio
+import copy
+import gc
+import tracemalloc
+
+from feihua.recordset import Recordset, Recordsets
+
+RECORDS = 100000
+
+
+class DictRecordset:
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+
+def make_response(count):
+    zone_id = "75c475a8e48c88237727526be73e6458"
+    return {
+        "links": {"self": f"https://example.com/v2/zones/{zone_id}/recordsets"},
+        "recordsets": [
+            {
+                "id": f"{index:032x}",
+                "name": f"auto-{index}.example.",
+                "description": None,
+                "type": "A",
+                "ttl": 300,
+                "records": [f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}"],
+                "status": "ACTIVE",
+                "zone_id": zone_id,
+                "zone_name": "example.",
+                "create_at": "2020-10-14T17:31:47.106",
+                "update_at": "2020-11-25T07:12:32.489",
+                "default": False,
+                "project_id": "10f03cf77f209f79fc8fd002952821a7",
+                "links": {"self": f"https://example.com/v2/zones/{zone_id}/recordsets/{index:032x}"},
+            }
+            for index in range(count)
+        ],
+        "metadata": {"total_count": count},
+    }
+
+
+def measure(func, response):
+    gc.collect()
+    tracemalloc.start()
+    result = func(response)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size, peak
+
+
+def deepcopy_dict_objects(response):
+    response = copy.deepcopy(response)
+    response["recordsets"] = [DictRecordset(**record) for record in response["recordsets"]]
+    return response
+
+
+def slots_objects(response):
+    return {**response, "recordsets": [Recordset(**record) for record in response["recordsets"]]}
+
+
+def lazy_list(response):
+    return asyncio.run(Recordsets._return_list_objects(response, 200))
+
+
+def main():
+    response = make_response(RECORDS)
+    print(f"{RECORDS} recordsets, memory on top of the decoded response")
+    for name, func in (
+        ("deepcopy + __dict__", deepcopy_dict_objects),
+        ("__slots__ objects", slots_objects),
+        ("RecordsetList", lazy_list),
+    ):
+        size, peak = measure(func, response)
+        print(f"{name:<20} retained {size / 2 ** 20:>8.1f} MiB  peak {peak / 2 ** 20:>8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
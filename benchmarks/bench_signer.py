@@ -0,0 +1,58 @@
+"""
+Signed requests per second of the original signer (``benchmarks/_baseline_signer.py``, a copy of
+``feihua/signer.py`` before the reusable ``Signer``), of the current module level ``sign()`` function,
+which builds a new Signer for every request, and of a reused ``Signer`` given the URL as a string
+or as an already built ``yarl.URL``.
+
+Run: ``python -m benchmarks.bench_signer``
+"""
+
+import timeit
+
+from yarl import URL as _URL
+
+from benchmarks import _baseline_signer
+from feihua.signer import Signer, sign
+
+KEY = "EXAMPLE_ACCESS_KEY_ID"
+SECRET = "EXAMPLE_SECRET_ACCESS_KEY"
+URL = "https://dns.example.com/v2/zones/75c475a8e48c88237727526be73e6458/recordsets?limit=500&name=auto"
+HEADERS = {"Content-Type": "application/json", "X-Sdk-Date": "20200608T023900Z"}
+BODY = '{"name": "auto.example.", "type": "A", "records": ["10.200.200.1"]}'
+NUMBER = 20000
+
+
+def main():
+    signer = Signer(key=KEY, secret=SECRET)
+
+    def baseline():
+        return _baseline_signer.sign(key=KEY, secret=SECRET, method="POST", url=URL, headers=HEADERS, body=BODY)
+
+    def per_call():
+        return sign(key=KEY, secret=SECRET, method="POST", url=URL, headers=HEADERS, body=BODY)
+
+    def reused():
+        return signer.sign(method="POST", url=URL, headers=HEADERS, body=BODY)
+
+    url = _URL(URL)
+
+    def reused_url():
+        return signer.sign(method="POST", url=url, headers=HEADERS, body=BODY)
+
+    assert baseline() == reused(), "reused signer produces different headers than the original one"
+    assert per_call() == reused(), "reused signer produces different headers"
+    assert per_call() == reused_url(), "signing yarl.URL produces different headers"
+
+    cases = (
+        ("original sign()", baseline),
+        ("sign()", per_call),
+        ("Signer.sign()", reused),
+        ("Signer.sign(URL)", reused_url),
+    )
+    for name, func in cases:
+        seconds = min(timeit.repeat(func, number=NUMBER, repeat=5))
+        print(f"{name:<16} {NUMBER / seconds:>10.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Peak memory of decoding a list response page as a whole and with ``JsonArrayStream``
+for growing page sizes.
+
+Run: ``python -m benchmarks.bench_stream_memory``
+"""
+
+import json
+import tracemalloc
+
+from benchmarks.bench_recordset_memory import make_response
+from feihua.recordset import Recordset
+from feihua.stream import JsonArrayStream
+
+PAGE_SIZES = (1000, 10000, 50000)
+CHUNK_SIZE = 64 * 1024
+
+
+def whole(body):
+    response = json.loads(body)
+    for record in response["recordsets"]:
+        Recordset(**record)
+
+
+def streamed(body):
+    decoder = JsonArrayStream("recordsets")
+    for position in range(0, len(body), CHUNK_SIZE):
+        for record in decoder.feed(body[position : position + CHUNK_SIZE]):
+            Recordset(**record)
+    decoder.close()
+
+
+def peak(func, body):
+    tracemalloc.start()
+    func(body)
+    _, peak_size = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak_size
+
+
+def main():
+    print("peak memory on top of the body")
+    for page_size in PAGE_SIZES:
+        body = json.dumps(make_response(page_size)).encode("utf-8")
+        results = "  ".join(
+            f"{name} {peak(func, body) / 2 ** 20:>7.1f} MiB"
+            for name, func in (("whole", whole), ("streamed", streamed))
+        )
+        print(f"{page_size:>6} recordsets  {results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Micro-benchmarks of the hot paths with a regression check against stored baseline results.
+
+The payloads are built deterministically from the recorded ``tests/data/api_recordsets_data.json`` rows.
+Every case is stored as the ratio of its time to the time of the ``reference`` case, a fixed piece
+of pure Python work measured right before the case, so a baseline saved on one machine roughly holds on another.
+The ratios still shift between Python versions and CPUs, save a new baseline when they change.
+
+Run:
+ - ``python -m benchmarks.suite`` print the results
+ - ``python -m benchmarks.suite --save`` store the results as the baseline
+ - ``python -m benchmarks.suite --check --threshold 0.25`` fail when a case is slower than its baseline by more than 25%
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import time
+import timeit
+
+from benchmarks.bench_codec import make_response
+from feihua.recordset import Recordset, Recordsets
+from feihua.signer import Signer, _Request, parse_authorization
+from feihua.utils import parse_content_type, parse_result
+
+REFERENCE = "reference"
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SIZES = (10, 1000, 100000)
+MIN_TIME = 0.2
+REPEAT = 5
+REQUEST_URL = "https://dns.example.com/v2/zones/75c475a8e48c88237727526be73e6458/recordsets?limit=500&name=auto"
+BODY = '{"name": "auto.example.", "type": "A", "records": ["10.200.200.1"]}'
+
+
+class _Response:
+    def __init__(self, body: bytes):
+        self._body = body
+        self.headers = {"content-type": "application/json; charset=utf-8"}
+
+    async def read(self):
+        return self._body
+
+    async def json(self, **kwargs):
+        return json.loads(self._body)
+
+
+def _request():
+    return _Request(
+        method="POST",
+        url=REQUEST_URL,
+        headers={"Content-Type": "application/json", "X-Sdk-Date": "20200608T023900Z"},
+        body=BODY,
+    )
+
+
+def _received_request(headers):
+    """The request as the server verifying it sees it: only the signed headers"""
+    signed_headers = parse_authorization(headers["Authorization"]).signed_headers
+    headers = {name: value for name, value in headers.items() if name.lower() in signed_headers}
+    return _Request(method="POST", url=REQUEST_URL, headers=headers, body=BODY)
+
+
+def _sync_case(func):
+    def run(number):
+        return timeit.timeit(func, number=number)
+
+    return run
+
+
+def _async_case(coroutine_function):
+    def run(number):
+        async def loop():
+            started = time.perf_counter()
+            for _ in range(number):
+                await coroutine_function()
+            return time.perf_counter() - started
+
+        # same as timeit, which doesn't let the garbage collector run during the timing
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return asyncio.run(loop())
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    return run
+
+
+def _reference():
+    # interpreter bound work unrelated to feihua: loops, string formatting, dict and list operations
+    counts = {}
+    for index in range(200):
+        key = f"key-{index % 20}"
+        counts[key] = counts.get(key, 0) + index
+    return sorted(counts.items())
+
+
+def cases():
+    signer = Signer(key="EXAMPLE_ACCESS_KEY_ID", secret="EXAMPLE_SECRET_ACCESS_KEY")
+    request = _request()
+    signed_headers = signer._get_list_signed_headers(request)
+
+    yield "signer.signer", _sync_case(lambda: signer.signer(_request()))
+    yield "signer._get_canonical_request", _sync_case(lambda: signer._get_canonical_request(request, signed_headers))
+    sent = signer.sign("POST", REQUEST_URL, headers=request.headers, body=BODY)
+    yield "signer.verify", _sync_case(lambda: signer.verify(_received_request(sent), sent["Authorization"]))
+    yield "utils.parse_content_type", _sync_case(lambda: parse_content_type("application/json; charset=utf-8"))
+
+    for size in SIZES:
+        response = make_response(size)
+        body = json.dumps(response).encode("utf-8")
+        rows = response["recordsets"]
+        yield f"utils.parse_result[{size}]", _async_case(lambda body=body: parse_result(_Response(body)))
+        yield f"recordset._return_list_objects[{size}]", _async_case(
+            lambda response=response: Recordsets._return_list_objects(response, 200)
+        )
+        yield f"recordset.Recordset[{size}]", _sync_case(lambda rows=rows: [Recordset(**row) for row in rows])
+
+
+def measure(run) -> float:
+    """
+    Best seconds per call, the number of calls is chosen to take at least MIN_TIME.
+    """
+    number = 1
+    while True:
+        elapsed = run(number)
+        if elapsed >= MIN_TIME or number >= 1 << 20:
+            break
+        number *= 10 if elapsed < MIN_TIME / 10 else 2
+    return min([elapsed] + [run(number) for _ in range(REPEAT - 1)]) / number
+
+
+def check(results, baseline, threshold: float):
+    """
+    Cases slower than the baseline by more than ``threshold``, both as ratios to the reference case.
+    """
+    regressions = []
+    for name, ratio in results.items():
+        expected = baseline.get(name)
+        if expected is not None and ratio > expected * (1 + threshold):
+            regressions.append((name, expected, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--check", action="store_true", help="compare the results with the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, 0.25 is 25%%")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="path of the baseline file")
+    parser.add_argument("--filter", default="", help="run only the cases containing the substring")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    for name, run in cases():
+        if args.filter not in name:
+            continue
+        # measured next to every case, so a change of the machine load affects both alike
+        reference = measure(_sync_case(_reference))
+        seconds = measure(run)
+        results[name] = ratio = seconds / reference
+        expected = baseline.get(name)
+        change = "" if expected is None else f"{(ratio / expected - 1) * 100:>+7.1f}%"
+        print(f"{name:<42} {seconds * 1e6:>14.2f} us {ratio:>12.4f}x {change}")
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+    if args.check:
+        regressions = check(results, baseline, args.threshold)
+        for name, expected, ratio in regressions:
+            print(f"REGRESSION {name}: {expected:.4f}x -> {ratio:.4f}x of {REFERENCE}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
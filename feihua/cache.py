@@ -0,0 +1,109 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from feihua.recordset import Recordset, RecordsetList
+
+DEFAULT_CACHE_ZONES = 128
+DEFAULT_CACHE_TTL = 60.0
+
+__all__ = ("ZoneCache",)
+
+
+def _row(recordset) -> Dict:
+    return recordset.to_dict() if isinstance(recordset, Recordset) else dict(recordset)
+
+
+class _ZoneSnapshot:
+    __slots__ = ("response", "status", "recordsets", "expires_at")
+
+    def __init__(self, response: Dict, status: int, expires_at: float):
+        self.response = {key: value for key, value in response.items() if key != "recordsets"}
+        self.status = status
+        recordsets = response.get("recordsets") or []
+        # raw rows, every response builds its own Recordset objects like an uncached one
+        rows = recordsets.raw if isinstance(recordsets, RecordsetList) else recordsets
+        self.recordsets = OrderedDict((row["id"], row) for row in map(_row, rows))
+        self.expires_at = expires_at
+
+    def to_response(self) -> Dict:
+        return {**self.response, "recordsets": RecordsetList(list(self.recordsets.values()))}
+
+    def _adjust_total_count(self, delta: int):
+        metadata = self.response.get("metadata")
+        if metadata and "total_count" in metadata:
+            self.response["metadata"] = {**metadata, "total_count": metadata["total_count"] + delta}
+
+
+class ZoneCache:
+    """
+    In-process cache of ``Recordsets.list`` responses.
+    Zones expire after ``ttl`` seconds, the least recently used zone is evicted
+    when more than ``maxsize`` zones are cached.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_ZONES, ttl: Optional[float] = DEFAULT_CACHE_TTL):
+        if maxsize < 1:
+            raise ValueError("maxsize must be a positive number")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._zones: "OrderedDict[str, _ZoneSnapshot]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._zones)
+
+    def __contains__(self, zone_id: str):
+        return self._get_snapshot(zone_id) is not None
+
+    def get(self, zone_id: str) -> Optional[Tuple[Dict, int]]:
+        """
+        Return the cached list response and status of the zone or ``None``.
+        """
+        snapshot = self._get_snapshot(zone_id)
+        if snapshot is None:
+            return None
+        self._zones.move_to_end(zone_id)
+        return snapshot.to_response(), snapshot.status
+
+    def set(self, zone_id: str, response: Dict, status: int):
+        expires_at = float("inf") if self.ttl is None else time.monotonic() + self.ttl
+        self._zones[zone_id] = _ZoneSnapshot(response, status, expires_at)
+        self._zones.move_to_end(zone_id)
+        while len(self._zones) > self.maxsize:
+            self._zones.popitem(last=False)
+
+    def invalidate(self, zone_id: str):
+        self._zones.pop(zone_id, None)
+
+    def clear(self):
+        self._zones.clear()
+
+    def put_recordset(self, zone_id: str, recordset):
+        """
+        Insert or replace the recordset in the cached zone snapshot.
+        """
+        snapshot = self._get_snapshot(zone_id)
+        if snapshot is None:
+            return
+        if recordset.id not in snapshot.recordsets:
+            snapshot._adjust_total_count(1)
+        snapshot.recordsets[recordset.id] = recordset.to_dict()
+
+    def remove_recordset(self, zone_id: str, recordset_id: str):
+        """
+        Remove the recordset from the cached zone snapshot.
+        """
+        snapshot = self._get_snapshot(zone_id)
+        if snapshot is None:
+            return
+        if snapshot.recordsets.pop(recordset_id, None) is not None:
+            snapshot._adjust_total_count(-1)
+
+    def _get_snapshot(self, zone_id: str) -> Optional[_ZoneSnapshot]:
+        snapshot = self._zones.get(zone_id)
+        if snapshot is None:
+            return None
+        if snapshot.expires_at <= time.monotonic():
+            del self._zones[zone_id]
+            return None
+        return snapshot
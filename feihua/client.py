@@ -1,23 +1,42 @@
 import asyncio
-import json
+import copy
+import functools
 import logging
+import time
 from types import TracebackType
 from typing import Any, Dict, Optional, Type, Union
 
-from aiohttp import BaseConnector, ClientSession, TCPConnector
+from aiohttp import BaseConnector, ClientSession, ClientTimeout, TCPConnector
 from aiohttp.client_exceptions import ClientConnectionError
 from yarl import URL
 
+from .cache import ZoneCache
+from .codec import JsonCodec, get_codec
+from .concurrency import AdaptiveLimiter
 from .exceptions import ClientError
+from .metrics import MetricsCollector, operation_name
+from .ratelimit import RateLimiter
 from .recordset import Recordsets
-from .signer import sign
+from .retry import RetryPolicy
+from .signer import Signer
 from .utils import _AsyncCM, parse_result
+from .zone import Zones
 
 __all__ = ("Client",)
 
 log = logging.getLogger(__name__)
 
 
+def connector_stats(connector: BaseConnector) -> Dict[str, int]:
+    return {
+        "limit": getattr(connector, "limit", 0),
+        "limit_per_host": getattr(connector, "limit_per_host", 0),
+        "in_use": len(getattr(connector, "_acquired", ())),
+        "idle": sum(len(conns) for conns in getattr(connector, "_conns", {}).values()),
+        "waiting": sum(len(waiters) for waiters in getattr(connector, "_waiters", {}).values()),
+    }
+
+
 class Client:
     def __init__(
         self,
@@ -27,23 +46,69 @@ class Client:
         scheme: Optional[str] = "https",
         connector: Optional[BaseConnector] = None,
         session: Optional[ClientSession] = None,
+        zone_cache: Optional[ZoneCache] = None,
+        codec: Optional[Union[str, JsonCodec]] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        concurrency_limiter: Optional[AdaptiveLimiter] = None,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 15.0,
+        ttl_dns_cache: Optional[int] = 10,
+        coalesce_requests: bool = False,
+        metrics: Optional[MetricsCollector] = None,
+        port: Optional[int] = None,
+        close_session: bool = True,
     ) -> None:
+        """
+        ``limit``, ``limit_per_host``, ``keepalive_timeout`` and ``ttl_dns_cache`` configure
+        the connection pool of the connector created by the client, they are ignored
+        when ``connector`` or ``session`` is given.
+        With ``coalesce_requests`` concurrent identical GET requests are made only once.
+        ``metrics`` collects the timings of the requests, the network stages are traced only
+        when the session is created by the client, otherwise add ``metrics.trace_config()`` to it.
+        ``close()`` closes the session, a given one too unless ``close_session`` is False,
+        e.g. when the session is shared with other clients.
+        """
 
         self.access_key_id = access_key_id
         self.secret_access_key = secret_access_key
+        self.signer = Signer(key=access_key_id, secret=secret_access_key)
 
         self.scheme = scheme
         self.host = host
+        self.port = port
 
+        if connector is None and session is not None:
+            connector = session.connector
         if connector is None:
-            connector = TCPConnector(ssl=None)
+            connector = TCPConnector(
+                ssl=None,
+                limit=limit,
+                limit_per_host=limit_per_host,
+                keepalive_timeout=keepalive_timeout,
+                use_dns_cache=ttl_dns_cache is not None,
+                ttl_dns_cache=ttl_dns_cache,
+            )
         self.connector = connector
 
+        self.metrics = metrics
+        self.close_session = close_session
         if session is None:
-            session = ClientSession(connector=self.connector)
+            trace_configs = None if metrics is None else [metrics.trace_config()]
+            session = ClientSession(connector=self.connector, trace_configs=trace_configs)
         self.session = session
 
+        self.zone_cache = zone_cache
+        self.codec = get_codec(codec)
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.coalesce_requests = coalesce_requests
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
         self.recordsets = Recordsets(self)
+        self.zones = Zones(self)
 
     async def __aenter__(self) -> "Client":
         return self
@@ -57,12 +122,34 @@ class Client:
         await self.close()
 
     async def close(self) -> None:
-        await self.session.close()
+        if self.close_session:
+            await self.session.close()
+
+    async def warm_up(self, connections: int = 1) -> int:
+        """
+        Open ``connections`` connections to the host, TLS handshakes included, before the traffic starts.
+        The connections are opened by concurrent unsigned HEAD requests and stay in the pool.
+        Returns the number of connections opened successfully.
+        """
+        url = URL.build(scheme=self.scheme, host=self.host, port=self.port, path="/")
+
+        async def _open():
+            async with self.session.head(url, allow_redirects=False) as response:
+                await response.read()
+
+        results = await asyncio.gather(*(_open() for _ in range(connections)), return_exceptions=True)
+        return sum(1 for result in results if not isinstance(result, BaseException))
+
+    def pool_stats(self) -> Dict[str, int]:
+        """
+        Connections of the pool: ``in_use`` by requests, ``idle`` kept alive and ``waiting`` requests for a free one.
+        """
+        return connector_stats(self.connector)
 
     def _canonicalize_url(self, api_version: Union[str, URL], path: Union[str, URL], query: Union[str, Dict]) -> URL:
         if query is None:
             query = ""
-        return URL.build(scheme=self.scheme, host=self.host, path=f"{api_version}{path}", query=query)
+        return URL.build(scheme=self.scheme, host=self.host, port=self.port, path=f"{api_version}{path}", query=query)
 
     async def _query_json(
         self,
@@ -84,9 +171,9 @@ class Client:
         headers["Content-Type"] = "application/json"
 
         if data is not None and not isinstance(data, (str, bytes)):
-            data = json.dumps(data)
+            data = self.codec.dumps(data)
 
-        async with self._query(
+        query_kwargs = dict(
             api_version=api_version,
             path=path,
             query=query,
@@ -95,8 +182,36 @@ class Client:
             headers=headers,
             timeout=timeout,
             read_until_eof=read_until_eof,
-        ) as response:
-            data = await parse_result(response)
+        )
+        if not self.coalesce_requests or method != "GET" or data is not None:
+            return await self._read_json(query_kwargs)
+
+        # identical GETs in flight share one request, every caller gets its own copy of the result
+        key = str(self._canonicalize_url(api_version, path, query))
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._read_json(query_kwargs))
+            self._in_flight[key] = task
+            task.add_done_callback(functools.partial(self._forget_in_flight, key))
+        # shielded, so cancelling one of the callers doesn't cancel the request for the others
+        data, status = await asyncio.shield(task)
+        return copy.deepcopy(data), status
+
+    def _forget_in_flight(self, key: str, task: asyncio.Future):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # retrieve the exception in case all the callers are gone
+            task.exception()
+
+    async def _read_json(self, query_kwargs: Dict):
+        async with self._query(**query_kwargs) as response:
+            started = time.monotonic()
+            data = await parse_result(response, loads=self.codec.loads)
+            if self.metrics is not None:
+                url = self._canonicalize_url(query_kwargs["api_version"], query_kwargs["path"], query_kwargs["query"])
+                operation = operation_name(query_kwargs["method"], url)
+                self.metrics.observe(operation, "decode", time.monotonic() - started)
             return data, response.status
 
     def _query(
@@ -146,14 +261,93 @@ class Client:
 
         url = self._canonicalize_url(api_version, path, query)
 
-        sign_handlers = sign(
-            key=self.access_key_id,
-            secret=self.secret_access_key,
+        retry_policy = self.retry_policy
+        if retry_policy is None or not retry_policy.is_retryable_method(method):
+            return await self._do_request(url, method, data, headers, timeout, chunked, read_until_eof)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        attempt = 0
+        while True:
+            attempt_timeout = timeout
+            if attempt_timeout is None and retry_policy.deadline is not None:
+                remaining = retry_policy.deadline - (loop.time() - started)
+                if remaining <= 0:
+                    # e.g. the backoff sleep overshot, ClientTimeout(total=0) would disable the timeout
+                    raise asyncio.TimeoutError()
+                attempt_timeout = ClientTimeout(total=remaining)
+            try:
+                # every attempt is signed again to get a fresh X-Sdk-Date
+                return await self._do_request(url, method, data, headers, attempt_timeout, chunked, read_until_eof)
+            except ClientError as exc:
+                attempt += 1
+                delay = retry_policy.get_delay(attempt, exc, elapsed=loop.time() - started)
+                if delay is None:
+                    raise
+                log.debug("Retry %s %s in %.3fs after %s", method, url, delay, exc)
+                await asyncio.sleep(delay)
+
+    async def _do_request(self, url: URL, method: str, data, headers, timeout, chunked, read_until_eof: bool):
+        if self.metrics is None:
+            return await self._send_request(url, method, data, headers, timeout, chunked, read_until_eof)
+
+        operation = operation_name(method, url)
+        started = time.monotonic()
+        try:
+            response = await self._send_request(
+                url, method, data, headers, timeout, chunked, read_until_eof, operation=operation
+            )
+        except ClientError as exc:
+            self.metrics.count_error(operation, exc.status)
+            raise
+        except asyncio.TimeoutError:
+            self.metrics.count_error(operation, "timeout")
+            raise
+        self.metrics.observe(operation, "total", time.monotonic() - started)
+        return response
+
+    async def _send_request(
+        self, url: URL, method: str, data, headers, timeout, chunked, read_until_eof: bool, operation: str = None
+    ):
+        if self.rate_limiter is not None:
+            # wait before signing so the request doesn't go out with a stale date
+            await self.rate_limiter.acquire(method)
+        if self.concurrency_limiter is None:
+            response = await self._sign_and_request(
+                url, method, data, headers, timeout, chunked, read_until_eof, operation
+            )
+        else:
+            # a slot per attempt: backoff sleeps and rate limiter waits are neither held nor counted as latency,
+            # and every throttled attempt reaches the limiter, retried or not
+            async with self.concurrency_limiter.slot() as slot:
+                response = await self._sign_and_request(
+                    url, method, data, headers, timeout, chunked, read_until_eof, operation
+                )
+                slot.status = response.status
+        if 400 <= response.status < 600:
+            what = await response.read()
+            content_type = response.headers.get("content-type", "")
+            response.close()
+            if content_type == "application/json":
+                raise ClientError(response.status, self.codec.loads(what), headers=response.headers)
+            else:
+                raise ClientError(response.status, {"message": what.decode("utf8")}, headers=response.headers)
+        return response
+
+    async def _sign_and_request(
+        self, url: URL, method: str, data, headers, timeout, chunked, read_until_eof: bool, operation: Optional[str]
+    ):
+        started = time.monotonic()
+        sign_handlers = self.signer.sign(
             method=method,
             headers=headers,
             url=url,
             body=data,
         )
+        trace_request_ctx = None
+        if operation is not None:
+            self.metrics.observe(operation, "sign", time.monotonic() - started)
+            trace_request_ctx = self.metrics.request_context(operation)
         try:
             response = await self.session.request(
                 method=method,
@@ -163,6 +357,7 @@ class Client:
                 timeout=timeout,
                 chunked=chunked,
                 read_until_eof=read_until_eof,
+                trace_request_ctx=trace_request_ctx,
             )
         except asyncio.TimeoutError:
             raise
@@ -171,12 +366,4 @@ class Client:
                 503,
                 {"message": f"Cannot connect to Huawei Cloud at {url} [{exc}]"},
             )
-        if 400 <= response.status < 600:
-            what = await response.read()
-            content_type = response.headers.get("content-type", "")
-            response.close()
-            if content_type == "application/json":
-                raise ClientError(response.status, json.loads(what.decode("utf8")))
-            else:
-                raise ClientError(response.status, {"message": what.decode("utf8")})
         return response
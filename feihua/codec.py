@@ -0,0 +1,94 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+__all__ = ("JsonCodec", "StdlibJsonCodec", "OrjsonCodec", "UjsonCodec", "get_codec")
+
+
+class JsonCodec(ABC):
+    """
+    Serializes request bodies straight to bytes and decodes response bodies.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        """Encode the object to JSON bytes"""
+
+    @abstractmethod
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decode a JSON document"""
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class StdlibJsonCodec(JsonCodec):
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise RuntimeError("orjson is not installed")
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+
+class UjsonCodec(JsonCodec):
+    name = "ujson"
+
+    def __init__(self):
+        if ujson is None:
+            raise RuntimeError("ujson is not installed")
+
+    def dumps(self, obj: Any) -> bytes:
+        return ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return ujson.loads(data)
+
+
+CODECS = {codec.name: codec for codec in (StdlibJsonCodec, OrjsonCodec, UjsonCodec)}
+
+
+def get_codec(codec: Optional[Union[str, JsonCodec]] = None) -> JsonCodec:
+    """
+    Return the codec instance by name, the codec itself or the fastest installed one
+    (orjson, then ujson, then the standard library) when ``codec`` is ``None``.
+    """
+    if isinstance(codec, JsonCodec):
+        return codec
+    if codec is None:
+        if orjson is not None:
+            return OrjsonCodec()
+        if ujson is not None:
+            return UjsonCodec()
+        return StdlibJsonCodec()
+    try:
+        return CODECS[codec]()
+    except KeyError:
+        raise ValueError(f"Unknown JSON codec: {codec!r}")
@@ -0,0 +1,143 @@
+import asyncio
+import time
+from collections import deque
+from typing import Iterable, Optional
+
+from feihua.exceptions import ClientError
+
+THROTTLE_STATUSES = (429, 503)
+
+__all__ = ("AdaptiveLimiter",)
+
+
+class _Slot:
+    __slots__ = ("_limiter", "_started", "status")
+
+    def __init__(self, limiter: "AdaptiveLimiter"):
+        self._limiter = limiter
+        self._started = None
+        #: HTTP status of the request made in the slot
+        self.status = None
+
+    async def __aenter__(self):
+        self._started = await self._limiter._acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        status = self.status
+        if isinstance(exc_val, ClientError):
+            status = exc_val.status
+        elif isinstance(exc_val, asyncio.TimeoutError):
+            status = 503
+        elif exc_val is not None:
+            status = None
+        self._limiter._release(self._started, status)
+
+
+class AdaptiveLimiter:
+    """
+    Additive increase / multiplicative decrease limit of the requests in flight.
+    Every successful request grows the limit by ``1 / limit`` (about one per window of requests),
+    a throttled (429/503) or timed out request or p95 latency rising above ``latency_tolerance``
+    times the lowest p95 seen since the last latency cut cuts it by ``backoff_ratio``.
+    The limit is cut at most once per window: only requests started after the last cut can cut it again.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: float = 2.0,
+        latency_samples: int = 100,
+        throttle_statuses: Iterable[int] = THROTTLE_STATUSES,
+    ):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        if not 0 < backoff_ratio < 1:
+            raise ValueError("backoff_ratio must be between 0 and 1")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.throttle_statuses = frozenset(throttle_statuses)
+        #: Number of requests in flight
+        self.in_flight = 0
+        self._limit = float(initial_limit)
+        self._latencies = deque(maxlen=latency_samples)
+        self._baseline: Optional[float] = None
+        self._decreased_at = float("-inf")
+        self._waiters = deque()
+
+    @property
+    def limit(self) -> int:
+        """
+        Current number of requests allowed in flight.
+        """
+        return int(self._limit)
+
+    @property
+    def p95(self) -> Optional[float]:
+        """
+        95th percentile of the latencies of the recent successful requests.
+        """
+        if len(self._latencies) < self._latencies.maxlen // 5 or not self._latencies:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[int(len(latencies) * 0.95) - 1]
+
+    def slot(self) -> _Slot:
+        """
+        Async context manager holding one of the slots while the request is made.
+        Set ``status`` of the slot to report the status of the successful response.
+        """
+        return _Slot(self)
+
+    async def _acquire(self) -> float:
+        while self.in_flight >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                self._wake_up()
+                raise
+        self.in_flight += 1
+        return time.monotonic()
+
+    def _release(self, started: float, status: Optional[int]):
+        self.in_flight -= 1
+        if status in self.throttle_statuses:
+            self._decrease(started)
+        elif status is not None and status < 400:
+            self._latencies.append(time.monotonic() - started)
+            p95 = self.p95
+            if p95 is not None:
+                if self._baseline is None or p95 < self._baseline:
+                    self._baseline = p95
+                elif p95 > self._baseline * self.latency_tolerance:
+                    # the latency after the cut becomes the new baseline
+                    self._decrease(started)
+                    self._baseline = None
+                    self._wake_up()
+                    return
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+        self._wake_up()
+
+    def _decrease(self, started: float):
+        if started < self._decreased_at:
+            return
+        self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+        self._decreased_at = time.monotonic()
+        self._latencies.clear()
+
+    def _wake_up(self):
+        free = self.limit - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
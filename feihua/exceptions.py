@@ -1,8 +1,10 @@
 class ClientError(Exception):
-    def __init__(self, status, data, *args):
+    def __init__(self, status, data, *args, headers=None):
         super().__init__(status, data, *args)
         self.status = status
         self.message = data["message"]
+        # headers of the failed response, e.g. to honour Retry-After
+        self.headers = headers
 
     def __str__(self):
         return f"ClientError({self.status}, {self.message!r})"
@@ -0,0 +1,249 @@
+"""
+Local stand-in of the Huawei Cloud DNS zones and recordsets API for load and integration testing.
+
+    app = make_app(credentials={"key": "secret"}, zones={"zone-id": "example.com."})
+    web.run_app(app, port=8080)
+
+It checks SDK-HMAC-SHA256 signatures, lists and gets zones, supports listing recordsets with pagination and filters,
+creating, updating and deleting recordsets, and can inject latency, 429 and 5xx responses.
+"""
+
+import asyncio
+import random
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from aiohttp import web
+from yarl import URL
+
+from feihua.middleware import SignatureVerifier
+
+__all__ = ("FaultInjection", "add_recordset", "make_app")
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 500
+
+
+class FaultInjection:
+    """
+    Faults of the stand-in: ``latency`` seconds (plus up to ``jitter`` seconds) before every response,
+    ``throttle_rate`` share of 429 responses with ``Retry-After`` and ``error_rate`` share of 500/503 responses.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        throttle_rate: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: int = 1,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+
+
+def _error(status: int, message: str, headers: Dict = None) -> web.Response:
+    return web.json_response({"code": f"DNS.{status}", "message": message}, status=status, headers=headers)
+
+
+@web.middleware
+async def _faults_middleware(request: web.Request, handler):
+    faults: FaultInjection = request.app["faults"]
+    delay = faults.latency + (faults.random.uniform(0, faults.jitter) if faults.jitter else 0)
+    if delay:
+        await asyncio.sleep(delay)
+    chance = faults.random.random()
+    if chance < faults.throttle_rate:
+        return _error(429, "Too many requests.", headers={"Retry-After": str(faults.retry_after)})
+    if chance < faults.throttle_rate + faults.error_rate:
+        return _error(faults.random.choice((500, 503)), "Internal error.")
+    return await handler(request)
+
+
+def _zone(request: web.Request):
+    zone_id = request.match_info["zone_id"]
+    zone = request.app["zones"].get(zone_id)
+    if zone is None:
+        raise web.HTTPNotFound(
+            text='{"code": "DNS.0101", "message": "This zone does not exist."}', content_type="application/json"
+        )
+    return zone_id, zone
+
+
+def add_recordset(
+    app: web.Application, zone_id: str, data: Dict, status: str = "ACTIVE", base_url: Optional[URL] = None
+) -> Dict:
+    """
+    Store a new recordset of the ``data`` attributes in the zone without validation, e.g. to seed the stand-in.
+    """
+    zone = app["zones"][zone_id]
+    recordset_id = uuid.uuid4().hex
+    path = f"/v2/zones/{zone_id}/recordsets/{recordset_id}"
+    recordset = {
+        "id": recordset_id,
+        "name": data["name"],
+        "description": data.get("description"),
+        "type": data.get("type"),
+        "ttl": data.get("ttl", 300),
+        "records": data.get("records", []),
+        "status": status,
+        "zone_id": zone_id,
+        "zone_name": zone["name"],
+        "create_at": _now(),
+        "update_at": None,
+        "default": data.get("default", False),
+        "project_id": app["project_id"],
+        "links": {"self": path if base_url is None else str(base_url.with_path(path).with_query(None))},
+    }
+    zone["recordsets"][recordset_id] = recordset
+    return recordset
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat(timespec="milliseconds")
+
+
+def _paginate(request: web.Request, items: List[Dict], key: str) -> web.Response:
+    query = request.query
+    try:
+        limit = min(int(query.get("limit", DEFAULT_LIMIT)), MAX_LIMIT)
+        offset = int(query.get("offset", 0))
+    except ValueError:
+        return _error(400, "Parameter 'limit' or 'offset' is invalid.")
+    start = offset
+    marker = query.get("marker")
+    if marker:
+        start = next((index + 1 for index, item in enumerate(items) if item["id"] == marker), 0)
+    page = items[start : start + limit]
+
+    links = {"self": str(request.url)}
+    if start + limit < len(items) and page:
+        next_query = {**query, "limit": str(limit), "marker": page[-1]["id"]}
+        next_query.pop("offset", None)
+        links["next"] = str(request.url.with_query(next_query))
+    return web.json_response({"links": links, key: page, "metadata": {"total_count": len(items)}})
+
+
+def _zone_body(request: web.Request, zone_id: str, zone: Dict) -> Dict:
+    return {
+        "id": zone_id,
+        "name": zone["name"],
+        "zone_type": "public",
+        "ttl": 300,
+        "status": "ACTIVE",
+        "record_num": len(zone["recordsets"]),
+        "project_id": request.app["project_id"],
+        "links": {"self": str(request.url.with_path(f"/v2/zones/{zone_id}").with_query(None))},
+    }
+
+
+async def _list_zones(request: web.Request):
+    name = request.query.get("name")
+    exact = request.query.get("search_mode") == "equal"
+    zones = [
+        _zone_body(request, zone_id, zone)
+        for zone_id, zone in request.app["zones"].items()
+        if name is None or (zone["name"] == name if exact else name in zone["name"])
+    ]
+    return _paginate(request, zones, "zones")
+
+
+async def _get_zone(request: web.Request):
+    zone_id, zone = _zone(request)
+    return web.json_response(_zone_body(request, zone_id, zone))
+
+
+async def _list_recordsets(request: web.Request):
+    zone_id, zone = _zone(request)
+    query = request.query
+    name = query.get("name")
+    exact = query.get("search_mode") == "equal"
+    records = []
+    for recordset in zone["recordsets"].values():
+        if "id" in query and recordset["id"] != query["id"]:
+            continue
+        if "type" in query and recordset["type"] != query["type"]:
+            continue
+        if "status" in query and recordset["status"] != query["status"]:
+            continue
+        if name is not None and not (recordset["name"] == name if exact else name in recordset["name"]):
+            continue
+        records.append(recordset)
+
+    return _paginate(request, records, "recordsets")
+
+
+async def _create_recordset(request: web.Request):
+    zone_id, zone = _zone(request)
+    data = await request.json()
+    name = data.get("name") or ""
+    if not name:
+        return _error(400, "Attribute 'name' is invalid, record set name should be non-empty.")
+    if not name.endswith(zone["name"]):
+        return _error(400, "Attribute 'name' is invalid, record set name must be ended with this zone name.")
+    for recordset in zone["recordsets"].values():
+        if recordset["name"] == name and recordset["type"] == data.get("type"):
+            return _error(400, f"Attribute 'name' conflicts with Record Set '{name}' type '{recordset['type']}'.")
+
+    recordset = add_recordset(request.app, zone_id, data, status="PENDING_CREATE", base_url=request.url)
+    return web.json_response(recordset, status=202)
+
+
+async def _update_recordset(request: web.Request):
+    zone_id, zone = _zone(request)
+    recordset = zone["recordsets"].get(request.match_info["recordset_id"])
+    if recordset is None:
+        return _error(404, "This record set does not exist.")
+    data = await request.json()
+    if "name" in data:
+        return _error(400, "Attribute 'name' is immutable.")
+    for key in ("description", "ttl", "records"):
+        if key in data:
+            recordset[key] = data[key]
+    recordset["status"] = "PENDING_UPDATE"
+    recordset["update_at"] = _now()
+    return web.json_response(recordset, status=202)
+
+
+async def _delete_recordset(request: web.Request):
+    zone_id, zone = _zone(request)
+    recordset = zone["recordsets"].pop(request.match_info["recordset_id"], None)
+    if recordset is None:
+        return _error(404, "This record set does not exist.")
+    return web.json_response({**recordset, "status": "PENDING_DELETE"}, status=202)
+
+
+def make_app(
+    credentials: Dict[str, str],
+    zones: Optional[Dict[str, str]] = None,
+    faults: Optional[FaultInjection] = None,
+    project_id: str = "10f03cf77f209f79fc8fd002952821a7",
+) -> web.Application:
+    """
+    Build the stand-in application.
+    ``credentials`` maps access keys to secrets, ``zones`` maps zone ids to zone names.
+    The state is kept in ``app["zones"]``: zone id to ``{"name": ..., "recordsets": {id: recordset}}``.
+    """
+    # clients repeat identical requests within a second, so replays are not rejected
+    credentials = dict(credentials)
+    verifier = SignatureVerifier(credentials, replay_cache_size=0)
+    app = web.Application(middlewares=[_faults_middleware, verifier.middleware()])
+    app["credentials"] = credentials
+    app["faults"] = faults or FaultInjection()
+    app["project_id"] = project_id
+    app["zones"] = {zone_id: {"name": name, "recordsets": OrderedDict()} for zone_id, name in (zones or {}).items()}
+    app.router.add_get("/v2/zones", _list_zones)
+    app.router.add_get("/v2/zones/{zone_id}", _get_zone)
+    base = "/v2/zones/{zone_id}/recordsets"
+    app.router.add_get(base, _list_recordsets)
+    app.router.add_post(base, _create_recordset)
+    app.router.add_put(base + "/{recordset_id}", _update_recordset)
+    app.router.add_delete(base + "/{recordset_id}", _delete_recordset)
+    return app
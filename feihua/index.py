@@ -0,0 +1,130 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from feihua.recordset import Recordset
+
+__all__ = ("RecordsetIndex",)
+
+
+class RecordsetIndex:
+    """
+    In-memory index of recordsets with hash lookups by id, by (name, type) and by name.
+    Names are compared case-insensitively.
+    """
+
+    def __init__(self, recordsets: Iterable[Recordset] = ()):
+        self._by_id: Dict[str, Recordset] = {}
+        self._by_name_type: Dict[Tuple[str, str], Dict[str, Recordset]] = {}
+        self._by_name: Dict[str, Dict[str, Recordset]] = {}
+        for recordset in recordsets:
+            self.add(recordset)
+
+    @classmethod
+    def from_response(cls, response: Dict) -> "RecordsetIndex":
+        """
+        Build the index from the response of ``Recordsets.list`` or ``Recordsets.find_records``.
+        """
+        recordsets = response.get("recordsets") or []
+        return cls(
+            recordset if isinstance(recordset, Recordset) else Recordset(**recordset) for recordset in recordsets
+        )
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[Recordset]:
+        return iter(self._by_id.values())
+
+    def __contains__(self, recordset_id: str):
+        return recordset_id in self._by_id
+
+    def add(self, recordset: Recordset):
+        """
+        Add the recordset to the index or replace the one with the same id.
+        """
+        if recordset.id in self._by_id:
+            self.remove(recordset.id)
+        name = recordset.name.lower()
+        self._by_id[recordset.id] = recordset
+        self._by_name_type.setdefault((name, recordset.type), {})[recordset.id] = recordset
+        self._by_name.setdefault(name, {})[recordset.id] = recordset
+
+    def remove(self, recordset: Union[Recordset, str]) -> Optional[Recordset]:
+        """
+        Remove the recordset or the recordset with the given id from the index.
+        """
+        recordset_id = recordset.id if isinstance(recordset, Recordset) else recordset
+        recordset = self._by_id.pop(recordset_id, None)
+        if recordset is None:
+            return None
+        name = recordset.name.lower()
+        self._discard(self._by_name_type, (name, recordset.type), recordset_id)
+        self._discard(self._by_name, name, recordset_id)
+        return recordset
+
+    def get(self, recordset_id: str) -> Optional[Recordset]:
+        return self._by_id.get(recordset_id)
+
+    def lookup(self, name: str, type: str) -> List[Recordset]:
+        return list(self._by_name_type.get((name.lower(), type), {}).values())
+
+    def by_name(self, name: str) -> List[Recordset]:
+        return list(self._by_name.get(name.lower(), {}).values())
+
+    def find(self, query: Optional[Dict] = None) -> List[Recordset]:
+        """
+        Run the query of ``Recordsets.find_records`` against the index.
+        Supported parameters are ``id``, ``name``, ``type``, ``status``, ``search_mode``
+        (``like`` by default or ``equal``), ``marker``, ``offset`` and ``limit``.
+        """
+        query = query or {}
+        recordset_id = query.get("id")
+        name = query.get("name")
+        type = query.get("type")
+        status = query.get("status")
+        exact_name = query.get("search_mode", "like") == "equal"
+
+        if recordset_id is not None:
+            candidates = [self._by_id[recordset_id]] if recordset_id in self._by_id else []
+        elif name is not None and exact_name and type is not None:
+            candidates = self.lookup(name, type)
+        elif name is not None and exact_name:
+            candidates = self.by_name(name)
+        else:
+            candidates = self._by_id.values()
+
+        result = []
+        for recordset in candidates:
+            if name is not None and not self._match_name(recordset.name, name, exact_name):
+                continue
+            if type is not None and recordset.type != type:
+                continue
+            if status is not None and recordset.status != status:
+                continue
+            result.append(recordset)
+
+        marker = query.get("marker")
+        if marker:
+            for position, recordset in enumerate(result):
+                if recordset.id == marker:
+                    result = result[position + 1 :]
+                    break
+        offset = int(query.get("offset", 0))
+        limit = query.get("limit")
+        if limit is None:
+            return result[offset:]
+        return result[offset : offset + int(limit)]
+
+    @staticmethod
+    def _match_name(recordset_name: str, name: str, exact: bool) -> bool:
+        if exact:
+            return recordset_name.lower() == name.lower()
+        return name.lower() in recordset_name.lower()
+
+    @staticmethod
+    def _discard(index: Dict, key, recordset_id: str):
+        bucket = index.get(key)
+        if bucket is None:
+            return
+        bucket.pop(recordset_id, None)
+        if not bucket:
+            del index[key]
@@ -0,0 +1,215 @@
+"""
+Load generator driving ``Client`` at a target request rate.
+
+The requests are started on an open-loop schedule, so a slow server doesn't lower the offered load,
+and the latency is counted from the scheduled start, including the time waiting for a free slot.
+
+Run against the local stand-in server with injected faults:
+
+    python -m feihua.loadtest --serve --rate 200 --duration 10 --latency 0.02 --throttle-rate 0.01
+
+or against a real endpoint:
+
+    python -m feihua.loadtest --host dns.example.com --zone ZONE_ID --key KEY --secret SECRET --rate 20
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+from feihua.client import Client
+from feihua.exceptions import ClientError
+from feihua.fake_server import FaultInjection, add_recordset, make_app
+from feihua.retry import RetryPolicy
+
+__all__ = ("LoadReport", "run_load", "percentile")
+
+OPERATIONS = ("list", "find", "create")
+
+
+def percentile(values: List[float], percent: float) -> Optional[float]:
+    """
+    Nearest-rank percentile of the values, None when there are no values.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(int(len(ordered) * percent / 100 + 0.5), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class LoadReport:
+    """Result of ``run_load``"""
+
+    def __init__(self, elapsed: float, latencies: List[float], errors: Dict[str, int]):
+        #: Seconds from the first scheduled request until the last one finished
+        self.elapsed = elapsed
+        #: Seconds of the successful requests
+        self.latencies = latencies
+        #: Number of the failed requests by status or exception name
+        self.errors = errors
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies) + sum(self.errors.values())
+
+    @property
+    def throughput(self) -> float:
+        """Successful requests per second"""
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        lines = [
+            f"requests:   {self.requests} in {self.elapsed:.2f} s",
+            f"throughput: {self.throughput:.1f} req/s",
+        ]
+        for percent in (50, 95, 99):
+            value = percentile(self.latencies, percent)
+            lines.append(f"p{percent}:        " + ("-" if value is None else f"{value * 1000:.1f} ms"))
+        for error, count in sorted(self.errors.items()):
+            lines.append(f"errors {error}: {count}")
+        return "\n".join(lines)
+
+
+async def _request(client: Client, operation: str, zone_id: str, zone_name: str):
+    if operation == "list":
+        await client.recordsets.list(zone_id)
+    elif operation == "find":
+        await client.recordsets.find_records(zone_id, {"type": "A", "limit": 10})
+    elif operation == "create":
+        name = f"load-{uuid.uuid4().hex[:16]}.{zone_name}"
+        await client.recordsets.create_record(zone_id, {"name": name, "type": "A", "records": ["192.0.2.1"]})
+    else:
+        raise ValueError(f"Unknown operation {operation!r}")
+
+
+async def run_load(
+    client: Client,
+    zone_id: str,
+    rate: float,
+    duration: float,
+    concurrency: int = 100,
+    operation: str = "list",
+    zone_name: str = "",
+) -> LoadReport:
+    """
+    Start ``rate`` requests per second for ``duration`` seconds, at most ``concurrency`` at once.
+    """
+    if operation not in OPERATIONS:
+        raise ValueError(f"Unknown operation {operation!r}, expected one of {', '.join(OPERATIONS)}")
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(scheduled: float):
+        async with semaphore:
+            try:
+                await _request(client, operation, zone_id, zone_name)
+            except ClientError as e:
+                errors[str(e.status)] = errors.get(str(e.status), 0) + 1
+            except Exception as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            else:
+                latencies.append(time.monotonic() - scheduled)
+
+    total = int(rate * duration)
+    started = time.monotonic()
+    tasks = []
+    for index in range(total):
+        scheduled = started + index / rate
+        delay = scheduled - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(one(scheduled)))
+    await asyncio.gather(*tasks)
+    return LoadReport(time.monotonic() - started, latencies, errors)
+
+
+def _seed(app: web.Application, zone_id: str, count: int):
+    zone_name = app["zones"][zone_id]["name"]
+    for index in range(count):
+        data = {"name": f"host-{index}.{zone_name}", "type": "A", "records": [f"192.0.2.{index % 254 + 1}"]}
+        add_recordset(app, zone_id, data)
+
+
+async def main_async(args) -> LoadReport:
+    runner = None
+    host, port, scheme, zone_id = args.host, args.port, args.scheme, args.zone
+    if args.serve:
+        app = make_app(
+            credentials={args.key: args.secret},
+            zones={zone_id: args.zone_name},
+            faults=FaultInjection(
+                latency=args.latency,
+                jitter=args.jitter,
+                throttle_rate=args.throttle_rate,
+                error_rate=args.error_rate,
+                seed=args.seed,
+            ),
+        )
+        _seed(app, zone_id, args.records)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, args.host, args.port)
+        await site.start()
+        port = runner.addresses[0][1]
+        scheme = "http"
+
+    retry_policy = RetryPolicy(attempts=args.attempts) if args.attempts > 1 else None
+    try:
+        async with Client(
+            args.key, args.secret, host=host, port=port, scheme=scheme, retry_policy=retry_policy
+        ) as client:
+            return await run_load(
+                client,
+                zone_id,
+                rate=args.rate,
+                duration=args.duration,
+                concurrency=args.concurrency,
+                operation=args.operation,
+                zone_name=args.zone_name,
+            )
+    finally:
+        if runner is not None:
+            await runner.cleanup()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="with --serve 0 picks a free port")
+    parser.add_argument("--scheme", default="https")
+    parser.add_argument("--zone", default="2c9eb155587194ec01587224c9f90149", help="zone id")
+    parser.add_argument("--zone-name", default="example.com.", help="zone name, used by the create operation")
+    parser.add_argument("--key", default="EXAMPLE_ACCESS_KEY_ID")
+    parser.add_argument("--secret", default="EXAMPLE_SECRET_ACCESS_KEY")
+    parser.add_argument("--operation", choices=OPERATIONS, default="list")
+    parser.add_argument("--rate", type=float, default=50.0, help="requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--concurrency", type=int, default=100, help="maximum requests in flight")
+    parser.add_argument("--attempts", type=int, default=1, help="attempts of a request, more than 1 retries")
+
+    serve = parser.add_argument_group("local stand-in server")
+    serve.add_argument("--serve", action="store_true", help="start the stand-in server in the process")
+    serve.add_argument("--records", type=int, default=100, help="recordsets created in the zone")
+    serve.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    serve.add_argument("--jitter", type=float, default=0.0, help="up to seconds added randomly")
+    serve.add_argument("--throttle-rate", type=float, default=0.0, help="share of 429 responses")
+    serve.add_argument("--error-rate", type=float, default=0.0, help="share of 5xx responses")
+    serve.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    if args.serve and args.port is None:
+        args.port = 0
+
+    report = asyncio.run(main_async(args))
+    print(report)
+    return 0 if not report.errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
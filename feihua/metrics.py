@@ -0,0 +1,183 @@
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from aiohttp import TraceConfig
+from yarl import URL
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# query parameters which only paginate the listing
+PAGINATION_PARAMETERS = frozenset(("limit", "marker", "offset"))
+
+__all__ = (
+    "Histogram",
+    "MetricsCollector",
+    "MetricsExporter",
+    "InMemoryExporter",
+    "PrometheusTextExporter",
+    "operation_name",
+)
+
+
+def operation_name(method: str, url: Union[str, URL]) -> str:
+    """
+    Name of the API operation of the request: ``list``, ``find``, ``create``, ``update`` or ``delete``.
+    """
+    method = method.upper()
+    if method == "POST":
+        return "create"
+    if method == "PUT":
+        return "update"
+    if method == "DELETE":
+        return "delete"
+    if method == "GET":
+        query = URL(url).query if isinstance(url, str) else url.query
+        return "find" if set(query) - PAGINATION_PARAMETERS else "list"
+    return method.lower()
+
+
+class Histogram:
+    """Cumulative histogram of observed values"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # the last count is for the values above the highest bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """
+        Pairs of the upper bound and the number of values less or equal to it, ending with ``inf``.
+        """
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class MetricsExporter(ABC):
+    """Receives the metrics of the collector on ``MetricsCollector.export()``"""
+
+    @abstractmethod
+    def export(self, collector: "MetricsCollector"):
+        """Take the current metrics of the collector"""
+
+
+class InMemoryExporter(MetricsExporter):
+    """Keeps snapshots of the exported metrics"""
+
+    def __init__(self):
+        self.snapshots: List[Dict] = []
+
+    def export(self, collector: "MetricsCollector"):
+        self.snapshots.append(collector.snapshot())
+
+
+class PrometheusTextExporter(MetricsExporter):
+    """Renders the metrics in the Prometheus text exposition format"""
+
+    def __init__(self, prefix: str = "feihua"):
+        self.prefix = prefix
+        #: Text of the last export
+        self.text = ""
+
+    def export(self, collector: "MetricsCollector"):
+        self.text = self.render(collector)
+
+    def render(self, collector: "MetricsCollector") -> str:
+        name = f"{self.prefix}_stage_seconds"
+        lines = [f"# HELP {name} Time spent in the stages of the requests.", f"# TYPE {name} histogram"]
+        for (operation, stage), histogram in sorted(collector.stages.items()):
+            labels = f'operation="{operation}",stage="{stage}"'
+            for bound, count in histogram.cumulative():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum!r}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        name = f"{self.prefix}_errors_total"
+        lines.extend([f"# HELP {name} Failed requests by status.", f"# TYPE {name} counter"])
+        for (operation, status), count in sorted(collector.errors.items()):
+            lines.append(f'{name}{{operation="{operation}",status="{status}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+class MetricsCollector:
+    """
+    Collects per-operation histograms of the request stages and error counts.
+    Stages are ``sign``, ``queue`` (waiting for a connection of the pool), ``dns``, ``connect``
+    (TCP and TLS), ``ttfb`` (from sending the request until the response headers),
+    ``total`` (the whole attempt until the response headers) and ``decode`` (reading and decoding the body).
+    The network stages come from the aiohttp ``TraceConfig`` of ``trace_config()``.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS, exporters: Iterable[MetricsExporter] = ()):
+        self.buckets = tuple(buckets)
+        self.exporters = list(exporters)
+        self.stages: Dict[Tuple[str, str], Histogram] = {}
+        self.errors: Dict[Tuple[str, str], int] = {}
+
+    def observe(self, operation: str, stage: str, seconds: float):
+        histogram = self.stages.get((operation, stage))
+        if histogram is None:
+            histogram = self.stages[(operation, stage)] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    def count_error(self, operation: str, status: Union[int, str]):
+        key = (operation, str(status))
+        self.errors[key] = self.errors.get(key, 0) + 1
+
+    def snapshot(self) -> Dict:
+        return {
+            "stages": {
+                key: {"buckets": histogram.cumulative(), "sum": histogram.sum, "count": histogram.count}
+                for key, histogram in self.stages.items()
+            },
+            "errors": dict(self.errors),
+        }
+
+    def export(self):
+        for exporter in self.exporters:
+            exporter.export(self)
+
+    def request_context(self, operation: str) -> SimpleNamespace:
+        """
+        Context passed as ``trace_request_ctx`` of the request to label its trace events.
+        """
+        return SimpleNamespace(operation=operation)
+
+    def trace_config(self) -> TraceConfig:
+        trace_config = TraceConfig()
+        self._on_stage(trace_config.on_connection_queued_start, trace_config.on_connection_queued_end, "queue")
+        self._on_stage(trace_config.on_dns_resolvehost_start, trace_config.on_dns_resolvehost_end, "dns")
+        self._on_stage(trace_config.on_connection_create_start, trace_config.on_connection_create_end, "connect")
+        # on_request_headers_sent appeared in aiohttp 3.8, before it TTFB includes getting the connection
+        headers_sent = getattr(trace_config, "on_request_headers_sent", trace_config.on_request_start)
+        self._on_stage(headers_sent, trace_config.on_request_end, "ttfb")
+        return trace_config
+
+    def _on_stage(self, start_signal, end_signal, stage: str):
+        async def on_start(session, context, params):
+            setattr(context, f"{stage}_started", time.monotonic())
+
+        async def on_end(session, context, params):
+            started = getattr(context, f"{stage}_started", None)
+            request_context: Optional[SimpleNamespace] = context.trace_request_ctx
+            if started is None or request_context is None:
+                return
+            self.observe(request_context.operation, stage, time.monotonic() - started)
+
+        start_signal.append(on_start)
+        end_signal.append(on_end)
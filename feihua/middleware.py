@@ -0,0 +1,195 @@
+"""
+Verification of SDK-HMAC-SHA256 signed requests in aiohttp servers and proxies.
+
+    verifier = SignatureVerifier({"access key": "secret key"})
+    app = web.Application(middlewares=[verifier.middleware()])
+
+The access key of a verified request is in ``request["access_key_id"]``.
+"""
+
+import asyncio
+import inspect
+import time
+from calendar import timegm
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Mapping, Optional, Tuple, Union
+
+from aiohttp import web
+
+from .signer import HEADER_X_DATE, Signer, _Request, parse_authorization
+
+__all__ = ("SignatureError", "SignatureVerifier")
+
+DEFAULT_MAX_SKEW = 900.0
+DEFAULT_SECRET_CACHE_SIZE = 1024
+DEFAULT_SECRET_CACHE_TTL = 300.0
+DEFAULT_REPLAY_CACHE_SIZE = 100000
+
+SecretLookup = Union[Mapping[str, str], Callable[[str], Union[Optional[str], Awaitable[Optional[str]]]]]
+
+
+class SignatureError(Exception):
+    """The request is not signed correctly"""
+
+    def __init__(self, message: str, code: str = "APIGW.0301"):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+def _parse_date(value: str) -> Optional[float]:
+    """
+    Seconds since the epoch of an ``X-Sdk-Date`` value like ``20200608T023900Z``.
+    """
+    if len(value) != 16 or value[8] != "T" or value[15] != "Z":
+        return None
+    try:
+        fields = (
+            int(value[0:4]),
+            int(value[4:6]),
+            int(value[6:8]),
+            int(value[9:11]),
+            int(value[11:13]),
+            int(value[13:15]),
+        )
+    except ValueError:
+        return None
+    if not (1 <= fields[1] <= 12 and 1 <= fields[2] <= 31 and fields[3] < 24 and fields[4] < 60 and fields[5] < 61):
+        return None
+    return float(timegm(fields + (0, 0, 0)))
+
+
+class SignatureVerifier:
+    """
+    Verifies signed requests.
+
+    ``secrets`` maps access keys to secret keys, it is a mapping or a function (sync or async)
+    returning the secret of the access key or None when the key is unknown.
+    Results of the function, unknown keys included, are cached for ``secret_cache_ttl`` seconds
+    together with a prepared ``Signer`` of the key, at most ``secret_cache_size`` keys are kept.
+
+    A request is rejected when its ``X-Sdk-Date`` differs from the clock by more than ``max_skew`` seconds,
+    or when its signature has already been seen while its date is within the skew window.
+    The replay cache keeps at most ``replay_cache_size`` signatures, the oldest are dropped first,
+    so it must hold all the requests of ``2 * max_skew`` seconds to reject every replay.
+    Identical requests signed within the same second have the same signature,
+    set ``replay_cache_size`` to 0 to accept them.
+    """
+
+    def __init__(
+        self,
+        secrets: SecretLookup,
+        max_skew: float = DEFAULT_MAX_SKEW,
+        secret_cache_size: int = DEFAULT_SECRET_CACHE_SIZE,
+        secret_cache_ttl: float = DEFAULT_SECRET_CACHE_TTL,
+        replay_cache_size: int = DEFAULT_REPLAY_CACHE_SIZE,
+    ):
+        self.secrets = secrets
+        self.max_skew = max_skew
+        self.secret_cache_size = secret_cache_size
+        self.secret_cache_ttl = secret_cache_ttl
+        self.replay_cache_size = replay_cache_size
+        # access key -> (signer or None for an unknown key, expiry)
+        self._signers: "OrderedDict[str, Tuple[Optional[Signer], float]]" = OrderedDict()
+        # signature -> expiry, in the order of arrival
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        # concurrent lookups of the same access key
+        self._lookups: Dict[str, asyncio.Future] = {}
+
+    async def verify(self, request: web.Request) -> str:
+        """
+        Verify the request and return its access key, raise ``SignatureError`` when it is rejected.
+        """
+        authorization = parse_authorization(request.headers.get("Authorization", ""))
+        if authorization is None:
+            raise SignatureError("Missing or malformed Authorization header.")
+
+        date = request.headers.get(HEADER_X_DATE)
+        timestamp = None if date is None else _parse_date(date)
+        if timestamp is None:
+            raise SignatureError(f"Missing or malformed {HEADER_X_DATE} header.")
+        now = time.time()
+        if abs(now - timestamp) > self.max_skew:
+            raise SignatureError(f"{HEADER_X_DATE} differs from the server time by more than {self.max_skew:g} s.")
+
+        signer = await self._get_signer(authorization.access)
+        if signer is None:
+            raise SignatureError("Unknown access key.")
+
+        headers = {}
+        for name in authorization.signed_headers:
+            value = request.headers.get(name)
+            if value is None:
+                raise SignatureError(f"Signed header {name!r} is missing.")
+            headers[name] = value
+        body = await request.read()
+        signed = _Request(method=request.method, url=request.url, headers=headers, body=body)
+        if not signer.verify(signed, authorization.signature):
+            raise SignatureError("Signature does not match.")
+
+        if self.replay_cache_size:
+            self._check_replay(authorization.signature, timestamp + self.max_skew, now)
+        return authorization.access
+
+    def middleware(self):
+        """
+        aiohttp middleware answering 401 to the requests failing the verification.
+        """
+
+        @web.middleware
+        async def signature_middleware(request: web.Request, handler):
+            try:
+                request["access_key_id"] = await self.verify(request)
+            except SignatureError as e:
+                return web.json_response({"code": e.code, "message": e.message}, status=401)
+            return await handler(request)
+
+        return signature_middleware
+
+    def invalidate(self, access_key_id: Optional[str] = None):
+        """
+        Forget the cached secret of the access key, or of all keys, e.g. after a rotation.
+        """
+        if access_key_id is None:
+            self._signers.clear()
+        else:
+            self._signers.pop(access_key_id, None)
+
+    def _check_replay(self, signature: str, expires_at: float, now: float):
+        seen = self._seen
+        while seen:
+            oldest, oldest_expires_at = next(iter(seen.items()))
+            if oldest_expires_at > now and len(seen) < self.replay_cache_size:
+                break
+            del seen[oldest]
+        if signature in seen:
+            raise SignatureError("The request has already been received.")
+        seen[signature] = expires_at
+
+    async def _get_signer(self, access_key_id: str) -> Optional[Signer]:
+        now = time.monotonic()
+        cached = self._signers.get(access_key_id)
+        if cached is not None and cached[1] > now:
+            self._signers.move_to_end(access_key_id)
+            return cached[0]
+
+        lookup = self._lookups.get(access_key_id)
+        if lookup is None:
+            lookup = self._lookups[access_key_id] = asyncio.ensure_future(self._lookup_secret(access_key_id))
+            lookup.add_done_callback(lambda _: self._lookups.pop(access_key_id, None))
+        secret = await asyncio.shield(lookup)
+
+        signer = None if secret is None else Signer(key=access_key_id, secret=secret)
+        self._signers[access_key_id] = (signer, time.monotonic() + self.secret_cache_ttl)
+        self._signers.move_to_end(access_key_id)
+        while len(self._signers) > self.secret_cache_size:
+            self._signers.popitem(last=False)
+        return signer
+
+    async def _lookup_secret(self, access_key_id: str) -> Optional[str]:
+        if isinstance(self.secrets, Mapping):
+            return self.secrets.get(access_key_id)
+        secret = self.secrets(access_key_id)
+        if inspect.isawaitable(secret):
+            secret = await secret
+        return secret
@@ -0,0 +1,147 @@
+import time
+from collections import OrderedDict
+from types import TracebackType
+from typing import Dict, Optional, Tuple, Type
+
+from aiohttp import ClientSession, TCPConnector
+
+from .client import Client, connector_stats
+from .concurrency import AdaptiveLimiter
+
+__all__ = ("ClientPool",)
+
+
+class ClientPool:
+    """
+    Registry of clients for many accounts and endpoints sharing one session and connection pool.
+
+        pool = ClientPool(limit=200, limit_per_host=20, idle_timeout=600)
+        client = pool.get(access_key_id, secret_access_key, "dns.ap-southeast-1.myhuaweicloud.com")
+        response, status = await client.recordsets.list(zone_id)
+        await pool.close()
+
+    ``limit`` and ``limit_per_host`` bound the connections of the shared connector,
+    ``host_limits`` additionally bounds the requests in flight to the given hosts across all their clients.
+    A client not taken by ``get`` for ``idle_timeout`` seconds is dropped from the pool,
+    at most ``max_clients`` are kept, the least recently taken ones are dropped first.
+    Other keyword arguments are passed to every ``Client``.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        keepalive_timeout: float = 15.0,
+        ttl_dns_cache: Optional[int] = 10,
+        host_limits: Optional[Dict[str, int]] = None,
+        idle_timeout: Optional[float] = 300.0,
+        max_clients: Optional[int] = None,
+        **client_kwargs,
+    ) -> None:
+        self.connector = TCPConnector(
+            ssl=None,
+            limit=limit,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            use_dns_cache=ttl_dns_cache is not None,
+            ttl_dns_cache=ttl_dns_cache,
+        )
+        self.session = ClientSession(connector=self.connector)
+        self.idle_timeout = idle_timeout
+        self.max_clients = max_clients
+        self.client_kwargs = client_kwargs
+        self._host_limiters = {
+            host: AdaptiveLimiter(initial_limit=host_limit, min_limit=host_limit, max_limit=host_limit)
+            for host, host_limit in (host_limits or {}).items()
+        }
+        # client key -> (client, monotonic time of the last get), least recently taken first
+        self._clients: "OrderedDict[Tuple, Tuple[Client, float]]" = OrderedDict()
+
+    async def __aenter__(self) -> "ClientPool":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        await self.close()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def get(
+        self,
+        access_key_id: str,
+        secret_access_key: str,
+        host: str,
+        scheme: str = "https",
+        port: Optional[int] = None,
+    ) -> Client:
+        """
+        Return the client of the credentials and the endpoint, it is created on the first call.
+        Clients are lightweight, take the client from the pool for every unit of work
+        instead of keeping it, so the pool knows it is in use.
+        """
+        now = time.monotonic()
+        self.evict_idle(now)
+        key = (access_key_id, host, scheme, port)
+        entry = self._clients.get(key)
+        if entry is not None and entry[0].secret_access_key == secret_access_key:
+            client = entry[0]
+        else:
+            # a new or rotated secret
+            client = Client(
+                access_key_id=access_key_id,
+                secret_access_key=secret_access_key,
+                host=host,
+                scheme=scheme,
+                port=port,
+                session=self.session,
+                close_session=False,
+                **self._get_client_kwargs(host),
+            )
+        self._clients[key] = (client, now)
+        self._clients.move_to_end(key)
+        if self.max_clients is not None:
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        return client
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """
+        Drop the clients not taken for ``idle_timeout`` seconds, returns their number.
+        A dropped client still works for whoever holds it, its connections belong to the shared pool.
+        """
+        if self.idle_timeout is None:
+            return 0
+        if now is None:
+            now = time.monotonic()
+        evicted = 0
+        while self._clients:
+            key, (client, last_used) = next(iter(self._clients.items()))
+            if now - last_used < self.idle_timeout:
+                break
+            del self._clients[key]
+            evicted += 1
+        return evicted
+
+    def pool_stats(self) -> Dict[str, int]:
+        """
+        Connections of the shared pool as in ``Client.pool_stats`` and the number of ``clients``.
+        """
+        stats = connector_stats(self.connector)
+        stats["clients"] = len(self._clients)
+        return stats
+
+    async def close(self) -> None:
+        self._clients.clear()
+        await self.session.close()
+
+    def _get_client_kwargs(self, host: str) -> Dict:
+        kwargs = dict(self.client_kwargs)
+        limiter = self._host_limiters.get(host)
+        if limiter is not None and kwargs.get("concurrency_limiter") is None:
+            kwargs["concurrency_limiter"] = limiter
+        return kwargs
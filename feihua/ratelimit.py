@@ -0,0 +1,124 @@
+import asyncio
+import inspect
+import time
+from typing import Dict, Optional
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+__all__ = ("TokenBucket", "RateLimiter")
+
+
+class TokenBucket:
+    """
+    Token bucket refilled with ``rate`` tokens per second up to ``capacity`` tokens.
+    Waiters get their tokens in FIFO order.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be a positive number")
+        self.rate = rate
+        self.capacity = rate if capacity is None else capacity
+        if self.capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        #: Number of acquired tokens
+        self.acquired = 0
+        #: Number of acquisitions which had to wait for a token
+        self.waits = 0
+        #: Total seconds spent waiting for tokens
+        self.wait_time = 0.0
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    async def acquire(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        started = time.monotonic()
+        # asyncio.Lock wakes up waiters in the order they came, so tokens are handed out fairly
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+        waited = time.monotonic() - started
+        self.acquired += 1
+        if waited > 0.001:
+            self.waits += 1
+            self.wait_time += waited
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+
+class RateLimiter:
+    """
+    Client-side rate limiter with separate buckets for reads (GET) and writes (POST, PUT, DELETE).
+    Pass the same instance to several clients, or use ``RateLimiter.shared()``,
+    to share the limits of one account, ``RateLimiter.remove_shared()`` drops it from the registry.
+    """
+
+    _shared: Dict[str, "RateLimiter"] = {}
+
+    def __init__(
+        self,
+        read_rate: float,
+        write_rate: float,
+        read_burst: Optional[float] = None,
+        write_burst: Optional[float] = None,
+    ):
+        self.read = TokenBucket(read_rate, read_burst)
+        self.write = TokenBucket(write_rate, write_burst)
+        # the arguments, to tell whether a shared limiter is asked for with other limits
+        self._arguments = (read_rate, write_rate, read_burst, write_burst)
+
+    @classmethod
+    def shared(cls, access_key_id: str, *args, **kwargs) -> "RateLimiter":
+        """
+        Return the limiter of the access key, it is created with the given arguments on the first call.
+        Raise ``ValueError`` when the registered limiter of the key has other limits.
+        """
+        arguments = inspect.signature(cls).bind(*args, **kwargs)
+        arguments.apply_defaults()
+        arguments = tuple(arguments.arguments.values())
+        limiter = cls._shared.get(access_key_id)
+        if limiter is None:
+            limiter = cls._shared[access_key_id] = cls(*arguments)
+        elif limiter._arguments != arguments:
+            raise ValueError(
+                f"Shared rate limiter of {access_key_id!r} exists with other limits {limiter._arguments}, "
+                "remove it with RateLimiter.remove_shared() first"
+            )
+        return limiter
+
+    @classmethod
+    def remove_shared(cls, access_key_id: Optional[str] = None) -> None:
+        """
+        Remove the shared limiter of the access key, or all shared limiters, from the registry.
+        The clients holding a removed limiter keep using it.
+        """
+        if access_key_id is None:
+            cls._shared.clear()
+        else:
+            cls._shared.pop(access_key_id, None)
+
+    def bucket(self, method: str) -> TokenBucket:
+        return self.read if method.upper() in READ_METHODS else self.write
+
+    async def acquire(self, method: str):
+        await self.bucket(method).acquire()
+
+    @property
+    def wait_time(self) -> float:
+        """
+        Total seconds requests spent waiting for tokens.
+        """
+        return self.read.wait_time + self.write.wait_time
@@ -1,14 +1,43 @@
-import copy
-from typing import Dict, List
+import asyncio
+from collections import deque
+from collections.abc import Sequence
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional
+
+from yarl import URL
 
 from feihua.exceptions import ClientError
+from feihua.stream import JsonArrayStream
+from feihua.sync import SyncReport, plan_changes
+from feihua.utils import SUCCESSFUL_STATUS_CODE, return_list_objects, return_single_object
+from feihua.zone import is_zone_name, normalize_zone_name
 
-SUCCESSFUL_STATUS_CODE = (200, 202, 204)
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_CONCURRENCY = 8
+STREAM_CHUNK_SIZE = 64 * 1024
+# keys every bulk operation needs besides ``action``
+_BULK_REQUIRED_KEYS = {"create": ("data",), "update": ("recordset_id", "data"), "delete": ("recordset_id",)}
 
 
 class Recordset:
     """Recordset Resource"""
 
+    __slots__ = (
+        "id",
+        "zone_id",
+        "name",
+        "description",
+        "type",
+        "ttl",
+        "records",
+        "status",
+        "zone_name",
+        "default",
+        "links",
+        "project_id",
+        "create_at",
+        "update_at",
+    )
+
     def __init__(
         self,
         id: str,
@@ -62,14 +91,76 @@ class Recordset:
         self.update_at = update_at
 
     def to_dict(self):
-        return vars(self)
+        return {name: getattr(self, name) for name in self.__slots__}
 
     def __str__(self):
         return "_".join([self.name, self.type, ",".join(self.records), str(self.ttl)])
 
 
+class RecordsetList(Sequence):
+    """
+    Sequence of recordsets of a list response.
+    Keeps the decoded rows and builds a ``Recordset`` only when an element is accessed.
+    """
+
+    __slots__ = ("raw",)
+
+    def __init__(self, raw: List[Dict]):
+        #: Decoded recordset rows as returned by the API
+        self.raw = raw
+
+    def __len__(self):
+        return len(self.raw)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RecordsetList(self.raw[index])
+        return Recordset(**self.raw[index])
+
+    def __iter__(self) -> Iterator[Recordset]:
+        for record in self.raw:
+            yield Recordset(**record)
+
+    def __repr__(self):
+        return f"RecordsetList({len(self.raw)})"
+
+
+class BulkResult:
+    """Result of a single operation of ``Recordsets.bulk_apply``"""
+
+    def __init__(
+        self,
+        index: int,
+        operation: Dict,
+        response: Optional[Recordset] = None,
+        status: Optional[int] = None,
+        error: Optional[Exception] = None,
+    ):
+        #: Position of the operation in the submitted batch
+        self.index = index
+        #: The operation as it was submitted
+        self.operation = operation
+        #: Recordset returned by the API, ``None`` on error
+        self.response = response
+        #: HTTP status of the response or of the error
+        self.status = status
+        #: ClientError raised by the operation, or the unexpected exception (``status`` is None then)
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        action = self.operation.get("action") if isinstance(self.operation, dict) else None
+        return f"BulkResult({self.index}, {action!r}, status={self.status})"
+
+
 class Recordsets:
-    """Recordsets resource represent list all recordset API response"""
+    """
+    Recordsets resource represent list all recordset API response.
+    Every method takes the zone id or the zone name, names are resolved by ``client.zones``.
+    """
 
     base_path = "/zones/{zone_id}/recordsets"
     api_version = "/v2"
@@ -81,23 +172,38 @@ class Recordsets:
         """
         List of images
         """
+        zone_id = await self._resolve_zone_id(zone_id)
+        zone_cache = self.client.zone_cache
+        if zone_cache is not None:
+            cached = zone_cache.get(zone_id)
+            if cached is not None:
+                return cached
+
         response, status_code = await self.client._query_json(
             api_version=self.api_version,
             path=self.base_path.format(zone_id=zone_id),
             method="GET",
         )
-        return await self._return_list_objects(response, status_code)
+        response, status_code = await self._return_list_objects(response, status_code)
+        if zone_cache is not None and status_code in SUCCESSFUL_STATUS_CODE:
+            zone_cache.set(zone_id, response, status_code)
+        return response, status_code
 
     async def create_record(self, zone_id: str, data: Dict):
+        zone_id = await self._resolve_zone_id(zone_id)
         response, status_code = await self.client._query_json(
             api_version=self.api_version,
             path=self.base_path.format(zone_id=zone_id),
             method="POST",
             data=data,
         )
-        return await self._return_single_object(response, status_code)
+        response, status_code = await self._return_single_object(response, status_code)
+        if self.client.zone_cache is not None and status_code in SUCCESSFUL_STATUS_CODE:
+            self.client.zone_cache.put_recordset(zone_id, response)
+        return response, status_code
 
     async def update_record(self, zone_id: str, recordset_id: str, data: Dict):
+        zone_id = await self._resolve_zone_id(zone_id)
         if "name" in data:
             raise ClientError(status=400, data={"message": "Attribute 'name' is immutable."})
         response, status_code = await self.client._query_json(
@@ -106,17 +212,25 @@ class Recordsets:
             method="PUT",
             data=data,
         )
-        return await self._return_single_object(response, status_code)
+        response, status_code = await self._return_single_object(response, status_code)
+        if self.client.zone_cache is not None and status_code in SUCCESSFUL_STATUS_CODE:
+            self.client.zone_cache.put_recordset(zone_id, response)
+        return response, status_code
 
     async def delete_record(self, zone_id: str, recordset_id: str):
+        zone_id = await self._resolve_zone_id(zone_id)
         response, status_code = await self.client._query_json(
             api_version=self.api_version,
             path=self.base_path.format(zone_id=zone_id) + "/" + recordset_id,
             method="DELETE",
         )
-        return await self._return_single_object(response, status_code)
+        response, status_code = await self._return_single_object(response, status_code)
+        if self.client.zone_cache is not None and status_code in SUCCESSFUL_STATUS_CODE:
+            self.client.zone_cache.remove_recordset(zone_id, recordset_id)
+        return response, status_code
 
     async def find_records(self, zone_id: str, query: str):
+        zone_id = await self._resolve_zone_id(zone_id)
         response, status_code = await self.client._query_json(
             api_version=self.api_version,
             path=self.base_path.format(zone_id=zone_id),
@@ -125,20 +239,255 @@ class Recordsets:
         )
         return await self._return_list_objects(response, status_code)
 
+    async def find_by_fqdn(self, name: str, type: Optional[str] = None):
+        """
+        Find the recordsets of the domain name in the most specific zone it belongs to,
+        the zone is matched by ``client.zones.match`` without a request per zone.
+        Raise ``ClientError`` 404 when no zone matches.
+        """
+        zone = await self.client.zones.match(name)
+        if zone is None:
+            raise ClientError(status=404, data={"message": f"No zone matches {name}."})
+        query = {"name": normalize_zone_name(name), "search_mode": "equal"}
+        if type is not None:
+            query["type"] = type
+        return await self.find_records(zone.id, query)
+
+    async def iter(
+        self, zone_id: str, query: Optional[Dict] = None, page_size: int = DEFAULT_PAGE_SIZE
+    ) -> AsyncIterator[Recordset]:
+        """
+        Iterate over all recordsets of the zone following the ``links.next`` pagination.
+        Only one page is kept in memory, the next page is requested when the current one is exhausted.
+        """
+        zone_id = await self._resolve_zone_id(zone_id)
+        query = dict(query or {})
+        query["limit"] = page_size
+        while True:
+            response, status_code = await self._list_page(zone_id, query)
+            if status_code not in SUCCESSFUL_STATUS_CODE:
+                return
+            recordsets = response.get("recordsets") or []
+            for record in recordsets:
+                yield Recordset(**record)
+
+            next_link = (response.get("links") or {}).get("next")
+            if not next_link or not recordsets:
+                return
+            query = self._next_page_query(next_link)
+
+    async def stream(
+        self, zone_id: str, query: Optional[Dict] = None, chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> AsyncIterator[Recordset]:
+        """
+        List recordsets of the zone decoding the body of the response chunk by chunk.
+        Every recordset is yielded as soon as it is decoded, so the memory doesn't grow with the page size.
+        """
+        zone_id = await self._resolve_zone_id(zone_id)
+        async with self.client._query(
+            api_version=self.api_version,
+            path=self.base_path.format(zone_id=zone_id),
+            query=query,
+            method="GET",
+            headers={"Content-Type": "application/json"},
+        ) as response:
+            decoder = JsonArrayStream("recordsets")
+            async for chunk in response.content.iter_chunked(chunk_size):
+                for record in decoder.feed(chunk):
+                    yield Recordset(**record)
+                if decoder.done:
+                    break
+            decoder.close()
+
+    async def iter_parallel(
+        self,
+        zone_id: str,
+        query: Optional[Dict] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[Recordset]:
+        """
+        Iterate over all recordsets of the zone fetching offset/limit pages concurrently.
+        The first page provides ``metadata.total_count``, the rest of the pages are requested
+        with at most ``concurrency`` of them in flight and yielded in the original order.
+        ``concurrency`` defaults to the maximum window of the client's adaptive limiter if it has one.
+        """
+        zone_id = await self._resolve_zone_id(zone_id)
+        concurrency = self._get_concurrency(concurrency)
+        query = dict(query or {})
+        query["limit"] = page_size
+        query["offset"] = 0
+
+        response, status_code = await self._list_page(zone_id, query)
+        if status_code not in SUCCESSFUL_STATUS_CODE:
+            return
+
+        total_count = (response.get("metadata") or {}).get("total_count", 0)
+        offsets = iter(range(page_size, total_count, page_size))
+        pending = deque()
+
+        def schedule():
+            for offset in offsets:
+                pending.append(asyncio.ensure_future(self._list_page(zone_id, {**query, "offset": offset})))
+                if len(pending) >= concurrency:
+                    return
+
+        # the next pages are fetched while the caller consumes the first one
+        schedule()
+        try:
+            for record in response.get("recordsets") or []:
+                yield Recordset(**record)
+            while pending:
+                response, status_code = await pending.popleft()
+                schedule()
+                if status_code not in SUCCESSFUL_STATUS_CODE:
+                    return
+                for record in response.get("recordsets") or []:
+                    yield Recordset(**record)
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def bulk_apply(
+        self, zone_id: str, operations: Iterable[Dict], concurrency: Optional[int] = None
+    ) -> List[BulkResult]:
+        """
+        Apply create/update/delete operations with at most ``concurrency`` requests in flight.
+        Every operation is a dict with ``action`` (``create``, ``update`` or ``delete``),
+        ``recordset_id`` for update and delete and ``data`` for create and update.
+        Failed operations don't stop the batch, their error is returned in the result:
+        malformed operations fail with status 400, timed out requests with status 503
+        and other exceptions of an operation are returned with status None.
+        Results are returned in the order of the operations.
+        ``concurrency`` defaults to the maximum window of the client's adaptive limiter if it has one.
+        """
+        results = [result async for result in self.iter_bulk_apply(zone_id, operations, concurrency)]
+        results.sort(key=lambda result: result.index)
+        return results
+
+    async def iter_bulk_apply(
+        self, zone_id: str, operations: Iterable[Dict], concurrency: Optional[int] = None
+    ) -> AsyncIterator[BulkResult]:
+        """
+        Same as ``bulk_apply`` but yields every result as soon as its operation completes.
+        """
+        zone_id = await self._resolve_zone_id(zone_id)
+        concurrency = self._get_concurrency(concurrency)
+        operations = enumerate(operations)
+        results = asyncio.Queue()
+
+        async def worker():
+            try:
+                for index, operation in operations:
+                    results.put_nowait(await self._apply_operation(zone_id, index, operation))
+            except Exception as exc:
+                results.put_nowait(exc)
+            finally:
+                results.put_nowait(None)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+        try:
+            finished = 0
+            while finished < len(workers):
+                result = await results.get()
+                if result is None:
+                    finished += 1
+                elif isinstance(result, Exception):
+                    raise result
+                else:
+                    yield result
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _apply_operation(self, zone_id: str, index: int, operation: Dict) -> BulkResult:
+        action = operation.get("action") if isinstance(operation, dict) else None
+        try:
+            if not isinstance(operation, dict):
+                raise ClientError(status=400, data={"message": "Bulk operation must be a dict."})
+            required = _BULK_REQUIRED_KEYS.get(action)
+            if required is None:
+                raise ClientError(status=400, data={"message": f"Unknown bulk action {action!r}."})
+            missing = [key for key in required if key not in operation]
+            if missing:
+                raise ClientError(status=400, data={"message": f"Bulk {action} requires {', '.join(missing)}."})
+            if "data" in required and not isinstance(operation["data"], dict):
+                raise ClientError(status=400, data={"message": f"Bulk {action} data must be a dict."})
+            if "recordset_id" in required and not isinstance(operation["recordset_id"], str):
+                raise ClientError(status=400, data={"message": f"Bulk {action} recordset_id must be a string."})
+            if action == "create":
+                response, status_code = await self.create_record(zone_id, operation["data"])
+            elif action == "update":
+                response, status_code = await self.update_record(zone_id, operation["recordset_id"], operation["data"])
+            elif action == "delete":
+                response, status_code = await self.delete_record(zone_id, operation["recordset_id"])
+        except ClientError as exc:
+            return BulkResult(index, operation, status=exc.status, error=exc)
+        except asyncio.TimeoutError:
+            error = ClientError(status=503, data={"message": f"Bulk {action} timed out."})
+            return BulkResult(index, operation, status=error.status, error=error)
+        except Exception as exc:
+            # one broken operation doesn't lose the results of the others
+            return BulkResult(index, operation, error=exc)
+        return BulkResult(index, operation, response=response, status=status_code)
+
+    async def sync(
+        self,
+        zone_id: str,
+        desired: Iterable[Dict],
+        prune: bool = False,
+        dry_run: bool = False,
+        concurrency: Optional[int] = None,
+    ) -> SyncReport:
+        """
+        Bring the zone to the desired state.
+        Every desired recordset is a dict in the format of ``create_record`` data.
+        Missing recordsets are created, changed ones are updated in place and with ``prune``
+        the ones not in the desired state are deleted. The plan is applied with ``bulk_apply``
+        unless ``dry_run`` is set.
+        """
+        zone_id = await self._resolve_zone_id(zone_id)
+        current = [recordset async for recordset in self.iter(zone_id)]
+        operations, unchanged = plan_changes(current, desired, prune=prune)
+        report = SyncReport(operations, unchanged, dry_run=dry_run)
+        if not dry_run and operations:
+            report.results = await self.bulk_apply(zone_id, operations, concurrency=concurrency)
+        return report
+
+    async def _resolve_zone_id(self, zone_id: str) -> str:
+        # a zone name is passed instead of the id
+        if is_zone_name(zone_id):
+            return await self.client.zones.resolve(zone_id)
+        return zone_id
+
+    def _get_concurrency(self, concurrency: Optional[int]) -> int:
+        # with an adaptive limiter on the client the limiter decides how many requests are in flight,
+        # so by default there are enough workers for its maximum window
+        if concurrency is None:
+            limiter = self.client.concurrency_limiter
+            concurrency = DEFAULT_CONCURRENCY if limiter is None else limiter.max_limit
+        if concurrency < 1:
+            raise ValueError("concurrency must be a positive number")
+        return concurrency
+
+    async def _list_page(self, zone_id: str, query: Dict):
+        return await self.client._query_json(
+            api_version=self.api_version,
+            path=self.base_path.format(zone_id=zone_id),
+            query=query,
+            method="GET",
+        )
+
+    @staticmethod
+    def _next_page_query(next_link: str) -> Dict:
+        return dict(URL(next_link).query)
+
     @staticmethod
     async def _return_single_object(response, status_code):
-        new_response = {}
-        if status_code in SUCCESSFUL_STATUS_CODE:
-            new_response = Recordset(**response)
-        return new_response, status_code
+        return await return_single_object(Recordset, response, status_code)
 
     @staticmethod
     async def _return_list_objects(response, status_code):
-        if status_code in SUCCESSFUL_STATUS_CODE:
-            new_response = copy.deepcopy(response)
-            recordsets = new_response["recordsets"]
-
-            if new_response.get("recordsets", None):
-                new_response["recordsets"] = [Recordset(**record) for record in recordsets]
-            return new_response, status_code
-        return response, status_code
+        return await return_list_objects("recordsets", RecordsetList, response, status_code)
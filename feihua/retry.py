@@ -0,0 +1,73 @@
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Optional
+
+from feihua.exceptions import ClientError
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+__all__ = ("RetryPolicy",)
+
+
+class RetryPolicy:
+    """
+    Retry policy of the Client.
+    Idempotent requests failed with one of ``statuses`` are retried up to ``attempts`` times in total.
+    The delay before the n-th retry is a random value between 0 and ``min(max_backoff, backoff * 2 ** n)``
+    (full jitter) or the ``Retry-After`` of the response when it is given.
+    No retry is started when it would end after ``deadline`` seconds since the call.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        backoff: float = 0.1,
+        max_backoff: float = 10.0,
+        deadline: Optional[float] = None,
+        statuses: Iterable[int] = RETRY_STATUSES,
+        methods: Iterable[str] = IDEMPOTENT_METHODS,
+    ):
+        if attempts < 1:
+            raise ValueError("attempts must be a positive number")
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(method.upper() for method in methods)
+
+    def is_retryable_method(self, method: str) -> bool:
+        return method.upper() in self.methods
+
+    def get_delay(self, attempt: int, error: ClientError, elapsed: float = 0.0) -> Optional[float]:
+        """
+        Return seconds to wait before the retry after the ``attempt``-th failed attempt
+        or ``None`` when the request shouldn't be retried.
+        """
+        if attempt >= self.attempts or error.status not in self.statuses:
+            return None
+        delay = self._retry_after(error)
+        if delay is None:
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+        if self.deadline is not None and elapsed + delay >= self.deadline:
+            return None
+        return delay
+
+    @staticmethod
+    def _retry_after(error: ClientError) -> Optional[float]:
+        value = (error.headers or {}).get("Retry-After")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            date = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+        return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
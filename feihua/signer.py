@@ -1,9 +1,9 @@
 import binascii
-import copy
 import hashlib
 import hmac
 from datetime import datetime
-from typing import Dict, Union
+from functools import lru_cache
+from typing import Dict, List, Optional, Union
 from urllib.parse import parse_qs, quote, unquote, urlparse
 
 from yarl import URL
@@ -17,49 +17,114 @@ HEADER_HOST = "host"
 HEADER_X_DATE = "X-Sdk-Date"
 
 
+class Authorization:
+    """Parts of the ``Authorization`` header of a signed request"""
+
+    __slots__ = ("access", "signed_headers", "signature")
+
+    def __init__(self, access: str, signed_headers: List[str], signature: str):
+        self.access = access
+        self.signed_headers = signed_headers
+        self.signature = signature
+
+
+def parse_authorization(value: str) -> Optional[Authorization]:
+    """
+    Parse ``SDK-HMAC-SHA256 Access=..., SignedHeaders=...;..., Signature=...``, None when it is malformed.
+    """
+    if not value.startswith(ALGORITHM + " "):
+        return None
+    parts = {}
+    for item in value[len(ALGORITHM) + 1 :].split(","):
+        key, _, item_value = item.strip().partition("=")
+        parts[key] = item_value
+    access = parts.get("Access")
+    signed_headers = parts.get("SignedHeaders")
+    signature = parts.get("Signature")
+    if not access or not signed_headers or not signature:
+        return None
+    return Authorization(access, signed_headers.split(";"), signature)
+
+
 # HWS API Gateway Signature
 class _Request:
-    def __init__(self, method: str, url: Union[str, URL], headers: Dict = None, body: Union[str, Dict] = None):
-        if isinstance(url, URL):
-            url = str(url)
-        parsing_url = urlparse(url)
-
+    def __init__(self, method: str, url: Union[str, URL], headers: Dict = None, body: Union[str, bytes] = None):
         self.method = method
-        self.scheme = parsing_url.scheme
-        self.host = parsing_url.hostname
-        self.uri = parsing_url.path
-        self.query = parse_qs(parsing_url.query, keep_blank_values=True)
+        if isinstance(url, URL):
+            # already parsed by yarl, take the parts without a round trip through str
+            self.scheme = url.scheme
+            self.host = url.host
+            self.uri = url.raw_path
+            self.query = {}
+            for key, value in url.query.items():
+                self.query.setdefault(key, []).append(value)
+        else:
+            parsing_url = urlparse(url)
+            self.scheme = parsing_url.scheme
+            self.host = parsing_url.hostname
+            self.uri = parsing_url.path
+            self.query = parse_qs(parsing_url.query, keep_blank_values=True)
         if headers is None:
             self.headers = {}
         else:
-            self.headers = copy.deepcopy(headers)
+            self.headers = dict(headers)
         if body is None:
-            body = ""
-        self.body = body.encode("utf-8")
+            body = b""
+        elif isinstance(body, str):
+            body = body.encode("utf-8")
+        self.body = body
 
 
 class Signer:
     def __init__(self, key: str, secret: str):
         self.key = key
         self.secret = secret
+        # keyed HMAC state, copied for every signature instead of re-keying
+        self._hmac = hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256)
+        # formatted X-Sdk-Date of the last signed second
+        self._date_cache = (None, None)
+
+    def sign(self, method: str, url: Union[str, URL], headers: Dict = None, body: Union[str, bytes] = None) -> Dict:
+        """
+        Sign the request and return the headers to send with it.
+        The passed headers are not modified.
+        """
+        r = _Request(method=method, url=url, headers=headers, body=body)
+        self.signer(r)
+        return r.headers
 
     def verify(self, r, authorization):
+        """
+        Check the signature of the request in constant time.
+        ``authorization`` is the Authorization header or only the hex signature,
+        the request must have only the signed headers.
+        """
+        if authorization.startswith(ALGORITHM + " "):
+            parsed = parse_authorization(authorization)
+            if parsed is None:
+                return False
+            authorization = parsed.signature
         header_time = self._find_header(r, HEADER_X_DATE)
         if header_time is None:
             return False
-        t = datetime.strptime(header_time, BASIC_DATE_FORMAT)
+        try:
+            t = datetime.strptime(header_time, BASIC_DATE_FORMAT)
+        except ValueError:
+            return False
         signed_headers = self._get_list_signed_headers(r)
         canonical_request = self._get_canonical_request(r, signed_headers)
         string_to_sign = self._get_string_to_sign(canonical_request, t)
 
-        return authorization == self._sign_string_to_sign(string_to_sign, self.secret)
+        return hmac.compare_digest(
+            authorization.encode("utf-8"), self._sign_string_to_sign(string_to_sign, self.secret).encode("utf-8")
+        )
 
     # SignRequest set Authorization header
     def signer(self, r: _Request):
         header_time = self._find_header(r, HEADER_X_DATE)
         if header_time is None:
-            t = datetime.utcnow()
-            r.headers[HEADER_X_DATE] = datetime.strftime(t, BASIC_DATE_FORMAT)
+            t = datetime.utcnow().replace(microsecond=0)
+            r.headers[HEADER_X_DATE] = self._format_date(t)
         else:
             t = datetime.strptime(header_time, BASIC_DATE_FORMAT)
 
@@ -107,12 +172,7 @@ class Signer:
         )
 
     def _get_canonical_uri(self, r: _Request):
-        pattens = unquote(r.uri).split("/")
-        uri = [self._urlencode(v) for v in pattens]
-        urlpath = "/".join(uri)
-        if urlpath[-1] != "/":
-            urlpath = urlpath + "/"  # always end with /
-        return urlpath
+        return _canonical_uri(r.uri)
 
     def _get_canonical_query_string(self, r: _Request):
         keys = [key for key in r.query]
@@ -163,11 +223,22 @@ class Signer:
     # Create a "String to Sign".
     def _get_string_to_sign(self, canonical_request: str, t: datetime):
         to_bytes = self._hex_encode_sha256_hash(canonical_request.encode("utf-8"))
-        return "%s\n%s\n%s" % (ALGORITHM, datetime.strftime(t, BASIC_DATE_FORMAT), to_bytes)
+        return "%s\n%s\n%s" % (ALGORITHM, self._format_date(t), to_bytes)
+
+    def _format_date(self, t: datetime):
+        cached_time, cached_value = self._date_cache
+        if cached_time != t:
+            cached_value = datetime.strftime(t, BASIC_DATE_FORMAT)
+            self._date_cache = (t, cached_value)
+        return cached_value
 
     # Create the HWS Signature.
     # @staticmethod
     def _sign_string_to_sign(self, string_to_sign: str, signing_key: str):
+        if signing_key == self.secret:
+            hm = self._hmac.copy()
+            hm.update(string_to_sign.encode("utf-8"))
+            return hm.hexdigest()
         hm = self._hmacsha256(signing_key, string_to_sign)
         return binascii.hexlify(hm).decode()
 
@@ -198,13 +269,22 @@ class Signer:
         return None
 
 
-def sign(key: str, secret: str, method: str, url: Union[str, URL], headers: Dict = None, body: Dict = None):
-    sig = Signer(key=key, secret=secret)
+# Paths of the API are few (``/v2/zones/{id}/recordsets`` and alike), the canonical form is cached
+@lru_cache(maxsize=1024)
+def _canonical_uri(uri: str):
+    pattens = unquote(uri).split("/")
+    uri = [Signer._urlencode(v) for v in pattens]
+    urlpath = "/".join(uri)
+    if urlpath[-1] != "/":
+        urlpath = urlpath + "/"  # always end with /
+    return urlpath
 
-    r = _Request(method=method, url=url, headers=headers, body=body)
-    sig.signer(r)
 
-    return r.headers
+def sign(
+    key: str, secret: str, method: str, url: Union[str, URL], headers: Dict = None, body: Union[str, bytes] = None
+):
+    sig = Signer(key=key, secret=secret)
+    return sig.sign(method=method, url=url, headers=headers, body=body)
 
 
-__all__ = ("sign",)
+__all__ = ("Authorization", "Signer", "parse_authorization", "sign")
@@ -0,0 +1,294 @@
+import asyncio
+import sqlite3
+import time
+from types import TracebackType
+from typing import Dict, Iterable, List, Optional, Type, Union
+
+from .cache import ZoneCache
+from .codec import JsonCodec, get_codec
+from .recordset import DEFAULT_CONCURRENCY, Recordset, RecordsetList
+from .zone import Zone
+
+__all__ = ("RefreshReport", "SnapshotStore", "ZoneVersion")
+
+DEFAULT_MAX_AGE = 900.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS zones (
+    zone_id TEXT PRIMARY KEY,
+    name TEXT,
+    serial INTEGER,
+    updated_at TEXT,
+    record_num INTEGER,
+    saved_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS recordsets (
+    zone_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    update_at TEXT,
+    data BLOB NOT NULL,
+    PRIMARY KEY (zone_id, id)
+);
+CREATE INDEX IF NOT EXISTS recordsets_position ON recordsets (zone_id, position);
+"""
+
+
+class ZoneVersion:
+    """Version of a stored zone, compared with the zone listing to find out of date snapshots"""
+
+    __slots__ = ("zone_id", "name", "serial", "updated_at", "record_num", "saved_at")
+
+    def __init__(
+        self,
+        zone_id: str,
+        name: Optional[str],
+        serial: Optional[int],
+        updated_at: Optional[str],
+        record_num: Optional[int],
+        saved_at: float,
+    ):
+        self.zone_id = zone_id
+        self.name = name
+        #: Serial of the SOA record when the snapshot was taken
+        self.serial = serial
+        #: ``updated_at`` of the zone when the snapshot was taken
+        self.updated_at = updated_at
+        #: Number of the recordsets reported by the zone listing
+        self.record_num = record_num
+        #: Unix time of the snapshot
+        self.saved_at = saved_at
+
+    def __repr__(self):
+        return f"ZoneVersion({self.zone_id!r}, serial={self.serial}, updated_at={self.updated_at!r})"
+
+
+class RefreshReport:
+    """Result of ``SnapshotStore.refresh``"""
+
+    def __init__(self):
+        #: Ids of the zones listed again from the API
+        self.refreshed: List[str] = []
+        #: Ids of the zones whose snapshots are up to date
+        self.fresh: List[str] = []
+        #: Ids of the stored zones which don't exist anymore
+        self.removed: List[str] = []
+        #: Number of the recordsets of the refreshed zones added or changed since their previous snapshots
+        self.changed = 0
+
+    def __repr__(self):
+        return (
+            f"RefreshReport(refreshed={len(self.refreshed)}, fresh={len(self.fresh)}, "
+            f"removed={len(self.removed)}, changed={self.changed})"
+        )
+
+
+class SnapshotStore:
+    """
+    SQLite store of the recordsets of zones, so a restart reads the zones from the local disk
+    and lists only the zones changed since the snapshot.
+
+        store = SnapshotStore("zones.sqlite3")
+        await store.refresh(client)  # one zones listing plus the changed zones
+        recordsets = store.recordsets(zone_id)  # read from the disk on demand
+
+    A zone is out of date when its ``record_num``, ``updated_at`` or ``serial`` in the zones listing
+    differ from the stored ones, or its snapshot is older than ``max_age`` seconds.
+    The API is not known to change ``updated_at`` or ``serial`` of the zone when a recordset is edited in place
+    (the recorded responses report ``serial`` 0), so such edits are only picked up once the snapshot
+    is older than ``max_age``: keep it finite unless the zones are changed through this store only.
+    Recordsets of a refreshed zone are rewritten only when their ``update_at`` changed.
+    The stored recordsets also work offline, e.g. as the current state of ``sync.plan_changes``.
+    SQLite calls are blocking, they are short reads and writes of a local file.
+    """
+
+    def __init__(self, path: str = ":memory:", codec: Optional[Union[str, JsonCodec]] = None, **connect_kwargs):
+        self.path = path
+        self.codec = get_codec(codec)
+        self._connection = sqlite3.connect(path, **connect_kwargs)
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> "SnapshotStore":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM zones").fetchone()[0]
+
+    def __contains__(self, zone_id: str):
+        return self.version(zone_id) is not None
+
+    def close(self):
+        self._connection.close()
+
+    def versions(self) -> Dict[str, ZoneVersion]:
+        """
+        Versions of all stored zones by zone id, the recordsets are not read.
+        """
+        rows = self._connection.execute(
+            "SELECT zone_id, name, serial, updated_at, record_num, saved_at FROM zones"
+        ).fetchall()
+        return {row[0]: ZoneVersion(*row) for row in rows}
+
+    def version(self, zone_id: str) -> Optional[ZoneVersion]:
+        row = self._connection.execute(
+            "SELECT zone_id, name, serial, updated_at, record_num, saved_at FROM zones WHERE zone_id = ?", (zone_id,)
+        ).fetchone()
+        return None if row is None else ZoneVersion(*row)
+
+    def save(self, zone_id: str, recordsets: Iterable[Union[Recordset, Dict]], zone: Optional[Zone] = None) -> int:
+        """
+        Replace the snapshot of the zone, ``zone`` from the zones listing provides its version.
+        Returns the number of the recordsets added or changed, the stored ones with the same ``update_at``
+        are kept (compared by their data when they were never updated).
+        """
+        # id -> (position, update_at, data of the never updated recordsets)
+        stored = {
+            row[0]: row[1:]
+            for row in self._connection.execute(
+                "SELECT id, position, update_at, CASE WHEN update_at IS NULL THEN data END FROM recordsets"
+                " WHERE zone_id = ?",
+                (zone_id,),
+            )
+        }
+        rows = []
+        ids = set()
+        changed = 0
+        for position, recordset in enumerate(recordsets):
+            data = recordset.to_dict() if isinstance(recordset, Recordset) else recordset
+            update_at = data.get("update_at")
+            ids.add(data["id"])
+            previous = stored.get(data["id"])
+            encoded = self.codec.dumps(data)
+            if previous is None or previous[1] != update_at or (update_at is None and previous[2] != encoded):
+                changed += 1
+            elif previous[0] == position:
+                continue
+            rows.append((zone_id, data["id"], position, update_at, encoded))
+        version = (
+            zone_id,
+            None if zone is None else zone.name,
+            None if zone is None else zone.serial,
+            None if zone is None else zone.updated_at,
+            None if zone is None else zone.record_num,
+            time.time(),
+        )
+        removed = [(zone_id, recordset_id) for recordset_id in stored if recordset_id not in ids]
+        with self._connection:
+            self._connection.executemany("DELETE FROM recordsets WHERE zone_id = ? AND id = ?", removed)
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO recordsets (zone_id, id, position, update_at, data) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._connection.execute("INSERT OR REPLACE INTO zones VALUES (?, ?, ?, ?, ?, ?)", version)
+        return changed
+
+    def delete(self, zone_id: str):
+        with self._connection:
+            self._connection.execute("DELETE FROM recordsets WHERE zone_id = ?", (zone_id,))
+            self._connection.execute("DELETE FROM zones WHERE zone_id = ?", (zone_id,))
+
+    def recordsets(self, zone_id: str) -> Optional[RecordsetList]:
+        """
+        Stored recordsets of the zone in the listed order, None when the zone is not stored.
+        """
+        if self.version(zone_id) is None:
+            return None
+        rows = self._connection.execute(
+            "SELECT data FROM recordsets WHERE zone_id = ? ORDER BY position", (zone_id,)
+        ).fetchall()
+        loads = self.codec.loads
+        return RecordsetList([loads(row[0]) for row in rows])
+
+    def response(self, zone_id: str) -> Optional[Dict]:
+        """
+        Stored recordsets in the format of the ``Recordsets.list`` response, e.g. for ``RecordsetIndex.from_response``.
+        """
+        recordsets = self.recordsets(zone_id)
+        if recordsets is None:
+            return None
+        return {"links": {}, "recordsets": recordsets, "metadata": {"total_count": len(recordsets)}}
+
+    def warm(self, zone_cache: ZoneCache, zone_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        Put the stored zones into the zone cache of a client, returns the number of the zones put.
+        """
+        if zone_ids is None:
+            zone_ids = list(self.versions())
+        count = 0
+        for zone_id in zone_ids:
+            response = self.response(zone_id)
+            if response is not None:
+                zone_cache.set(zone_id, response, 200)
+                count += 1
+        return count
+
+    def is_stale(self, zone: Zone, max_age: Optional[float] = DEFAULT_MAX_AGE) -> bool:
+        """
+        Whether the snapshot of the listed zone is out of date, ``max_age`` None trusts the zone listing alone.
+        """
+        version = self.version(zone.id)
+        if version is None:
+            return True
+        if max_age is not None and time.time() - version.saved_at >= max_age:
+            return True
+        if zone.record_num is None and zone.updated_at is None and zone.serial is None:
+            # nothing to compare with
+            return True
+        return (version.record_num, version.updated_at, version.serial) != (
+            zone.record_num,
+            zone.updated_at,
+            zone.serial,
+        )
+
+    async def refresh(
+        self,
+        client,
+        zone_ids: Optional[Iterable[str]] = None,
+        max_age: Optional[float] = DEFAULT_MAX_AGE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> RefreshReport:
+        """
+        List the zones and list again the recordsets of the out of date ones, at most ``concurrency`` at once.
+        Without ``zone_ids`` all zones are refreshed and the stored zones missing from the listing are deleted.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be a positive number")
+        wanted = None if zone_ids is None else set(zone_ids)
+        zones = [zone async for zone in client.zones.iter() if wanted is None or zone.id in wanted]
+
+        report = RefreshReport()
+        stale = []
+        for zone in zones:
+            if self.is_stale(zone, max_age):
+                stale.append(zone)
+            else:
+                report.fresh.append(zone.id)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def refresh_zone(zone: Zone):
+            async with semaphore:
+                recordsets = [recordset async for recordset in client.recordsets.iter(zone.id)]
+            report.changed += self.save(zone.id, recordsets, zone=zone)
+            report.refreshed.append(zone.id)
+
+        await asyncio.gather(*(refresh_zone(zone) for zone in stale))
+
+        if wanted is None:
+            listed = {zone.id for zone in zones}
+            for zone_id in self.versions():
+                if zone_id not in listed:
+                    self.delete(zone_id)
+                    report.removed.append(zone_id)
+        return report
@@ -0,0 +1,128 @@
+import codecs
+import json
+from typing import Any, List
+
+__all__ = ("JsonArrayStream",)
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+_SEEK, _ARRAY_START, _ARRAY, _DONE = range(4)
+
+
+class JsonArrayStream:
+    """
+    Incremental decoder of the elements of the array under the ``key`` of the top-level JSON object.
+    Feed it chunks of the body, every call returns the elements completed so far,
+    so only the element being decoded is kept in memory.
+    """
+
+    def __init__(self, key: str, encoding: str = "utf-8"):
+        self.key = key
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._state = _SEEK
+        # lexer state while looking for the key
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string = None
+
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        if self._state == _DONE:
+            return []
+        self._buffer += self._decoder.decode(chunk)
+        position = 0
+        if self._state == _SEEK:
+            position = self._seek(position)
+        if self._state == _ARRAY_START:
+            position = self._array_start(position)
+        items = []
+        if self._state == _ARRAY:
+            position = self._array(position, items)
+        self._buffer = self._buffer[position:]
+        self._string_start -= position
+        return items
+
+    def close(self):
+        """
+        Check that the array has been found and read to the end.
+        """
+        if self._state != _DONE:
+            raise ValueError(f"Incomplete JSON: array {self.key!r} is not found or not finished")
+
+    def _seek(self, position: int) -> int:
+        buffer = self._buffer
+        length = len(buffer)
+        while position < length:
+            char = buffer[position]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = json.loads(buffer[self._string_start : position + 1])
+                position += 1
+                continue
+            if char == '"':
+                self._in_string = True
+                self._string_start = position
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+            elif char == ":" and self._depth == 1 and self._last_string == self.key:
+                self._state = _ARRAY_START
+                return position + 1
+            elif char not in _WHITESPACE:
+                self._last_string = None
+            position += 1
+        if self._in_string:
+            # keep the unfinished string in the buffer and lex it again with the next chunk
+            self._in_string = False
+            self._escape = False
+            return self._string_start
+        return position
+
+    def _array_start(self, position: int) -> int:
+        buffer = self._buffer
+        while position < len(buffer) and buffer[position] in _WHITESPACE:
+            position += 1
+        if position == len(buffer):
+            return position
+        if buffer[position] != "[":
+            raise ValueError(f"Value of {self.key!r} is not an array")
+        self._state = _ARRAY
+        return position + 1
+
+    def _array(self, position: int, items: List[Any]) -> int:
+        buffer = self._buffer
+        length = len(buffer)
+        while position < length:
+            char = buffer[position]
+            if char in _WHITESPACE or char == ",":
+                position += 1
+                continue
+            if char == "]":
+                self._state = _DONE
+                return position + 1
+            try:
+                item, end = self._json.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # the element is not complete yet
+                return position
+            if not isinstance(item, (dict, list, str)) and (end == length or buffer[end] not in _DELIMITERS):
+                # a number or a literal is complete only before a delimiter, "1.5e" continues as "1.5e10"
+                return position
+            items.append(item)
+            position = end
+        return position
@@ -0,0 +1,111 @@
+from typing import Dict, Iterable, List, Tuple
+
+from feihua.zone import normalize_zone_name
+
+__all__ = ("SyncReport", "plan_changes")
+
+# attributes of a recordset which can be changed in place by update_record
+MUTABLE_ATTRIBUTES = ("records", "ttl", "description")
+
+
+class SyncReport:
+    """Change report of ``Recordsets.sync``"""
+
+    def __init__(self, operations: List[Dict], unchanged: List, dry_run: bool):
+        #: Planned operations in the format of ``Recordsets.bulk_apply``
+        self.operations = operations
+        #: Current recordsets which already match the desired state
+        self.unchanged = unchanged
+        #: Whether the plan was only computed and not applied
+        self.dry_run = dry_run
+        #: Results of the applied operations, empty on dry run
+        self.results = []
+
+    def _by_action(self, action: str) -> List[Dict]:
+        return [operation for operation in self.operations if operation["action"] == action]
+
+    @property
+    def created(self) -> List[Dict]:
+        return self._by_action("create")
+
+    @property
+    def updated(self) -> List[Dict]:
+        return self._by_action("update")
+
+    @property
+    def deleted(self) -> List[Dict]:
+        return self._by_action("delete")
+
+    @property
+    def errors(self) -> List:
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def __repr__(self):
+        return (
+            f"SyncReport(created={len(self.created)}, updated={len(self.updated)}, "
+            f"deleted={len(self.deleted)}, unchanged={len(self.unchanged)}, errors={len(self.errors)})"
+        )
+
+
+def _key(name: str, type: str) -> Tuple[str, str]:
+    # "www.example.com" and "www.example.com." are the same name
+    return normalize_zone_name(name), type.upper()
+
+
+def _fingerprint(attributes: Dict, keys: Iterable[str]) -> Tuple:
+    values = []
+    for key in keys:
+        value = attributes.get(key)
+        if key == "records" and value is not None:
+            value = tuple(sorted(value))
+        values.append(value)
+    return tuple(values)
+
+
+def plan_changes(current: Iterable, desired: Iterable[Dict], prune: bool = False) -> Tuple[List[Dict], List]:
+    """
+    Match the current recordsets with the desired ones on (name, type) through a hash map,
+    so the diff is linear in the number of recordsets.
+    Only the attributes given in a desired recordset are compared, a changed recordset is updated in place.
+    With ``prune`` the recordsets missing from the desired state are deleted, except the ones created by the system.
+    Returns the operations for ``Recordsets.bulk_apply`` and the unchanged recordsets.
+    """
+    existing = {}
+    duplicates = []
+    for recordset in current:
+        key = _key(recordset.name, recordset.type)
+        if key in existing:
+            duplicates.append(recordset)
+        else:
+            existing[key] = recordset
+
+    operations = []
+    unchanged = []
+    seen = set()
+    for item in desired:
+        key = _key(item["name"], item["type"])
+        if key in seen:
+            raise ValueError(f"Duplicate desired recordset {item['name']} {item['type']}")
+        seen.add(key)
+
+        recordset = existing.get(key)
+        if recordset is None:
+            operations.append({"action": "create", "data": dict(item)})
+            continue
+        keys = [attribute for attribute in MUTABLE_ATTRIBUTES if attribute in item]
+        if _fingerprint(item, keys) == _fingerprint(recordset.to_dict(), keys):
+            unchanged.append(recordset)
+        else:
+            data = {attribute: item[attribute] for attribute in keys}
+            operations.append({"action": "update", "recordset_id": recordset.id, "data": data})
+
+    if prune:
+        stale = [recordset for key, recordset in existing.items() if key not in seen] + duplicates
+        for recordset in stale:
+            if not recordset.default:
+                operations.append({"action": "delete", "recordset_id": recordset.id})
+    return operations, unchanged
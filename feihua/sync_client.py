@@ -0,0 +1,155 @@
+import asyncio
+import functools
+import inspect
+import threading
+from types import TracebackType
+from typing import Any, AsyncIterator, Coroutine, Dict, Iterator, Optional, Type
+
+from .client import Client
+
+__all__ = ("SyncClient",)
+
+
+async def _next(iterator: AsyncIterator):
+    return await iterator.__anext__()
+
+
+class _SyncResource:
+    """
+    Blocking view of a resource of the client (``Recordsets``, ``Zones``),
+    coroutine methods return their result and async generators become generators.
+    """
+
+    def __init__(self, sync_client: "SyncClient", resource):
+        self._sync_client = sync_client
+        self._resource = resource
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._resource, name)
+        if name.startswith("_"):
+            return attribute
+        if inspect.isasyncgenfunction(attribute):
+            wrapper = self._sync_client._wrap_iterator(attribute)
+        elif inspect.iscoroutinefunction(attribute):
+            wrapper = self._sync_client._wrap_coroutine(attribute)
+        else:
+            return attribute
+        setattr(self, name, wrapper)
+        return wrapper
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | {name for name in dir(self._resource) if not name.startswith("_")})
+
+
+class SyncClient:
+    """
+    Blocking client for code which cannot await, e.g. threaded WSGI applications.
+    One background thread runs the event loop with a single ``Client``, so all threads
+    calling it share the session and its keep-alive connections.
+    The keyword arguments are passed to ``Client``; ``timeout`` limits the seconds a call waits for its result.
+
+        with SyncClient(access_key_id, secret_access_key, host) as client:
+            recordsets, status = client.recordsets.list(zone_id)
+            for recordset in client.recordsets.iter(zone_id):
+                ...
+    """
+
+    def __init__(
+        self, access_key_id: str, secret_access_key: str, host: str, timeout: Optional[float] = None, **kwargs
+    ) -> None:
+        self.timeout = timeout
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="feihua-sync-client", daemon=True)
+        self._thread.start()
+        self._closed = False
+
+        async def _make_client():
+            return Client(access_key_id=access_key_id, secret_access_key=secret_access_key, host=host, **kwargs)
+
+        try:
+            #: The asynchronous client running in the background loop
+            self.client: Client = self._run(_make_client())
+        except BaseException:
+            self._stop_loop()
+            raise
+        self.recordsets = _SyncResource(self, self.client.recordsets)
+        self.zones = _SyncResource(self, self.client.zones)
+
+    def __enter__(self) -> "SyncClient":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the client and stop the background loop, the calls in progress are finished first.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._run(self.client.close())
+        finally:
+            self._stop_loop()
+
+    def warm_up(self, connections: int = 1) -> int:
+        return self._run(self.client.warm_up(connections))
+
+    def pool_stats(self) -> Dict[str, int]:
+        return self._run(self._pool_stats())
+
+    async def _pool_stats(self) -> Dict[str, int]:
+        return self.client.pool_stats()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def _stop_loop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def _run(self, coroutine: Coroutine) -> Any:
+        if threading.current_thread() is self._thread:
+            coroutine.close()
+            raise RuntimeError("SyncClient can't be called from its own event loop, use SyncClient.client")
+        if self._loop.is_closed():
+            coroutine.close()
+            raise RuntimeError("SyncClient is closed")
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        try:
+            return future.result(self.timeout)
+        except BaseException:
+            # timeout or interrupt of the waiting thread, don't leave the request running
+            future.cancel()
+            raise
+
+    def _wrap_coroutine(self, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            return self._run(method(*args, **kwargs))
+
+        return wrapper
+
+    def _wrap_iterator(self, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs) -> Iterator:
+            iterator = method(*args, **kwargs)
+            try:
+                while True:
+                    try:
+                        yield self._run(_next(iterator))
+                    except StopAsyncIteration:
+                        return
+            finally:
+                if not self._loop.is_closed():
+                    self._run(iterator.aclose())
+
+        return wrapper
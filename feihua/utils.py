@@ -1,10 +1,13 @@
-from typing import Mapping, Tuple
+from typing import Callable, Dict, Mapping, Tuple
 
+SUCCESSFUL_STATUS_CODE = (200, 202, 204)
 
-async def parse_result(response, response_type=None, *, encoding="utf-8"):
+
+async def parse_result(response, response_type=None, *, encoding="utf-8", loads=None):
     """
     Convert the response to native objects by the given response type
     or the auto-detected HTTP content-type.
+    JSON is decoded by ``loads`` from the raw body when it is given.
     It also ensures release of the response object.
     """
     if response_type is None:
@@ -30,7 +33,11 @@ async def parse_result(response, response_type=None, *, encoding="utf-8"):
     #     what = await response.read()
     #     return tarfile.open(mode="r", fileobj=BytesIO(what))
     if "json" == response_type:
-        data = await response.json(encoding=encoding)
+        if loads is None:
+            data = await response.json(encoding=encoding)
+        else:
+            body = await response.read()
+            data = loads(body) if body.strip() else None
     elif "text" == response_type:
         data = await response.text(encoding=encoding)
     else:
@@ -38,6 +45,28 @@ async def parse_result(response, response_type=None, *, encoding="utf-8"):
     return data
 
 
+async def return_single_object(resource: Callable, response, status_code):
+    """
+    Build the resource of a successful response, an empty dict replaces a failed one.
+    """
+    new_response = {}
+    if status_code in SUCCESSFUL_STATUS_CODE:
+        new_response = resource(**response)
+    return new_response, status_code
+
+
+async def return_list_objects(key: str, resources: Callable, response, status_code):
+    """
+    Wrap the items of a successful list response under ``key`` by ``resources``, a failed response is kept.
+    """
+    if status_code in SUCCESSFUL_STATUS_CODE:
+        new_response: Dict = dict(response)
+        items = response.get(key)
+        new_response[key] = resources([] if items is None else items)
+        return new_response, status_code
+    return response, status_code
+
+
 def parse_content_type(ct: str) -> Tuple[str, str, Mapping[str, str]]:
     """
     Decompose the value of HTTP "Content-Type" header into
@@ -0,0 +1,375 @@
+import asyncio
+import time
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from yarl import URL
+
+from feihua.exceptions import ClientError
+from feihua.utils import SUCCESSFUL_STATUS_CODE, return_list_objects, return_single_object
+
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_RESOLVE_TTL = 300.0
+
+__all__ = ("Zone", "Zones", "ZoneTrie", "is_zone_name", "normalize_zone_name")
+
+
+def normalize_zone_name(name: str) -> str:
+    """
+    Zone name as the API returns it: lower case and ending with a dot.
+    """
+    name = name.lower()
+    return name if name.endswith(".") else name + "."
+
+
+def is_zone_name(zone: str) -> bool:
+    """
+    Whether the value is a zone name rather than a zone id, ids never contain dots.
+    """
+    return "." in zone
+
+
+class Zone:
+    """Zone Resource"""
+
+    __slots__ = (
+        "id",
+        "name",
+        "description",
+        "email",
+        "zone_type",
+        "ttl",
+        "serial",
+        "status",
+        "record_num",
+        "pool_id",
+        "project_id",
+        "masters",
+        "links",
+        "created_at",
+        "updated_at",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        description: Optional[str] = None,
+        email: Optional[str] = None,
+        zone_type: Optional[str] = None,
+        ttl: Optional[int] = None,
+        serial: Optional[int] = None,
+        status: Optional[str] = None,
+        record_num: Optional[int] = None,
+        pool_id: Optional[str] = None,
+        project_id: Optional[str] = None,
+        masters: Optional[List[str]] = None,
+        links: Optional[Dict] = None,
+        created_at: Optional[str] = None,
+        updated_at: Optional[str] = None,
+        **kwargs,
+    ):
+        # attributes which are not listed above (private zone routers, tags and alike) are ignored
+        #: The id of the zone
+        self.id = id
+        #: Zone name, ends with a dot
+        self.name = name
+        #: Zone description
+        self.description = description
+        #: Email of the zone administrator
+        self.email = email
+        #: ``public`` or ``private``
+        self.zone_type = zone_type
+        #: Time to live of the SOA record (seconds)
+        self.ttl = ttl
+        #: Serial number of the SOA record
+        self.serial = serial
+        #: Zone status
+        #: Valid values include ``PENDING_CREATE``, ``ACTIVE``, ``PENDING_DELETE``, ``ERROR``
+        self.status = status
+        #: Number of the recordsets of the zone
+        self.record_num = record_num
+        #: ID of the pool the zone belongs to
+        self.pool_id = pool_id
+        #: ID of the project which the zone belongs to
+        self.project_id = project_id
+        #: Master DNS servers
+        self.masters = masters
+        #: Links contains a `self` pertaining to this zone
+        self.links = links
+        #: Timestamp when the zone was created
+        self.created_at = created_at
+        #: Timestamp when the zone was last updated
+        self.updated_at = updated_at
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __str__(self):
+        return f"{self.name}_{self.id}"
+
+
+class _TrieNode:
+    __slots__ = ("children", "zone")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.zone: Optional[Zone] = None
+
+
+class ZoneTrie:
+    """
+    Zones indexed by the reversed labels of their names (``com`` -> ``example`` -> ``www``),
+    so the zone of a domain name is the longest matching suffix found in O(number of labels).
+    """
+
+    def __init__(self, zones: Iterable[Zone] = ()):
+        self._root = _TrieNode()
+        self._size = 0
+        for zone in zones:
+            self.add(zone)
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, name: str):
+        node = self._find_node(name)
+        return node is not None and node.zone is not None
+
+    def __iter__(self) -> Iterator[Zone]:
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node.zone is not None:
+                yield node.zone
+            stack.extend(node.children.values())
+
+    def add(self, zone: Zone):
+        """
+        Add the zone or replace the zone with the same name.
+        """
+        node = self._root
+        for label in _reversed_labels(zone.name):
+            child = node.children.get(label)
+            if child is None:
+                child = node.children[label] = _TrieNode()
+            node = child
+        if node.zone is None:
+            self._size += 1
+        node.zone = zone
+
+    def remove(self, name: str) -> Optional[Zone]:
+        """
+        Remove the zone of the name, the branches left empty are pruned.
+        """
+        path = [self._root]
+        labels = _reversed_labels(name)
+        for label in labels:
+            node = path[-1].children.get(label)
+            if node is None:
+                return None
+            path.append(node)
+        zone = path[-1].zone
+        if zone is None:
+            return None
+        path[-1].zone = None
+        self._size -= 1
+        for label, parent, node in zip(reversed(labels), reversed(path[:-1]), reversed(path[1:])):
+            if node.zone is not None or node.children:
+                break
+            del parent.children[label]
+        return zone
+
+    def get(self, name: str) -> Optional[Zone]:
+        node = self._find_node(name)
+        return None if node is None else node.zone
+
+    def match(self, fqdn: str) -> Optional[Zone]:
+        """
+        The most specific zone the domain name belongs to, None when it is outside of all zones.
+        """
+        node = self._root
+        zone = None
+        for label in _reversed_labels(fqdn):
+            node = node.children.get(label)
+            if node is None:
+                break
+            if node.zone is not None:
+                zone = node.zone
+        return zone
+
+    def clear(self):
+        self._root = _TrieNode()
+        self._size = 0
+
+    def _find_node(self, name: str) -> Optional[_TrieNode]:
+        node = self._root
+        for label in _reversed_labels(name):
+            node = node.children.get(label)
+            if node is None:
+                return None
+        return node
+
+
+def _reversed_labels(name: str) -> List[str]:
+    labels = normalize_zone_name(name)[:-1].split(".")
+    labels.reverse()
+    return labels
+
+
+class Zones:
+    """
+    Zones resource represent list and get zone API responses.
+    Zone names are resolved to ids by ``resolve``, the results are memoized for ``resolve_ttl`` seconds
+    and concurrent lookups of the same name share one request.
+    Domain names are matched to their zones by ``match`` through the ``trie`` of all zones,
+    which is loaded on the first match, reloaded after ``resolve_ttl`` seconds and updated by every listed zone.
+    With ``resolve_ttl`` None the resolved ids and the trie never expire, ``invalidate`` drops them.
+    """
+
+    base_path = "/zones"
+    api_version = "/v2"
+
+    def __init__(self, client, resolve_ttl: Optional[float] = DEFAULT_RESOLVE_TTL) -> None:
+        self.client = client
+        self.resolve_ttl = resolve_ttl
+        # zone name -> (zone id, monotonic expiry)
+        self._ids: Dict[str, Tuple[str, float]] = {}
+        self._resolving: Dict[str, asyncio.Future] = {}
+        #: Zones by the reversed labels of their names
+        self.trie = ZoneTrie()
+        self._trie_expires_at: Optional[float] = None
+        self._loading: Optional[asyncio.Future] = None
+
+    async def list(self, query: Optional[Dict] = None):
+        """
+        One page of zones, ``query`` takes the filters and pagination of the API
+        (``type``, ``name``, ``search_mode``, ``limit``, ``marker``, ``offset``).
+        """
+        response, status_code = await self.client._query_json(
+            api_version=self.api_version,
+            path=self.base_path,
+            query=query,
+            method="GET",
+        )
+        response, status_code = await self._return_list_objects(response, status_code)
+        if status_code in SUCCESSFUL_STATUS_CODE:
+            for zone in response["zones"]:
+                self._remember(zone)
+        return response, status_code
+
+    async def get(self, zone_id: str):
+        response, status_code = await self.client._query_json(
+            api_version=self.api_version,
+            path=self.base_path + "/" + zone_id,
+            method="GET",
+        )
+        response, status_code = await self._return_single_object(response, status_code)
+        if status_code in SUCCESSFUL_STATUS_CODE:
+            self._remember(response)
+        return response, status_code
+
+    async def iter(self, query: Optional[Dict] = None, page_size: int = DEFAULT_PAGE_SIZE) -> AsyncIterator[Zone]:
+        """
+        Iterate over all zones following the ``links.next`` pagination.
+        """
+        query = dict(query or {})
+        query["limit"] = page_size
+        while True:
+            response, status_code = await self.list(query)
+            if status_code not in SUCCESSFUL_STATUS_CODE:
+                return
+            zones = response["zones"]
+            for zone in zones:
+                yield zone
+
+            next_link = (response.get("links") or {}).get("next")
+            if not next_link or not zones:
+                return
+            query = dict(URL(next_link).query)
+
+    async def resolve(self, name: str) -> str:
+        """
+        Id of the zone of the name, raise ``ClientError`` 404 when there is no such zone.
+        """
+        name = normalize_zone_name(name)
+        cached = self._ids.get(name)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
+        task = self._resolving.get(name)
+        if task is None:
+            task = self._resolving[name] = asyncio.ensure_future(self._lookup(name))
+            task.add_done_callback(lambda _: self._resolving.pop(name, None))
+        # a cancelled caller doesn't cancel the lookup the other callers wait for
+        return await asyncio.shield(task)
+
+    async def match(self, fqdn: str) -> Optional[Zone]:
+        """
+        The most specific zone the domain name belongs to, e.g. ``b.example.com.`` for ``a.b.example.com.``
+        when both ``example.com.`` and ``b.example.com.`` are hosted. None when no zone matches.
+        """
+        expires_at = self._trie_expires_at
+        if expires_at is None or expires_at <= time.monotonic():
+            await self.load()
+        return self.trie.match(fqdn)
+
+    async def load(self):
+        """
+        Load all zones into the ``trie``, concurrent calls share one listing.
+        """
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._load())
+            self._loading.add_done_callback(self._forget_loading)
+        await asyncio.shield(self._loading)
+
+    def invalidate(self, name: Optional[str] = None):
+        """
+        Forget the resolved id and the trie entry of the zone name, or of all names.
+        """
+        if name is None:
+            self._ids.clear()
+            self.trie.clear()
+            self._trie_expires_at = None
+        else:
+            self._ids.pop(normalize_zone_name(name), None)
+            self.trie.remove(name)
+
+    async def _load(self):
+        zones = [zone async for zone in self.iter()]
+        # swapped at once, so concurrent matches never see a partially loaded trie
+        self.trie = ZoneTrie(zones)
+        self._trie_expires_at = self._expires_at()
+
+    def _forget_loading(self, task: asyncio.Future):
+        if self._loading is task:
+            self._loading = None
+
+    async def _lookup(self, name: str) -> str:
+        response, status_code = await self.list({"name": name, "search_mode": "equal"})
+        if status_code in SUCCESSFUL_STATUS_CODE:
+            for zone in response["zones"]:
+                if normalize_zone_name(zone.name) == name:
+                    return zone.id
+        raise ClientError(status=404, data={"message": f"Zone {name} does not exist."})
+
+    def _remember(self, zone: Zone):
+        if not zone.name:
+            return
+        self._ids[normalize_zone_name(zone.name)] = (zone.id, self._expires_at())
+        if self._trie_expires_at is not None:
+            self.trie.add(zone)
+
+    def _expires_at(self) -> float:
+        return float("inf") if self.resolve_ttl is None else time.monotonic() + self.resolve_ttl
+
+    @staticmethod
+    async def _return_single_object(response, status_code):
+        return await return_single_object(Zone, response, status_code)
+
+    @staticmethod
+    async def _return_list_objects(response, status_code):
+        return await return_list_objects("zones", _zone_list, response, status_code)
+
+
+def _zone_list(zones: List[Dict]) -> List[Zone]:
+    return [Zone(**zone) for zone in zones]
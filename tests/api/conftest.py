@@ -10,3 +10,9 @@ ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 def data_recordsets():
     with open(os.path.join(ROOT_DIR, "data/api_recordsets_data.json")) as f:
         return json.load(f)
+
+
+@pytest.fixture
+def data_zones():
+    with open(os.path.join(ROOT_DIR, "data/api_zones_data.json")) as f:
+        return json.load(f)
@@ -1,8 +1,11 @@
+import asyncio
+import json
 from http import HTTPStatus
 from unittest import mock
 
 import pytest
 
+from feihua.cache import ZoneCache
 from feihua.exceptions import ClientError
 from feihua.recordset import Recordset
 from tests.identical import identical
@@ -230,3 +233,333 @@ async def test_api_find_recordets(client, data_recordsets, name_data, expected_s
         response, status_code = await client.recordsets.find_records(zone_id="example", query=query)
         assert identical(response, data_recordsets[name_data])
         assert status_code == expected_status
+
+
+def _paginate(data, page_size):
+    recordsets = data["recordsets"]
+    pages = []
+    for offset in range(0, len(recordsets), page_size):
+        links = {"self": f"https://example.com/v2/zones/example/recordsets?limit={page_size}"}
+        if offset + page_size < len(recordsets):
+            marker = recordsets[offset + page_size - 1]["id"]
+            links["next"] = f"https://example.com/v2/zones/example/recordsets?limit={page_size}&marker={marker}"
+        pages.append(
+            (
+                {"links": links, "recordsets": recordsets[offset : offset + page_size], "metadata": data["metadata"]},
+                HTTPStatus.OK,
+            )
+        )
+    return pages
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 3])
+@pytest.mark.asyncio
+async def test_api_iter(client, data_recordsets, page_size):
+    data = data_recordsets["data_list_right"]
+    pages = _paginate(data, page_size)
+
+    with mock.patch("feihua.client.Client._query_json", side_effect=pages) as mock_do_query:
+        recordsets = [recordset async for recordset in client.recordsets.iter(zone_id="example", page_size=page_size)]
+        assert len(recordsets) == len(data["recordsets"])
+        for recordset, expected in zip(recordsets, data["recordsets"]):
+            assert isinstance(recordset, Recordset)
+            assert identical(recordset, expected)
+        assert mock_do_query.call_count == len(pages)
+        assert mock_do_query.call_args_list[0].kwargs["query"] == {"limit": page_size}
+        for call, (previous, _) in zip(mock_do_query.call_args_list[1:], pages):
+            assert call.kwargs["query"]["marker"] == previous["recordsets"][-1]["id"]
+
+
+@pytest.mark.asyncio
+async def test_api_iter_stop_early(client, data_recordsets):
+    pages = _paginate(data_recordsets["data_list_right"], 1)
+
+    with mock.patch("feihua.client.Client._query_json", side_effect=pages) as mock_do_query:
+        async for recordset in client.recordsets.iter(zone_id="example", page_size=1):
+            break
+        assert mock_do_query.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_api_iter_empty(client, data_recordsets):
+    with mock.patch("feihua.client.Client._query_json") as mock_do_query:
+        mock_do_query.return_value = (data_recordsets["data_list_empty"], HTTPStatus.OK)
+        recordsets = [recordset async for recordset in client.recordsets.iter(zone_id="example")]
+        assert recordsets == []
+        assert mock_do_query.call_count == 1
+
+
+def _offset_pages(data):
+    async def query_json(*args, query=None, **kwargs):
+        offset, limit = query["offset"], query["limit"]
+        page = {**data, "recordsets": data["recordsets"][offset : offset + limit]}
+        return page, HTTPStatus.OK
+
+    return query_json
+
+
+@pytest.mark.parametrize(
+    "page_size, concurrency",
+    [
+        (1, 1),
+        (1, 2),
+        (2, 8),
+        (3, 2),
+    ],
+)
+@pytest.mark.asyncio
+async def test_api_iter_parallel(client, data_recordsets, page_size, concurrency):
+    data = data_recordsets["data_list_right"]
+
+    with mock.patch("feihua.client.Client._query_json", side_effect=_offset_pages(data)) as mock_do_query:
+        recordsets = [
+            recordset
+            async for recordset in client.recordsets.iter_parallel(
+                zone_id="example", page_size=page_size, concurrency=concurrency
+            )
+        ]
+        assert len(recordsets) == len(data["recordsets"])
+        for recordset, expected in zip(recordsets, data["recordsets"]):
+            assert identical(recordset, expected)
+        offsets = sorted(call.kwargs["query"]["offset"] for call in mock_do_query.call_args_list)
+        assert offsets == list(range(0, data["metadata"]["total_count"], page_size))
+
+
+@pytest.mark.asyncio
+async def test_api_iter_parallel_stop_early(client, data_recordsets):
+    data = data_recordsets["data_list_right"]
+
+    with mock.patch("feihua.client.Client._query_json", side_effect=_offset_pages(data)) as mock_do_query:
+        async for recordset in client.recordsets.iter_parallel(zone_id="example", page_size=1, concurrency=1):
+            assert identical(recordset, data["recordsets"][0])
+            break
+        assert mock_do_query.call_count <= 2
+
+
+@pytest.mark.asyncio
+async def test_api_iter_parallel_prefetch(client, data_recordsets):
+    data = data_recordsets["data_list_right"]
+
+    with mock.patch("feihua.client.Client._query_json", side_effect=_offset_pages(data)) as mock_do_query:
+        async for recordset in client.recordsets.iter_parallel(zone_id="example", page_size=1, concurrency=1):
+            # the second page is requested while the first one is consumed
+            await asyncio.sleep(0)
+            assert mock_do_query.call_count == 2
+            break
+
+
+@pytest.mark.asyncio
+async def test_api_iter_parallel_bad_concurrency(client):
+    with pytest.raises(ValueError):
+        async for recordset in client.recordsets.iter_parallel(zone_id="example", concurrency=0):
+            pass
+
+
+@pytest.mark.parametrize("concurrency", [1, 3, 10])
+@pytest.mark.asyncio
+async def test_api_bulk_apply(client, data_recordsets, concurrency):
+    created = data_recordsets["data_for_create_record"]["right_record"]
+    updated = data_recordsets["data_for_update_record"]["change_record"]
+    deleted = data_recordsets["data_for_delete_record"]["delete_exist_id"]
+    error = "This record set does not exist."
+    in_flight = 0
+    max_in_flight = 0
+
+    async def query_json(*args, method=None, path=None, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        if path.endswith("missing"):
+            raise ClientError(status=HTTPStatus.BAD_REQUEST, data={"message": error})
+        expected = {"POST": created, "PUT": updated, "DELETE": deleted}[method]["expected"]
+        return expected, HTTPStatus.ACCEPTED
+
+    operations = [
+        {"action": "create", "data": created["received"]},
+        {"action": "update", "recordset_id": "example", "data": updated["received"]},
+        {"action": "delete", "recordset_id": "missing"},
+        {"action": "delete", "recordset_id": "example"},
+        {"action": "rename", "recordset_id": "example"},
+    ] * 4
+
+    with mock.patch("feihua.client.Client._query_json", side_effect=query_json):
+        results = await client.recordsets.bulk_apply(zone_id="example", operations=operations, concurrency=concurrency)
+
+    assert max_in_flight <= concurrency
+    assert [result.index for result in results] == list(range(len(operations)))
+    for result, operation in zip(results, operations):
+        assert result.operation is operation
+        if operation["action"] == "rename":
+            assert not result.ok
+            assert result.status == 400
+        elif operation.get("recordset_id") == "missing":
+            assert not result.ok
+            assert result.error.message == error
+            assert result.status == HTTPStatus.BAD_REQUEST
+        else:
+            assert result.ok
+            assert isinstance(result.response, Recordset)
+            assert result.status == HTTPStatus.ACCEPTED
+
+
+@pytest.mark.asyncio
+async def test_api_iter_bulk_apply(client, data_recordsets):
+    deleted = data_recordsets["data_for_delete_record"]["delete_exist_id"]["expected"]
+    operations = [{"action": "delete", "recordset_id": str(index)} for index in range(5)]
+
+    with mock.patch("feihua.client.Client._query_json") as mock_do_query:
+        mock_do_query.return_value = (deleted, HTTPStatus.ACCEPTED)
+        indexes = [
+            result.index
+            async for result in client.recordsets.iter_bulk_apply(
+                zone_id="example", operations=operations, concurrency=2
+            )
+        ]
+    assert sorted(indexes) == list(range(5))
+
+
+@pytest.mark.asyncio
+async def test_api_list_zone_cache(client, data_recordsets):
+    data = data_recordsets["data_list_right"]
+    created = data_recordsets["data_for_create_record"]["right_record"]
+    client.zone_cache = ZoneCache()
+
+    with mock.patch("feihua.client.Client._query_json") as mock_do_query:
+        mock_do_query.return_value = (data, HTTPStatus.OK)
+        await client.recordsets.list(zone_id="example")
+        response, status_code = await client.recordsets.list(zone_id="example")
+        assert mock_do_query.call_count == 1
+        assert status_code == HTTPStatus.OK
+        assert identical(response, data)
+
+        mock_do_query.return_value = (created["expected"], HTTPStatus.ACCEPTED)
+        await client.recordsets.create_record(zone_id="example", data=created["received"])
+        response, _ = await client.recordsets.list(zone_id="example")
+        assert response["recordsets"][-1].id == created["expected"]["id"]
+        assert response["metadata"]["total_count"] == data["metadata"]["total_count"] + 1
+
+        await client.recordsets.delete_record(zone_id="example", recordset_id=data["recordsets"][0]["id"])
+        response, _ = await client.recordsets.list(zone_id="example")
+        assert data["recordsets"][0]["id"] not in [recordset.id for recordset in response["recordsets"]]
+        assert mock_do_query.call_count == 3
+
+
+@pytest.mark.parametrize("dry_run", [True, False])
+@pytest.mark.asyncio
+async def test_api_sync(client, data_recordsets, dry_run):
+    data = data_recordsets["data_list_right"]
+    created = data_recordsets["data_for_create_record"]["right_record"]["expected"]
+    row = data["recordsets"][0]
+    desired = [
+        {"name": "new.example.", "type": "A", "records": ["10.200.200.10"]},
+        {"name": row["name"], "type": row["type"], "records": row["records"]},
+    ]
+
+    async def query_json(*args, method=None, **kwargs):
+        if method == "GET":
+            return data, HTTPStatus.OK
+        return created, HTTPStatus.ACCEPTED
+
+    with mock.patch("feihua.client.Client._query_json", side_effect=query_json) as mock_do_query:
+        report = await client.recordsets.sync(zone_id="example", desired=desired, prune=True, dry_run=dry_run)
+
+    assert len(report.created) == 1
+    assert len(report.updated) == 0
+    assert len(report.deleted) == len(data["recordsets"]) - 1
+    assert len(report.unchanged) == 1
+    assert report.ok
+    methods = [call.kwargs["method"] for call in mock_do_query.call_args_list]
+    if dry_run:
+        assert methods == ["GET"]
+        assert report.results == []
+    else:
+        assert sorted(methods) == sorted(["GET", "POST"] + ["DELETE"] * len(report.deleted))
+        assert len(report.results) == len(report.operations)
+
+
+class StreamResponse:
+    def __init__(self, body):
+        self._body = body
+        self.content = self
+
+    async def iter_chunked(self, size):
+        for position in range(0, len(self._body), size):
+            yield self._body[position : position + size]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        pass
+
+
+@pytest.mark.parametrize("chunk_size", [7, 1024])
+@pytest.mark.asyncio
+async def test_api_stream(client, data_recordsets, chunk_size):
+    data = data_recordsets["data_list_right"]
+    body = json.dumps(data).encode("utf-8")
+
+    with mock.patch("feihua.client.Client._query", return_value=StreamResponse(body)) as mock_query:
+        recordsets = [
+            recordset
+            async for recordset in client.recordsets.stream(
+                zone_id="example", query={"limit": 500}, chunk_size=chunk_size
+            )
+        ]
+        assert mock_query.call_args.kwargs["query"] == {"limit": 500}
+    assert len(recordsets) == len(data["recordsets"])
+    for recordset, expected in zip(recordsets, data["recordsets"]):
+        assert isinstance(recordset, Recordset)
+        assert identical(recordset, expected)
+
+
+@pytest.mark.asyncio
+async def test_api_bulk_apply_malformed_and_timeout(client, data_recordsets):
+    deleted = data_recordsets["data_for_delete_record"]["delete_exist_id"]["expected"]
+
+    async def query_json(*args, path=None, **kwargs):
+        if path.endswith("slow"):
+            raise asyncio.TimeoutError()
+        return deleted, HTTPStatus.ACCEPTED
+
+    operations = [
+        {"action": "delete"},
+        {"action": "update", "recordset_id": "example"},
+        {"action": "delete", "recordset_id": "slow"},
+    ] + [{"action": "delete", "recordset_id": str(index)} for index in range(10)]
+
+    with mock.patch("feihua.client.Client._query_json", side_effect=query_json):
+        results = await client.recordsets.bulk_apply(zone_id="example", operations=operations, concurrency=4)
+
+    assert [result.status for result in results[:3]] == [400, 400, 503]
+    assert not any(result.ok for result in results[:3])
+    assert all(result.ok for result in results[3:])
+    assert len(results) == len(operations)
+
+
+@pytest.mark.asyncio
+async def test_api_bulk_apply_bad_operations(client, data_recordsets):
+    deleted = data_recordsets["data_for_delete_record"]["delete_exist_id"]["expected"]
+
+    async def query_json(*args, path=None, **kwargs):
+        if path.endswith("boom"):
+            raise RuntimeError("boom")
+        return deleted, HTTPStatus.ACCEPTED
+
+    operations = [
+        "delete",
+        {"action": "update", "recordset_id": "example", "data": None},
+        {"action": "create", "data": ["www.example.com."]},
+        {"action": "delete", "recordset_id": 1},
+        {"action": "delete", "recordset_id": "boom"},
+        {"action": "delete", "recordset_id": "example"},
+    ]
+    with mock.patch("feihua.client.Client._query_json", side_effect=query_json):
+        results = await client.recordsets.bulk_apply(zone_id="example", operations=operations, concurrency=2)
+
+    assert [result.status for result in results] == [400, 400, 400, 400, None, HTTPStatus.ACCEPTED]
+    assert isinstance(results[4].error, RuntimeError)
+    assert [result.ok for result in results] == [False] * 5 + [True]
+    assert "None" in repr(results[0])
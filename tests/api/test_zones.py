@@ -0,0 +1,175 @@
+import asyncio
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+
+from feihua.exceptions import ClientError
+from feihua.zone import Zone
+
+
+@pytest.mark.asyncio
+async def test_api_list_zones(client, data_zones):
+    with mock.patch("feihua.client.Client._query_json") as mock_do_query:
+        mock_do_query.return_value = (data_zones["data_list_zones"], HTTPStatus.OK)
+        response, status_code = await client.zones.list({"type": "public"})
+        assert status_code == HTTPStatus.OK
+        assert [zone.name for zone in response["zones"]] == ["example.com.", "example.org."]
+        assert all(isinstance(zone, Zone) for zone in response["zones"])
+        assert response["metadata"] == {"total_count": 3}
+        assert mock_do_query.call_args.kwargs["query"] == {"type": "public"}
+
+
+@pytest.mark.asyncio
+async def test_api_get_zone(client, data_zones):
+    data = data_zones["data_list_zones"]["zones"][0]
+    with mock.patch("feihua.client.Client._query_json") as mock_do_query:
+        mock_do_query.return_value = (data, HTTPStatus.OK)
+        zone, status_code = await client.zones.get(data["id"])
+        assert status_code == HTTPStatus.OK
+        assert zone.to_dict() == data
+        assert mock_do_query.call_args.kwargs["path"] == "/zones/" + data["id"]
+
+
+@pytest.mark.asyncio
+async def test_api_iter_zones(client, data_zones):
+    pages = [
+        (data_zones["data_list_zones"], HTTPStatus.OK),
+        (data_zones["data_list_zones_last_page"], HTTPStatus.OK),
+    ]
+    with mock.patch("feihua.client.Client._query_json", side_effect=pages) as mock_do_query:
+        names = [zone.name async for zone in client.zones.iter(page_size=2)]
+        assert names == ["example.com.", "example.org.", "example.net."]
+        assert mock_do_query.call_args_list[1].kwargs["query"] == {
+            "type": "public",
+            "limit": "500",
+            "marker": "2c9eb155587228570158722b6ac30007",
+        }
+
+
+@pytest.mark.asyncio
+async def test_api_resolve_zone(client, data_zones):
+    release = asyncio.Event()
+
+    async def query_json(**kwargs):
+        await release.wait()
+        return data_zones["data_list_zones"], HTTPStatus.OK
+
+    with mock.patch("feihua.client.Client._query_json", side_effect=query_json) as mock_do_query:
+        lookups = [asyncio.ensure_future(client.zones.resolve(name)) for name in ("Example.ORG", "example.org.")]
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(*lookups) == ["2c9eb155587228570158722b6ac30007"] * 2
+        assert mock_do_query.call_count == 1
+        assert mock_do_query.call_args.kwargs["query"] == {"name": "example.org.", "search_mode": "equal"}
+
+        # memoized, zones seen in the listing included
+        assert await client.zones.resolve("example.com") == "2c9eb155587194ec01587224c9f90149"
+        assert mock_do_query.call_count == 1
+
+        client.zones.invalidate("example.org.")
+        await client.zones.resolve("example.org.")
+        assert mock_do_query.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_api_resolve_zone_expired(client, data_zones):
+    client.zones.resolve_ttl = 10
+    with mock.patch("feihua.client.Client._query_json") as mock_do_query:
+        mock_do_query.return_value = (data_zones["data_list_zones"], HTTPStatus.OK)
+        with mock.patch("feihua.zone.time.monotonic", return_value=100.0):
+            await client.zones.resolve("example.com.")
+        with mock.patch("feihua.zone.time.monotonic", return_value=109.0):
+            await client.zones.resolve("example.com.")
+        assert mock_do_query.call_count == 1
+        with mock.patch("feihua.zone.time.monotonic", return_value=111.0):
+            await client.zones.resolve("example.com.")
+        assert mock_do_query.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_api_resolve_missing_zone(client, data_zones):
+    with mock.patch("feihua.client.Client._query_json") as mock_do_query:
+        mock_do_query.return_value = (data_zones["data_list_zones_empty"], HTTPStatus.OK)
+        with pytest.raises(ClientError) as e:
+            await client.zones.resolve("missing.com.")
+        assert e.value.status == 404
+        assert client.zones._resolving == {}
+
+
+@pytest.mark.asyncio
+async def test_api_recordsets_by_zone_name(client, data_zones, data_recordsets):
+    pages = [
+        (data_zones["data_list_zones"], HTTPStatus.OK),
+        (data_recordsets["data_list_right"], HTTPStatus.OK),
+    ]
+    with mock.patch("feihua.client.Client._query_json", side_effect=pages) as mock_do_query:
+        response, status_code = await client.recordsets.list("example.com.")
+        assert status_code == HTTPStatus.OK
+        assert mock_do_query.call_args.kwargs["path"] == "/zones/2c9eb155587194ec01587224c9f90149/recordsets"
+
+
+@pytest.mark.asyncio
+async def test_api_find_by_fqdn(client, data_zones, data_recordsets):
+    pages = [
+        (data_zones["data_list_zones"], HTTPStatus.OK),
+        (data_zones["data_list_zones_last_page"], HTTPStatus.OK),
+        (data_recordsets["data_for_find_records"], HTTPStatus.OK),
+        (data_recordsets["data_for_find_records"], HTTPStatus.OK),
+    ]
+    with mock.patch("feihua.client.Client._query_json", side_effect=pages) as mock_do_query:
+        response, status_code = await client.recordsets.find_by_fqdn("www.a.example.net", "A")
+        assert status_code == HTTPStatus.OK
+        assert mock_do_query.call_args.kwargs["path"] == "/zones/ff8080825b8fc86c015b94bc6f8712c3/recordsets"
+        assert mock_do_query.call_args.kwargs["query"] == {
+            "name": "www.a.example.net.",
+            "search_mode": "equal",
+            "type": "A",
+        }
+
+        # the zones are listed once
+        await client.recordsets.find_by_fqdn("example.com.")
+        assert mock_do_query.call_count == 4
+        assert mock_do_query.call_args.kwargs["path"] == "/zones/2c9eb155587194ec01587224c9f90149/recordsets"
+
+        with pytest.raises(ClientError) as e:
+            await client.recordsets.find_by_fqdn("example.ru.")
+        assert e.value.status == 404
+        assert mock_do_query.call_count == 4
+
+
+@pytest.mark.asyncio
+async def test_api_zones_match_reloads(client, data_zones):
+    client.zones.resolve_ttl = 10
+    with mock.patch("feihua.client.Client._query_json") as mock_do_query:
+        mock_do_query.return_value = (data_zones["data_list_zones_last_page"], HTTPStatus.OK)
+        with mock.patch("feihua.zone.time.monotonic", return_value=100.0):
+            assert (await client.zones.match("www.example.net.")).name == "example.net."
+            assert await client.zones.match("www.example.com.") is None
+        assert mock_do_query.call_count == 1
+
+        mock_do_query.return_value = (data_zones["data_list_zones"]["zones"][0], HTTPStatus.OK)
+        with mock.patch("feihua.zone.time.monotonic", return_value=106.0):
+            await client.zones.get("2c9eb155587194ec01587224c9f90149")
+            # a zone seen by get is added to the trie
+            assert (await client.zones.match("www.example.com.")).id == "2c9eb155587194ec01587224c9f90149"
+        assert mock_do_query.call_count == 2
+
+        mock_do_query.return_value = (data_zones["data_list_zones_empty"], HTTPStatus.OK)
+        with mock.patch("feihua.zone.time.monotonic", return_value=111.0):
+            assert await client.zones.match("www.example.net.") is None
+        assert mock_do_query.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_api_zones_never_expire(client, data_zones):
+    client.zones.resolve_ttl = None
+    with mock.patch("feihua.client.Client._query_json") as mock_do_query:
+        mock_do_query.return_value = (data_zones["data_list_zones_last_page"], HTTPStatus.OK)
+        with mock.patch("feihua.zone.time.monotonic", return_value=100.0):
+            assert (await client.zones.match("www.example.net.")).name == "example.net."
+        with mock.patch("feihua.zone.time.monotonic", return_value=1e9):
+            # both the trie and the resolved ids are kept
+            assert (await client.zones.match("www.example.net.")).name == "example.net."
+            await client.zones.resolve("example.net.")
+        assert mock_do_query.call_count == 1
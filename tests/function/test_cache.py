@@ -0,0 +1,92 @@
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+
+from feihua.cache import ZoneCache
+from feihua.recordset import RecordsetList, Recordsets
+
+
+@pytest.fixture
+def list_response(event_loop, data_recordsets_function):
+    response, _ = event_loop.run_until_complete(
+        Recordsets._return_list_objects(data_recordsets_function["data_list_recordsets"], HTTPStatus.OK)
+    )
+    return response
+
+
+def test_cache_get_set(list_response):
+    cache = ZoneCache()
+    assert cache.get("zone") is None
+    cache.set("zone", list_response, HTTPStatus.OK)
+    response, status = cache.get("zone")
+    assert status == HTTPStatus.OK
+    assert response["recordsets"].raw == list_response["recordsets"].raw
+    assert isinstance(response["recordsets"], RecordsetList)
+    assert response["recordsets"] is not list_response["recordsets"]
+    assert response["metadata"] == list_response["metadata"]
+
+
+def test_cache_results_are_not_shared(list_response):
+    cache = ZoneCache()
+    cache.set("zone", list_response, HTTPStatus.OK)
+    ttl = list_response["recordsets"][0].ttl
+    response, _ = cache.get("zone")
+    response["recordsets"][0].ttl = ttl + 1
+    response["recordsets"].raw.pop()
+    response, _ = cache.get("zone")
+    assert response["recordsets"][0].ttl == ttl
+    assert len(response["recordsets"]) == len(list_response["recordsets"])
+
+
+def test_cache_ttl(list_response):
+    cache = ZoneCache(ttl=10)
+    with mock.patch("feihua.cache.time.monotonic", return_value=100):
+        cache.set("zone", list_response, HTTPStatus.OK)
+    with mock.patch("feihua.cache.time.monotonic", return_value=109):
+        assert "zone" in cache
+    with mock.patch("feihua.cache.time.monotonic", return_value=110):
+        assert cache.get("zone") is None
+    assert len(cache) == 0
+
+
+def test_cache_lru(list_response):
+    cache = ZoneCache(maxsize=2)
+    cache.set("zone-1", list_response, HTTPStatus.OK)
+    cache.set("zone-2", list_response, HTTPStatus.OK)
+    cache.get("zone-1")
+    cache.set("zone-3", list_response, HTTPStatus.OK)
+    assert "zone-1" in cache
+    assert "zone-2" not in cache
+    assert "zone-3" in cache
+
+
+def test_cache_write_through(list_response):
+    cache = ZoneCache()
+    cache.set("zone", list_response, HTTPStatus.OK)
+    total_count = list_response["metadata"]["total_count"]
+    first, second = list_response["recordsets"][:2]
+
+    cache.remove_recordset("zone", first.id)
+    response, _ = cache.get("zone")
+    assert first.id not in [recordset.id for recordset in response["recordsets"]]
+    assert response["metadata"]["total_count"] == total_count - 1
+
+    cache.put_recordset("zone", first)
+    cache.put_recordset("zone", second)
+    response, _ = cache.get("zone")
+    assert [recordset.id for recordset in response["recordsets"]].count(second.id) == 1
+    assert response["metadata"]["total_count"] == total_count
+    assert list_response["metadata"]["total_count"] == total_count
+
+
+def test_cache_write_through_missing_zone(list_response):
+    cache = ZoneCache()
+    cache.put_recordset("zone", list_response["recordsets"][0])
+    cache.remove_recordset("zone", "example")
+    assert "zone" not in cache
+
+
+def test_cache_bad_maxsize():
+    with pytest.raises(ValueError):
+        ZoneCache(maxsize=0)
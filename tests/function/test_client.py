@@ -1,14 +1,19 @@
+import asyncio
+import copy
 import json
 from asyncio import TimeoutError
 from http import HTTPStatus
 from unittest import mock
 
 import pytest
+from aiohttp import ClientSession
 from aiohttp.client_exceptions import ClientConnectionError
 from aiohttp.test_utils import make_mocked_coro
 from yarl import URL
 
+from feihua.client import Client
 from feihua.exceptions import ClientError
+from feihua.retry import RetryPolicy
 from feihua.utils import _AsyncCM
 from tests.identical import identical
 
@@ -140,3 +145,166 @@ async def test_do_query_catch_exaptions(client, data_recordsets_function, name_d
             assert excinfo.value.message == json.dumps(expected_data)
         else:
             assert excinfo.value.message == expected_data["message"]
+
+
+@pytest.mark.parametrize(
+    "method, statuses, expected_calls, error",
+    [
+        ("GET", [HTTPStatus.SERVICE_UNAVAILABLE, HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.OK], 3, None),
+        ("DELETE", [HTTPStatus.BAD_GATEWAY, HTTPStatus.OK], 2, None),
+        ("GET", [HTTPStatus.SERVICE_UNAVAILABLE] * 3, 3, HTTPStatus.SERVICE_UNAVAILABLE),
+        ("GET", [HTTPStatus.BAD_REQUEST], 1, HTTPStatus.BAD_REQUEST),
+        ("POST", [HTTPStatus.SERVICE_UNAVAILABLE], 1, HTTPStatus.SERVICE_UNAVAILABLE),
+    ],
+)
+@pytest.mark.asyncio
+async def test_do_query_retry(client, data_recordsets_function, method, statuses, expected_calls, error):
+    responses = [
+        MockResponse(
+            data_recordsets_function["data_single_recordset" if status < 400 else "data_error_text"],
+            status,
+            headers={"content-type": "application/json", "Retry-After": "0"},
+        )
+        for status in statuses
+    ]
+    client.retry_policy = RetryPolicy(attempts=3)
+    with mock.patch(
+        "aiohttp.ClientSession.request", new_callable=mock.AsyncMock, side_effect=responses
+    ) as mock_request, mock.patch.object(client.signer, "sign", wraps=client.signer.sign) as mock_sign:
+        if error:
+            with pytest.raises(ClientError) as excinfo:
+                await client._do_query(api_version="/v2", path="/example", method=method)
+            assert excinfo.value.status == error
+        else:
+            response = await client._do_query(api_version="/v2", path="/example", method=method)
+            assert response.status == HTTPStatus.OK
+        assert mock_request.call_count == expected_calls
+        assert mock_sign.call_count == expected_calls
+
+
+@pytest.mark.asyncio
+async def test_do_query_retry_connection_error(client, data_recordsets_function):
+    expected_data = data_recordsets_function["data_single_recordset"]
+    response = MockResponse(expected_data, HTTPStatus.OK, headers={"content-type": "application/json"})
+    client.retry_policy = RetryPolicy(attempts=2, backoff=0)
+    with mock.patch(
+        "aiohttp.ClientSession.request", new_callable=mock.AsyncMock, side_effect=[ClientConnectionError(), response]
+    ) as mock_request:
+        assert await client._do_query(api_version="/v2", path="/example") is response
+        assert mock_request.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_do_query_retry_deadline_passed(client, data_recordsets_function):
+    response = MockResponse(
+        data_recordsets_function["data_error_text"],
+        HTTPStatus.SERVICE_UNAVAILABLE,
+        headers={"content-type": "application/json"},
+    )
+    client.retry_policy = RetryPolicy(attempts=3, backoff=0, deadline=1.0)
+    loop_times = [0.0, 0.0, 0.5, 2.0]
+
+    async def sleep(delay):
+        pass
+
+    # the backoff sleep overshoots the deadline, the retry must not go out without a timeout
+    with mock.patch(
+        "aiohttp.ClientSession.request", new_callable=mock.AsyncMock, return_value=response
+    ) as mock_request, mock.patch("feihua.client.asyncio.sleep", side_effect=sleep), mock.patch.object(
+        asyncio.get_running_loop(),
+        "time",
+        side_effect=lambda: loop_times.pop(0) if len(loop_times) > 1 else loop_times[0],
+    ):
+        with pytest.raises(asyncio.TimeoutError):
+            await client._do_query(api_version="/v2", path="/example")
+    assert mock_request.call_count == 1
+    assert mock_request.call_args.kwargs["timeout"].total == 1.0
+
+
+@pytest.mark.asyncio
+async def test_pool_settings():
+    client = Client(
+        access_key_id="example",
+        secret_access_key="example",
+        host="dns.zone.ru",
+        limit=10,
+        limit_per_host=5,
+        keepalive_timeout=30,
+        ttl_dns_cache=None,
+    )
+    async with client:
+        assert client.connector.limit == 10
+        assert client.connector.limit_per_host == 5
+        assert client.connector.use_dns_cache is False
+        assert client.pool_stats() == {"limit": 10, "limit_per_host": 5, "in_use": 0, "idle": 0, "waiting": 0}
+
+
+@pytest.mark.asyncio
+async def test_shared_session_connector(client):
+    other = Client(access_key_id="example", secret_access_key="example", host="dns.zone.ru", session=client.session)
+    assert other.connector is client.connector
+
+
+@pytest.mark.asyncio
+async def test_close_given_session():
+    session = ClientSession()
+    async with Client(access_key_id="example", secret_access_key="example", host="dns.zone.ru", session=session):
+        pass
+    assert session.closed
+
+    session = ClientSession()
+    client = Client(
+        access_key_id="example", secret_access_key="example", host="dns.zone.ru", session=session, close_session=False
+    )
+    await client.close()
+    assert not session.closed
+    await session.close()
+
+
+@pytest.mark.asyncio
+async def test_warm_up(client):
+    response = MockResponse(None, HTTPStatus.UNAUTHORIZED, headers={})
+    with mock.patch("aiohttp.ClientSession.head", side_effect=[response, response, ClientConnectionError()]) as head:
+        assert await client.warm_up(3) == 2
+        assert head.call_count == 3
+        assert head.call_args.args[0] == URL("https://dns.zone.ru/")
+
+
+@pytest.mark.asyncio
+async def test_query_json_coalesce(client, data_recordsets_function):
+    expected_data = data_recordsets_function["data_list_recordsets"]
+    client.coalesce_requests = True
+    release = asyncio.Event()
+
+    async def read_json(query_kwargs):
+        await release.wait()
+        return copy.deepcopy(expected_data), HTTPStatus.OK
+
+    with mock.patch("feihua.client.Client._read_json", side_effect=read_json) as mock_read_json:
+        callers = [
+            asyncio.ensure_future(client._query_json(api_version="/v2", path="/zones/1/recordsets", query=query))
+            for query in ({"limit": 1}, {"limit": 1}, {"limit": 1}, {"limit": 2})
+        ]
+        await asyncio.sleep(0)
+        callers[0].cancel()
+        release.set()
+        results = await asyncio.gather(*callers[1:])
+
+    assert mock_read_json.call_count == 2
+    assert callers[0].cancelled()
+    for data, status in results:
+        assert status == HTTPStatus.OK
+        assert identical(data, expected_data)
+    assert results[0][0] is not results[1][0]
+    assert client._in_flight == {}
+
+
+@pytest.mark.asyncio
+async def test_query_json_coalesce_skip_writes(client, data_recordsets_function):
+    expected_data = data_recordsets_function["data_single_recordset"]
+    client.coalesce_requests = True
+    with mock.patch("feihua.client.Client._read_json", return_value=(expected_data, HTTPStatus.OK)) as mock_read_json:
+        await asyncio.gather(
+            *(client._query_json(api_version="/v2", path="/example", method="DELETE") for _ in range(3))
+        )
+    assert mock_read_json.call_count == 3
@@ -0,0 +1,49 @@
+from unittest import mock
+
+import pytest
+
+from feihua import codec
+from feihua.codec import JsonCodec, StdlibJsonCodec, get_codec
+from tests.identical import identical
+
+AVAILABLE_CODECS = ["json"] + [name for name in ("orjson", "ujson") if getattr(codec, name) is not None]
+
+
+@pytest.mark.parametrize("name", AVAILABLE_CODECS)
+def test_codec_round_trip(data_recordsets_function, name):
+    json_codec = get_codec(name)
+    data = data_recordsets_function["data_list_recordsets"]
+    encoded = json_codec.dumps(data)
+    assert isinstance(encoded, bytes)
+    assert identical(json_codec.loads(encoded), data)
+    assert identical(json_codec.loads(encoded.decode("utf-8")), data)
+
+
+@pytest.mark.parametrize(
+    "orjson_module, ujson_module, expected",
+    [
+        (object(), object(), "orjson"),
+        (None, object(), "ujson"),
+        (None, None, "json"),
+    ],
+)
+def test_get_default_codec(orjson_module, ujson_module, expected):
+    with mock.patch("feihua.codec.orjson", orjson_module), mock.patch("feihua.codec.ujson", ujson_module):
+        assert get_codec().name == expected
+
+
+def test_get_codec():
+    json_codec = StdlibJsonCodec()
+    assert get_codec(json_codec) is json_codec
+    assert isinstance(get_codec("json"), JsonCodec)
+    with pytest.raises(ValueError):
+        get_codec("yaml")
+
+
+def test_codec_is_abstract():
+    class HalfCodec(JsonCodec):
+        def dumps(self, obj):
+            return b""
+
+    with pytest.raises(TypeError):
+        HalfCodec()
@@ -0,0 +1,130 @@
+import asyncio
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+
+from feihua.concurrency import AdaptiveLimiter
+from feihua.exceptions import ClientError
+from feihua.retry import RetryPolicy
+
+
+async def request(limiter, status=HTTPStatus.OK, delay=0):
+    async with limiter.slot() as slot:
+        await asyncio.sleep(delay)
+        if status >= 400:
+            raise ClientError(status, {"message": "error"})
+        slot.status = status
+
+
+@pytest.mark.asyncio
+async def test_additive_increase():
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=3)
+    for _ in range(4):
+        await request(limiter)
+    assert limiter.limit == 3
+    for _ in range(10):
+        await request(limiter)
+    assert limiter.limit == 3
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.parametrize("status", [HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE])
+@pytest.mark.asyncio
+async def test_multiplicative_decrease(status):
+    limiter = AdaptiveLimiter(initial_limit=16, max_limit=16)
+    with pytest.raises(ClientError):
+        await request(limiter, status)
+    assert limiter.limit == 8
+    with pytest.raises(ClientError):
+        await request(limiter, HTTPStatus.BAD_REQUEST)
+    assert limiter.limit == 8
+
+
+@pytest.mark.asyncio
+async def test_decrease_once_per_window():
+    limiter = AdaptiveLimiter(initial_limit=8, max_limit=8)
+    results = await asyncio.gather(
+        *(request(limiter, HTTPStatus.TOO_MANY_REQUESTS, delay=0.01) for _ in range(8)), return_exceptions=True
+    )
+    assert all(isinstance(result, ClientError) for result in results)
+    assert limiter.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_latency_decrease():
+    limiter = AdaptiveLimiter(initial_limit=10, max_limit=10, latency_samples=20, latency_tolerance=2.0)
+    now = 0.0
+    with mock.patch("feihua.concurrency.time.monotonic", side_effect=lambda: now):
+        for _ in range(20):
+            started = await limiter._acquire()
+            now += 0.1
+            limiter._release(started, HTTPStatus.OK)
+        assert limiter.p95 == pytest.approx(0.1)
+        for _ in range(20):
+            started = await limiter._acquire()
+            now += 1.0
+            limiter._release(started, HTTPStatus.OK)
+            if limiter.limit < 10:
+                break
+        assert limiter.limit == 5
+        for _ in range(20):
+            started = await limiter._acquire()
+            now += 1.0
+            limiter._release(started, HTTPStatus.OK)
+    assert limiter.limit > 5
+
+
+@pytest.mark.asyncio
+async def test_limit_in_flight():
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=2)
+    max_in_flight = 0
+
+    async def tracked():
+        nonlocal max_in_flight
+        async with limiter.slot() as slot:
+            max_in_flight = max(max_in_flight, limiter.in_flight)
+            await asyncio.sleep(0)
+            slot.status = HTTPStatus.OK
+
+    await asyncio.gather(*(tracked() for _ in range(10)))
+    assert max_in_flight == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"min_limit": 0},
+        {"initial_limit": 10, "max_limit": 5},
+        {"backoff_ratio": 1},
+    ],
+)
+def test_bad_arguments(kwargs):
+    with pytest.raises(ValueError):
+        AdaptiveLimiter(**kwargs)
+
+
+@pytest.mark.asyncio
+async def test_client_concurrency_limiter(client):
+    client.concurrency_limiter = AdaptiveLimiter(initial_limit=1, max_limit=2)
+    response = mock.Mock(status=HTTPStatus.OK)
+    with mock.patch("aiohttp.ClientSession.request", new_callable=mock.AsyncMock, return_value=response):
+        await client._do_query(api_version="/v2", path="/example")
+    assert client.concurrency_limiter.limit == 2
+    assert client.concurrency_limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_client_concurrency_limiter_per_attempt(client):
+    client.concurrency_limiter = AdaptiveLimiter(initial_limit=8, max_limit=8)
+    client.retry_policy = RetryPolicy(attempts=2, backoff=0)
+    throttled = mock.Mock(status=HTTPStatus.TOO_MANY_REQUESTS, headers={})
+    throttled.read = mock.AsyncMock(return_value=b"Too many requests.")
+    responses = [throttled, mock.Mock(status=HTTPStatus.OK)]
+    with mock.patch("aiohttp.ClientSession.request", new_callable=mock.AsyncMock, side_effect=responses):
+        response = await client._do_query(api_version="/v2", path="/example")
+    # the retried 429 still cuts the window, the successful retry grows it again
+    assert response.status == HTTPStatus.OK
+    assert client.concurrency_limiter.limit == 4
+    assert client.concurrency_limiter.in_flight == 0
@@ -0,0 +1,141 @@
+import pytest
+from aiohttp.test_utils import TestServer
+
+from feihua.client import Client
+from feihua.exceptions import ClientError
+from feihua.fake_server import FaultInjection, add_recordset, make_app
+from feihua.loadtest import percentile, run_load
+
+ZONE_ID = "2c9eb155587194ec01587224c9f90149"
+ZONE_NAME = "example.com."
+
+
+async def _serve(faults=None, records=0):
+    app = make_app(credentials={"key": "secret"}, zones={ZONE_ID: ZONE_NAME}, faults=faults)
+    for index in range(records):
+        add_recordset(app, ZONE_ID, {"name": f"host-{index}.{ZONE_NAME}", "type": "A", "records": ["192.0.2.1"]})
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+    return server
+
+
+def _client(server, secret="secret", **kwargs):
+    return Client("key", secret, host=server.host, port=server.port, scheme="http", **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_fake_server_crud():
+    server = await _serve()
+    try:
+        async with _client(server) as client:
+            created, status = await client.recordsets.create_record(
+                ZONE_ID, {"name": f"www.{ZONE_NAME}", "type": "A", "records": ["192.0.2.1"]}
+            )
+            assert status == 202
+            assert created.status == "PENDING_CREATE"
+
+            with pytest.raises(ClientError) as e:
+                await client.recordsets.create_record(ZONE_ID, {"name": f"www.{ZONE_NAME}", "type": "A"})
+            assert e.value.status == 400
+
+            updated, _ = await client.recordsets.update_record(ZONE_ID, created.id, {"ttl": 600})
+            assert updated.ttl == 600
+
+            found, _ = await client.recordsets.find_records(ZONE_ID, {"name": "www", "type": "A"})
+            assert [recordset.id for recordset in found["recordsets"]] == [created.id]
+
+            deleted, _ = await client.recordsets.delete_record(ZONE_ID, created.id)
+            assert deleted.status == "PENDING_DELETE"
+            with pytest.raises(ClientError) as e:
+                await client.recordsets.delete_record(ZONE_ID, created.id)
+            assert e.value.status == 404
+    finally:
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_fake_server_pagination():
+    server = await _serve(records=25)
+    try:
+        async with _client(server) as client:
+            names = [recordset.name async for recordset in client.recordsets.iter(ZONE_ID, page_size=10)]
+            assert names == [f"host-{index}.{ZONE_NAME}" for index in range(25)]
+
+            response, _ = await client.recordsets.find_records(ZONE_ID, {"limit": 10, "offset": 20})
+            assert len(response["recordsets"]) == 5
+            assert response["metadata"]["total_count"] == 25
+            assert "next" not in response["links"]
+    finally:
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_fake_server_rejects_wrong_signature():
+    server = await _serve()
+    try:
+        async with _client(server, secret="wrong") as client:
+            with pytest.raises(ClientError) as e:
+                await client.recordsets.list(ZONE_ID)
+            assert e.value.status == 401
+    finally:
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_fake_server_faults():
+    server = await _serve(faults=FaultInjection(throttle_rate=1.0, retry_after=7))
+    try:
+        async with _client(server) as client:
+            with pytest.raises(ClientError) as e:
+                await client.recordsets.list(ZONE_ID)
+            assert e.value.status == 429
+            assert e.value.headers["Retry-After"] == "7"
+
+        server.app["faults"].throttle_rate = 0.0
+        server.app["faults"].error_rate = 1.0
+        async with _client(server) as client:
+            with pytest.raises(ClientError) as e:
+                await client.recordsets.list(ZONE_ID)
+            assert e.value.status in (500, 503)
+    finally:
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_run_load():
+    server = await _serve(faults=FaultInjection(throttle_rate=0.5, seed=1), records=5)
+    try:
+        async with _client(server) as client:
+            report = await run_load(client, ZONE_ID, rate=200, duration=0.2, concurrency=10)
+        assert report.requests == 40
+        assert 0 < report.errors["429"] < 40
+        assert len(report.latencies) == 40 - report.errors["429"]
+        assert report.throughput > 0
+        assert "p99" in str(report)
+    finally:
+        await server.close()
+
+
+def test_percentile():
+    assert percentile([], 50) is None
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 95) == 3.0
+
+
+@pytest.mark.asyncio
+async def test_fake_server_zones():
+    server = await _serve(records=3)
+    try:
+        async with _client(server) as client:
+            response, _ = await client.zones.list()
+            assert [zone.name for zone in response["zones"]] == [ZONE_NAME]
+            zone, _ = await client.zones.get(ZONE_ID)
+            assert zone.record_num == 3
+
+            client.zones.invalidate()
+            recordsets, _ = await client.recordsets.list("Example.com")
+            assert len(recordsets["recordsets"]) == 3
+    finally:
+        await server.close()
@@ -0,0 +1,62 @@
+import pytest
+
+from feihua.index import RecordsetIndex
+from feihua.recordset import Recordset
+
+
+@pytest.fixture
+def index(data_recordsets_function):
+    return RecordsetIndex.from_response(data_recordsets_function["data_list_recordsets"])
+
+
+@pytest.mark.parametrize(
+    "query, expected_ids",
+    [
+        (
+            None,
+            [
+                "904c7bb028272c846572c0e08b8cb290",
+                "3b1aa56287852a83840405477fa476aa",
+                "95c4466986d2b66987688ac786025370",
+            ],
+        ),
+        ({"id": "3b1aa56287852a83840405477fa476aa"}, ["3b1aa56287852a83840405477fa476aa"]),
+        ({"id": "missing"}, []),
+        ({"name": "auto"}, ["904c7bb028272c846572c0e08b8cb290", "3b1aa56287852a83840405477fa476aa"]),
+        ({"name": "AUTO.example.", "search_mode": "equal"}, ["904c7bb028272c846572c0e08b8cb290"]),
+        ({"name": "auto.example.", "type": "A", "search_mode": "equal"}, ["904c7bb028272c846572c0e08b8cb290"]),
+        ({"name": "auto.example.", "type": "TXT", "search_mode": "equal"}, []),
+        ({"type": "A", "status": "PENDING_CREATE"}, []),
+        ({"marker": "904c7bb028272c846572c0e08b8cb290", "limit": "1"}, ["3b1aa56287852a83840405477fa476aa"]),
+        ({"offset": 2}, ["95c4466986d2b66987688ac786025370"]),
+    ],
+)
+def test_index_find(index, query, expected_ids):
+    assert [recordset.id for recordset in index.find(query)] == expected_ids
+
+
+def test_index_lookup(index):
+
+    assert "904c7bb028272c846572c0e08b8cb290" in index
+    assert index.get("904c7bb028272c846572c0e08b8cb290").name == "auto.example."
+    assert [recordset.id for recordset in index.lookup("auto-2.example.", "A")] == ["3b1aa56287852a83840405477fa476aa"]
+    assert [recordset.id for recordset in index.by_name("aut-3.example.")] == ["95c4466986d2b66987688ac786025370"]
+    assert index.lookup("auto-2.example.", "AAAA") == []
+
+
+def test_index_add_remove(index, data_recordsets_function):
+    recordset = Recordset(**data_recordsets_function["data_single_recordset"])
+    index.add(recordset)
+    assert len(index) == 3
+    assert index.get(recordset.id) is recordset
+    assert recordset in index.lookup(recordset.name, recordset.type)
+
+    renamed = Recordset(**{**data_recordsets_function["data_single_recordset"], "name": "renamed.example."})
+    index.add(renamed)
+    assert recordset not in index.lookup(recordset.name, recordset.type)
+    assert index.by_name("renamed.example.") == [renamed]
+
+    assert index.remove(renamed) is renamed
+    assert renamed.id not in index
+    assert index.by_name("renamed.example.") == []
+    assert index.remove("missing") is None
@@ -0,0 +1,108 @@
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+from yarl import URL
+
+from feihua.exceptions import ClientError
+from feihua.metrics import (
+    Histogram,
+    InMemoryExporter,
+    MetricsCollector,
+    MetricsExporter,
+    PrometheusTextExporter,
+    operation_name,
+)
+
+
+@pytest.mark.parametrize(
+    "method, url, operation",
+    [
+        ("GET", "https://dns.zone.ru/v2/zones/1/recordsets", "list"),
+        ("GET", "https://dns.zone.ru/v2/zones/1/recordsets?limit=10&marker=a", "list"),
+        ("GET", URL("https://dns.zone.ru/v2/zones/1/recordsets?name=a"), "find"),
+        ("POST", "https://dns.zone.ru/v2/zones/1/recordsets", "create"),
+        ("PUT", "https://dns.zone.ru/v2/zones/1/recordsets/1", "update"),
+        ("delete", "https://dns.zone.ru/v2/zones/1/recordsets/1", "delete"),
+    ],
+)
+def test_operation_name(method, url, operation):
+    assert operation_name(method, url) == operation
+
+
+def test_histogram():
+    histogram = Histogram(buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 2):
+        histogram.observe(value)
+    assert histogram.cumulative() == [(0.1, 2), (1, 3), (float("inf"), 4)]
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(2.65)
+
+
+def test_exporters():
+    in_memory = InMemoryExporter()
+    prometheus = PrometheusTextExporter()
+    collector = MetricsCollector(buckets=(0.1,), exporters=[in_memory, prometheus])
+    collector.observe("list", "total", 0.05)
+    collector.count_error("create", 429)
+    collector.count_error("create", 429)
+    collector.export()
+
+    assert in_memory.snapshots == [
+        {
+            "stages": {("list", "total"): {"buckets": [(0.1, 1), (float("inf"), 1)], "sum": 0.05, "count": 1}},
+            "errors": {("create", "429"): 2},
+        }
+    ]
+    assert prometheus.text.splitlines() == [
+        "# HELP feihua_stage_seconds Time spent in the stages of the requests.",
+        "# TYPE feihua_stage_seconds histogram",
+        'feihua_stage_seconds_bucket{operation="list",stage="total",le="0.1"} 1',
+        'feihua_stage_seconds_bucket{operation="list",stage="total",le="+Inf"} 1',
+        'feihua_stage_seconds_sum{operation="list",stage="total"} 0.05',
+        'feihua_stage_seconds_count{operation="list",stage="total"} 1',
+        "# HELP feihua_errors_total Failed requests by status.",
+        "# TYPE feihua_errors_total counter",
+        'feihua_errors_total{operation="create",status="429"} 2',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_trace_config():
+    async def handler(request):
+        return web.json_response({"recordsets": []})
+
+    app = web.Application()
+    app.router.add_get("/v2/zones/1/recordsets", handler)
+    collector = MetricsCollector()
+    async with TestServer(app) as server:
+        async with ClientSession(trace_configs=[collector.trace_config()]) as session:
+            async with session.get(
+                server.make_url("/v2/zones/1/recordsets"), trace_request_ctx=collector.request_context("list")
+            ) as response:
+                assert response.status == HTTPStatus.OK
+    stages = {stage for operation, stage in collector.stages if operation == "list"}
+    assert {"connect", "ttfb"} <= stages
+
+
+@pytest.mark.asyncio
+async def test_client_metrics(client, data_recordsets_function):
+    client.metrics = MetricsCollector()
+    response = mock.Mock(status=HTTPStatus.OK, headers={"content-type": "application/json"})
+    error = mock.Mock(status=HTTPStatus.TOO_MANY_REQUESTS, headers={"content-type": "text/plain"})
+    error.read = mock.AsyncMock(return_value=b"throttled")
+    with mock.patch("aiohttp.ClientSession.request", new_callable=mock.AsyncMock, side_effect=[response, error]):
+        await client._do_query(api_version="/v2", path="/zones/1/recordsets", method="GET")
+        with pytest.raises(ClientError):
+            await client._do_query(api_version="/v2", path="/zones/1/recordsets", method="POST")
+    assert client.metrics.stages[("list", "sign")].count == 1
+    assert client.metrics.stages[("list", "total")].count == 1
+    assert ("create", "total") not in client.metrics.stages
+    assert client.metrics.errors == {("create", "429"): 1}
+
+
+def test_exporter_is_abstract():
+    with pytest.raises(TypeError):
+        MetricsExporter()
@@ -0,0 +1,153 @@
+import time
+from unittest import mock
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from feihua.middleware import SignatureVerifier, _parse_date
+from feihua.signer import Signer
+
+
+async def _hello(request):
+    return web.json_response({"access_key_id": request["access_key_id"]})
+
+
+async def _test_client(verifier):
+    app = web.Application(middlewares=[verifier.middleware()])
+    app.router.add_route("*", "/v2/zones", _hello)
+    client = TestClient(TestServer(app, host="127.0.0.1"))
+    await client.start_server()
+    return client
+
+
+def _signed_headers(url, method="GET", body=None, secret="secret", date=None):
+    headers = {} if date is None else {"X-Sdk-Date": date}
+    return Signer(key="key", secret=secret).sign(method=method, url=url, headers=headers, body=body)
+
+
+@pytest.mark.asyncio
+async def test_middleware_accepts_signed_request():
+    client = await _test_client(SignatureVerifier({"key": "secret"}))
+    try:
+        url = client.make_url("/v2/zones?name=example&limit=10")
+        headers = _signed_headers(url, method="POST", body='{"a": 1}')
+        response = await client.session.post(url, headers=headers, data='{"a": 1}')
+        assert response.status == 200
+        assert await response.json() == {"access_key_id": "key"}
+    finally:
+        await client.close()
+
+
+@pytest.mark.parametrize(
+    "headers, message",
+    [
+        ({}, "Missing or malformed Authorization header."),
+        ({"Authorization": "SDK-HMAC-SHA256 Access=key"}, "Missing or malformed Authorization header."),
+    ],
+)
+@pytest.mark.asyncio
+async def test_middleware_rejects_unsigned(headers, message):
+    client = await _test_client(SignatureVerifier({"key": "secret"}))
+    try:
+        response = await client.get("/v2/zones", headers=headers)
+        assert response.status == 401
+        assert (await response.json())["message"] == message
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_middleware_rejects_wrong_signature_and_tampering():
+    client = await _test_client(SignatureVerifier({"key": "secret"}))
+    try:
+        url = client.make_url("/v2/zones?limit=10")
+        response = await client.session.get(url, headers=_signed_headers(url, secret="wrong"))
+        assert (await response.json())["message"] == "Signature does not match."
+
+        headers = _signed_headers(url)
+        response = await client.session.get(client.make_url("/v2/zones?limit=11"), headers=headers)
+        assert (await response.json())["message"] == "Signature does not match."
+
+        headers = {
+            **_signed_headers(url),
+            "Authorization": _signed_headers(url)["Authorization"].replace("key", "nobody"),
+        }
+        response = await client.session.get(url, headers=headers)
+        assert (await response.json())["message"] == "Unknown access key."
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_middleware_clock_skew():
+    client = await _test_client(SignatureVerifier({"key": "secret"}, max_skew=60))
+    try:
+        url = client.make_url("/v2/zones")
+        old = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(time.time() - 120))
+        response = await client.session.get(url, headers=_signed_headers(url, date=old))
+        assert response.status == 401
+        assert "differs from the server time" in (await response.json())["message"]
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_middleware_rejects_replay():
+    client = await _test_client(SignatureVerifier({"key": "secret"}))
+    try:
+        url = client.make_url("/v2/zones")
+        headers = _signed_headers(url)
+        assert (await client.session.get(url, headers=headers)).status == 200
+        response = await client.session.get(url, headers=headers)
+        assert response.status == 401
+        assert (await response.json())["message"] == "The request has already been received."
+    finally:
+        await client.close()
+
+    client = await _test_client(SignatureVerifier({"key": "secret"}, replay_cache_size=0))
+    try:
+        url = client.make_url("/v2/zones")
+        headers = _signed_headers(url)
+        assert (await client.session.get(url, headers=headers)).status == 200
+        assert (await client.session.get(url, headers=headers)).status == 200
+    finally:
+        await client.close()
+
+
+def test_replay_cache_is_bounded():
+    verifier = SignatureVerifier({}, replay_cache_size=2)
+    for signature in "abc":
+        verifier._check_replay(signature, expires_at=200.0, now=100.0)
+    assert list(verifier._seen) == ["b", "c"]
+    # expired signatures are dropped
+    verifier._check_replay("a", expires_at=400.0, now=300.0)
+    assert list(verifier._seen) == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_secret_lookup_is_cached():
+    lookup = mock.AsyncMock(side_effect=lambda key: {"key": "secret"}.get(key))
+    verifier = SignatureVerifier(lookup, secret_cache_ttl=60)
+    first = await verifier._get_signer("key")
+    assert await verifier._get_signer("key") is first
+    assert await verifier._get_signer("unknown") is None
+    assert await verifier._get_signer("unknown") is None
+    assert lookup.await_count == 2
+
+    verifier.invalidate("key")
+    assert (await verifier._get_signer("key")).secret == "secret"
+    assert lookup.await_count == 3
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("20200608T023900Z", 1591583940.0),
+        ("20200608T023900", None),
+        ("2020-06-08T0239Z", None),
+        ("20201308T023900Z", None),
+    ],
+)
+def test_parse_date(value, expected):
+    assert _parse_date(value) == expected
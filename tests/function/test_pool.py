@@ -0,0 +1,90 @@
+import asyncio
+from unittest import mock
+
+import pytest
+from aiohttp.test_utils import TestServer
+
+from feihua.fake_server import make_app
+from feihua.pool import ClientPool
+
+ZONE_ID = "2c9eb155587194ec01587224c9f90149"
+ZONE_NAME = "example.com."
+
+
+@pytest.mark.asyncio
+async def test_pool_shares_session():
+    async with ClientPool(limit=50, limit_per_host=5) as pool:
+        first = pool.get("key-1", "secret-1", "dns.ap-southeast-1.example.com")
+        second = pool.get("key-2", "secret-2", "dns.ap-southeast-1.example.com")
+        third = pool.get("key-1", "secret-1", "dns.eu-west-0.example.com")
+        assert pool.get("key-1", "secret-1", "dns.ap-southeast-1.example.com") is first
+        assert len({first, second, third}) == 3
+        assert first.session is second.session is third.session is pool.session
+        assert pool.pool_stats() == {
+            "limit": 50,
+            "limit_per_host": 5,
+            "in_use": 0,
+            "idle": 0,
+            "waiting": 0,
+            "clients": 3,
+        }
+
+        # closing a client of the pool keeps the shared session open
+        await first.close()
+        assert not pool.session.closed
+    assert pool.session.closed
+
+
+@pytest.mark.asyncio
+async def test_pool_rotated_secret():
+    async with ClientPool() as pool:
+        client = pool.get("key", "old", "dns.example.com")
+        rotated = pool.get("key", "new", "dns.example.com")
+        assert rotated is not client
+        assert rotated.secret_access_key == "new"
+        assert len(pool) == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_evicts_idle_clients():
+    async with ClientPool(idle_timeout=60) as pool:
+        with mock.patch("feihua.pool.time.monotonic", return_value=100.0):
+            first = pool.get("key-1", "secret", "dns.example.com")
+            pool.get("key-2", "secret", "dns.example.com")
+        with mock.patch("feihua.pool.time.monotonic", return_value=150.0):
+            assert pool.get("key-1", "secret", "dns.example.com") is first
+        with mock.patch("feihua.pool.time.monotonic", return_value=170.0):
+            assert pool.evict_idle() == 1
+        assert len(pool) == 1
+        assert pool.evict_idle(now=300.0) == 1
+        assert len(pool) == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_max_clients():
+    async with ClientPool(max_clients=2, idle_timeout=None) as pool:
+        first = pool.get("key-1", "secret", "dns.example.com")
+        pool.get("key-2", "secret", "dns.example.com")
+        pool.get("key-1", "secret", "dns.example.com")
+        pool.get("key-3", "secret", "dns.example.com")
+        assert len(pool) == 2
+        assert pool.get("key-1", "secret", "dns.example.com") is first
+
+
+@pytest.mark.asyncio
+async def test_pool_host_limits():
+    app = make_app(credentials={"key-1": "secret", "key-2": "secret"}, zones={ZONE_ID: ZONE_NAME})
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+    try:
+        async with ClientPool(host_limits={"127.0.0.1": 2}) as pool:
+            clients = [
+                pool.get(key, "secret", "127.0.0.1", scheme="http", port=server.port) for key in ("key-1", "key-2")
+            ]
+            assert clients[0].concurrency_limiter is clients[1].concurrency_limiter
+            assert clients[0].concurrency_limiter.limit == 2
+            results = await asyncio.gather(*(client.recordsets.list(ZONE_ID) for client in clients * 4))
+            assert all(status == 200 for _, status in results)
+            assert pool.get("key-1", "secret", "other.example.com").concurrency_limiter is None
+    finally:
+        await server.close()
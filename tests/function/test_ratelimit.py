@@ -0,0 +1,95 @@
+import asyncio
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+
+from feihua.ratelimit import RateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.now += delay
+
+
+@pytest.fixture
+def clock():
+    clock = FakeClock()
+    with mock.patch("feihua.ratelimit.time.monotonic", clock.monotonic), mock.patch(
+        "feihua.ratelimit.asyncio.sleep", clock.sleep
+    ):
+        yield clock
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_burst_and_rate(clock):
+    bucket = TokenBucket(rate=10, capacity=2)
+    await bucket.acquire()
+    await bucket.acquire()
+    assert clock.now == 0
+    assert bucket.waits == 0
+    await bucket.acquire()
+    assert clock.now == pytest.approx(0.1)
+    assert bucket.acquired == 3
+    assert bucket.waits == 1
+    assert bucket.wait_time == pytest.approx(0.1)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_fifo(clock):
+    bucket = TokenBucket(rate=10, capacity=1)
+    order = []
+
+    async def worker(index):
+        await bucket.acquire()
+        order.append(index)
+
+    await asyncio.gather(*(worker(index) for index in range(5)))
+    assert order == list(range(5))
+    assert clock.now == pytest.approx(0.4)
+
+
+@pytest.mark.parametrize("rate, capacity", [(0, None), (10, 0.5)])
+def test_token_bucket_bad_arguments(rate, capacity):
+    with pytest.raises(ValueError):
+        TokenBucket(rate=rate, capacity=capacity)
+
+
+def test_rate_limiter_buckets():
+    limiter = RateLimiter(read_rate=10, write_rate=1)
+    assert limiter.bucket("GET") is limiter.read
+    for method in ("POST", "put", "DELETE"):
+        assert limiter.bucket(method) is limiter.write
+
+
+def test_rate_limiter_shared():
+    limiter = RateLimiter.shared("test_rate_limiter_shared", read_rate=10, write_rate=1)
+    try:
+        assert RateLimiter.shared("test_rate_limiter_shared", 10, 1, write_burst=None) is limiter
+        assert RateLimiter.shared("test_rate_limiter_shared_other", read_rate=1, write_rate=1) is not limiter
+        with pytest.raises(ValueError):
+            RateLimiter.shared("test_rate_limiter_shared", read_rate=1, write_rate=1)
+
+        RateLimiter.remove_shared("test_rate_limiter_shared")
+        assert RateLimiter.shared("test_rate_limiter_shared", read_rate=1, write_rate=1) is not limiter
+    finally:
+        RateLimiter.remove_shared("test_rate_limiter_shared")
+        RateLimiter.remove_shared("test_rate_limiter_shared_other")
+    assert "test_rate_limiter_shared" not in RateLimiter._shared
+
+
+@pytest.mark.asyncio
+async def test_client_rate_limiter(client):
+    client.rate_limiter = RateLimiter(read_rate=10, write_rate=1)
+    response = mock.Mock(status=HTTPStatus.OK)
+    with mock.patch("aiohttp.ClientSession.request", new_callable=mock.AsyncMock, return_value=response):
+        await client._do_query(api_version="/v2", path="/example", method="GET")
+        await client._do_query(api_version="/v2", path="/example", method="DELETE")
+    assert client.rate_limiter.read.acquired == 1
+    assert client.rate_limiter.write.acquired == 1
@@ -2,7 +2,7 @@ from http import HTTPStatus
 
 import pytest
 
-from feihua.recordset import SUCCESSFUL_STATUS_CODE, Recordset, Recordsets
+from feihua.recordset import SUCCESSFUL_STATUS_CODE, Recordset, RecordsetList, Recordsets
 from tests.identical import identical
 
 
@@ -27,7 +27,8 @@ from tests.identical import identical
 async def test_return_list_objects(data_recordsets_function, name_data, status):
     recordsets, returned_status = await Recordsets._return_list_objects(data_recordsets_function[name_data], status)
     if status in SUCCESSFUL_STATUS_CODE:
-        assert isinstance(recordsets["recordsets"], list)
+        assert isinstance(recordsets["recordsets"], RecordsetList)
+        assert recordsets["recordsets"].raw is data_recordsets_function[name_data]["recordsets"]
         for recordset in recordsets["recordsets"]:
             assert isinstance(recordset, Recordset)
             assert recordset.to_dict() in data_recordsets_function[name_data]["recordsets"]
@@ -53,3 +54,21 @@ async def test_return_single_object(data_recordsets_function, name_data, status,
         assert identical(rec, data_recordsets_function[name_data])
     else:
         assert rec == {}
+
+
+def test_recordset_list(data_recordsets_function):
+    rows = data_recordsets_function["data_list_recordsets"]["recordsets"]
+    recordsets = RecordsetList(rows)
+    assert len(recordsets) == len(rows)
+    assert isinstance(recordsets[0], Recordset)
+    assert identical(recordsets[-1], rows[-1])
+    assert isinstance(recordsets[1:], RecordsetList)
+    assert [recordset.id for recordset in recordsets[1:]] == [row["id"] for row in rows[1:]]
+    assert [recordset.to_dict() for recordset in recordsets] == rows
+
+
+def test_recordset_slots(data_recordsets_function):
+    recordset = Recordset(**data_recordsets_function["data_single_recordset"])
+    assert not hasattr(recordset, "__dict__")
+    assert recordset.to_dict() == data_recordsets_function["data_single_recordset"]
+    assert str(recordset) == "auto.example._A_10.200.200.1_3600"
@@ -0,0 +1,52 @@
+from unittest import mock
+
+import pytest
+
+from feihua.exceptions import ClientError
+from feihua.retry import RetryPolicy
+
+
+def make_error(status, headers=None):
+    return ClientError(status, {"message": "error"}, headers=headers)
+
+
+@pytest.mark.parametrize(
+    "method, expected",
+    [("GET", True), ("put", True), ("DELETE", True), ("POST", False)],
+)
+def test_retryable_method(method, expected):
+    assert RetryPolicy().is_retryable_method(method) == expected
+
+
+@pytest.mark.parametrize(
+    "attempt, status, headers, expected",
+    [
+        (1, 503, None, 0.2),
+        (2, 429, None, 0.4),
+        (1, 400, None, None),
+        (3, 503, None, None),
+        (1, 429, {"Retry-After": "5"}, 5.0),
+        (1, 429, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}, 0.0),
+        (1, 429, {"Retry-After": "soon"}, 0.2),
+    ],
+)
+def test_get_delay(attempt, status, headers, expected):
+    with mock.patch("feihua.retry.random.uniform", side_effect=lambda low, high: high):
+        assert RetryPolicy(attempts=3, backoff=0.1).get_delay(attempt, make_error(status, headers)) == expected
+
+
+def test_get_delay_max_backoff():
+    with mock.patch("feihua.retry.random.uniform", side_effect=lambda low, high: high):
+        assert RetryPolicy(attempts=10, backoff=1, max_backoff=3).get_delay(5, make_error(503)) == 3
+
+
+def test_get_delay_deadline():
+    policy = RetryPolicy(deadline=1.0)
+    assert policy.get_delay(1, make_error(429, {"Retry-After": "2"})) is None
+    assert policy.get_delay(1, make_error(429, {"Retry-After": "0.5"}), elapsed=0.6) is None
+    assert policy.get_delay(1, make_error(429, {"Retry-After": "0.5"}), elapsed=0.1) == 0.5
+
+
+def test_bad_attempts():
+    with pytest.raises(ValueError):
+        RetryPolicy(attempts=0)
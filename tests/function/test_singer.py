@@ -1,4 +1,8 @@
+from datetime import datetime
+from unittest import mock
+
 import pytest
+from yarl import URL
 
 from feihua import signer
 
@@ -48,3 +52,96 @@ def test_singer(key, secret, method, url, headers, body, signed_headers, signatu
         f"SignedHeaders={signed_headers}, "
         f"Signature={signature}"
     )
+
+
+@pytest.mark.parametrize(
+    "method, url, headers, body",
+    [
+        ("GET", "http://example.com/", {"X-Sdk-Date": "20200608T023900Z"}, None),
+        ("POST", "http://example.com/v2/zones/1/recordsets", {"X-Sdk-Date": "20200608T023900Z"}, '{"a": 1}'),
+        ("GET", "http://example.com/v2/zones?name=a&limit=1", {"X-Sdk-Date": "20200608T023901Z", "b": "c"}, None),
+    ],
+)
+def test_signer_reuse(method, url, headers, body):
+    sig = signer.Signer(key="example", secret="example")
+    original_headers = dict(headers)
+    for _ in range(2):
+        assert sig.sign(method=method, url=url, headers=headers, body=body) == signer.sign(
+            key="example", secret="example", method=method, url=url, headers=headers, body=body
+        )
+    assert headers == original_headers
+
+
+def test_signer_date_cache():
+    formatted = []
+
+    class FixedDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return cls(2020, 6, 8, 2, 39, 0, 123456)
+
+        def strftime(self, fmt):
+            formatted.append(self)
+            return super().strftime(fmt)
+
+    sig = signer.Signer(key="example", secret="example")
+    with mock.patch("feihua.signer.datetime", FixedDatetime):
+        first = sig.sign(method="GET", url="http://example.com/")
+        second = sig.sign(method="GET", url="http://example.com/")
+    assert first[signer.HEADER_X_DATE] == second[signer.HEADER_X_DATE] == "20200608T023900Z"
+    assert first["Authorization"] == second["Authorization"]
+    # the date of the second is formatted once for both requests
+    assert len(formatted) == 1
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "http://example.com/",
+        "https://DNS.example.com/v2/zones/75c475a8e48c88237727526be73e6458/recordsets",
+        "https://dns.example.com/v2/zones/1/recordsets?limit=500&marker=abc",
+        "https://dns.example.com/v2/zones/1/recordsets?name=a+b&name=a%26b&type=&id=%2B",
+        "https://dns.example.com/v2/p%20q/r~s/?x=1;y=2",
+    ],
+)
+def test_signer_url_fast_path(url):
+    headers = {"X-Sdk-Date": "20200608T023900Z"}
+    sig = signer.Signer(key="example", secret="example")
+    assert sig.sign(method="GET", url=URL(url), headers=headers) == sig.sign(method="GET", url=url, headers=headers)
+
+
+def test_signer_bytes_body():
+    headers = {"X-Sdk-Date": "20200608T023900Z"}
+    sig = signer.Signer(key="example", secret="example")
+    assert sig.sign(method="POST", url="http://example.com/", headers=headers, body='{"a": "б"}') == sig.sign(
+        method="POST", url="http://example.com/", headers=headers, body='{"a": "б"}'.encode("utf-8")
+    )
+
+
+def test_signer_verify():
+    url = "http://example.com/v2/zones?name=a&limit=1"
+    sig = signer.Signer(key="example", secret="example")
+    headers = sig.sign(method="GET", url=url, headers={"X-Sdk-Date": "20200608T023900Z"})
+    authorization = signer.parse_authorization(headers["Authorization"])
+    assert authorization.access == "example"
+    assert authorization.signed_headers == ["content-type", "host", "x-sdk-date"]
+
+    signed = {name: value for name, value in headers.items() if name.lower() in authorization.signed_headers}
+    request = signer._Request(method="GET", url=url, headers=signed)
+    assert sig.verify(request, authorization.signature)
+    assert sig.verify(request, headers["Authorization"])
+    assert not sig.verify(request, "0" * 64)
+    assert not signer.Signer(key="example", secret="other").verify(request, headers["Authorization"])
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "",
+        "Basic abc",
+        "SDK-HMAC-SHA256 Access=a, SignedHeaders=host",
+        "SDK-HMAC-SHA256 Access=, SignedHeaders=h, Signature=s",
+    ],
+)
+def test_parse_authorization_malformed(value):
+    assert signer.parse_authorization(value) is None
@@ -0,0 +1,129 @@
+from unittest import mock
+
+import pytest
+from aiohttp.test_utils import TestServer
+
+from feihua.cache import ZoneCache
+from feihua.client import Client
+from feihua.fake_server import add_recordset, make_app
+from feihua.recordset import Recordset
+from feihua.snapshot import SnapshotStore
+from feihua.sync import plan_changes
+from feihua.zone import Zone
+
+ZONES = {"2c9eb155587194ec01587224c9f90149": "example.com.", "2c9eb155587228570158722b6ac30007": "example.org."}
+ZONE_ID = "2c9eb155587194ec01587224c9f90149"
+
+
+def _row(recordset_id, name, update_at=None):
+    return {
+        "id": recordset_id,
+        "zone_id": ZONE_ID,
+        "name": name,
+        "description": None,
+        "type": "A",
+        "ttl": 300,
+        "records": ["192.0.2.1"],
+        "status": "ACTIVE",
+        "zone_name": "example.com.",
+        "default": False,
+        "links": {},
+        "project_id": "e55c6f3dc4e34c9f86353b664ae0e70c",
+        "create_at": "2020-06-08T02:39:00.000",
+        "update_at": update_at,
+    }
+
+
+def test_snapshot_store_save_and_load(tmp_path):
+    path = str(tmp_path / "zones.sqlite3")
+    zone = Zone(id=ZONE_ID, name="example.com.", serial=5, updated_at="2020-06-08T02:39:00.000", record_num=2)
+    with SnapshotStore(path) as store:
+        assert store.recordsets(ZONE_ID) is None
+        store.save(ZONE_ID, [Recordset(**_row("b", "b.example.com.")), _row("a", "a.example.com.", "x")], zone=zone)
+
+    # a new process reads the snapshot from the disk
+    with SnapshotStore(path) as store:
+        assert len(store) == 1
+        assert ZONE_ID in store
+        version = store.version(ZONE_ID)
+        assert (version.serial, version.updated_at, version.record_num) == (5, zone.updated_at, 2)
+        recordsets = store.recordsets(ZONE_ID)
+        assert [recordset.id for recordset in recordsets] == ["b", "a"]
+        assert recordsets[1].update_at == "x"
+
+        assert not store.is_stale(zone)
+        assert store.is_stale(Zone(id=ZONE_ID, name="example.com.", serial=6, updated_at=zone.updated_at, record_num=2))
+        assert store.is_stale(Zone(id=ZONE_ID, name="example.com.", serial=5, updated_at=zone.updated_at, record_num=3))
+        assert store.is_stale(Zone(id="other", name="example.org.", serial=1))
+        with mock.patch("feihua.snapshot.time.time", return_value=version.saved_at + 100):
+            assert store.is_stale(zone, max_age=60)
+            assert not store.is_stale(zone, max_age=600)
+            assert not store.is_stale(zone, max_age=None)
+        with mock.patch("feihua.snapshot.time.time", return_value=version.saved_at + 3600):
+            assert store.is_stale(zone)
+
+        # offline diffing against the snapshot
+        operations, unchanged = plan_changes(recordsets, [{"name": "a.example.com.", "type": "A", "ttl": 600}])
+        assert operations == [{"action": "update", "recordset_id": "a", "data": {"ttl": 600}}]
+
+        cache = ZoneCache()
+        assert store.warm(cache) == 1
+        response, status = cache.get(ZONE_ID)
+        assert [recordset.id for recordset in response["recordsets"]] == ["b", "a"]
+
+        store.delete(ZONE_ID)
+        assert len(store) == 0
+        assert store.recordsets(ZONE_ID) is None
+
+
+@pytest.mark.asyncio
+async def test_snapshot_store_refresh(tmp_path):
+    app = make_app(credentials={"key": "secret"}, zones=ZONES)
+    for index in range(3):
+        for zone_id, name in ZONES.items():
+            add_recordset(app, zone_id, {"name": f"host-{index}.{name}", "type": "A", "records": ["192.0.2.1"]})
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+    try:
+        async with Client("key", "secret", host=server.host, port=server.port, scheme="http") as client:
+            with SnapshotStore(str(tmp_path / "zones.sqlite3")) as store:
+                store.save("deleted-zone", [])
+                report = await store.refresh(client)
+                assert sorted(report.refreshed) == sorted(ZONES)
+                assert report.removed == ["deleted-zone"]
+                assert report.changed == 6
+                assert [recordset.name for recordset in store.recordsets(ZONE_ID)] == [
+                    f"host-{index}.example.com." for index in range(3)
+                ]
+
+                with mock.patch.object(client.recordsets, "iter", wraps=client.recordsets.iter) as iter_recordsets:
+                    report = await store.refresh(client)
+                    assert report.refreshed == []
+                    assert sorted(report.fresh) == sorted(ZONES)
+                    assert iter_recordsets.call_count == 0
+
+                    # only the changed zone is listed again
+                    await client.recordsets.create_record(
+                        ZONE_ID, {"name": "new.example.com.", "type": "A", "records": ["192.0.2.2"]}
+                    )
+                    report = await store.refresh(client)
+                    assert report.refreshed == [ZONE_ID]
+                    assert report.changed == 1
+                    assert iter_recordsets.call_count == 1
+                assert len(store.recordsets(ZONE_ID)) == 4
+
+                # an edit in place keeps record_num, it is found once the snapshot is older than max_age
+                edited = store.recordsets(ZONE_ID)[0]
+                await client.recordsets.update_record(ZONE_ID, edited.id, {"records": ["192.0.2.9"]})
+                report = await store.refresh(client)
+                assert ZONE_ID in report.fresh
+                report = await store.refresh(client, zone_ids=[ZONE_ID], max_age=0)
+                assert report.refreshed == [ZONE_ID]
+                assert report.changed == 1
+                assert store.recordsets(ZONE_ID)[0].records == ["192.0.2.9"]
+
+                report = await store.refresh(client, zone_ids=["2c9eb155587228570158722b6ac30007"], max_age=0)
+                assert report.refreshed == ["2c9eb155587228570158722b6ac30007"]
+                assert report.removed == []
+    finally:
+        await server.close()
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from feihua.stream import JsonArrayStream
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 64, 1 << 20])
+def test_json_array_stream(data_recordsets_function, chunk_size):
+    data = data_recordsets_function["data_list_recordsets"]
+    # the key in a nested object and in a string must not be taken for the array
+    data = {"links": {"self": '"recordsets": [1]', "recordsets": []}, "name": "recordsets", **data}
+    body = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+    decoder = JsonArrayStream("recordsets")
+    items = []
+    for position in range(0, len(body), chunk_size):
+        items.extend(decoder.feed(body[position : position + chunk_size]))
+    decoder.close()
+    assert decoder.done
+    assert items == data["recordsets"]
+
+
+def test_json_array_stream_unicode():
+    body = json.dumps({"recordsets": [{"description": "запись"}, {"description": "\\"}]}, ensure_ascii=False)
+    body = body.encode("utf-8")
+    decoder = JsonArrayStream("recordsets")
+    items = []
+    for position in range(len(body)):
+        items.extend(decoder.feed(body[position : position + 1]))
+    assert items == [{"description": "запись"}, {"description": "\\"}]
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 40))
+def test_json_array_stream_scalars(chunk_size):
+    # a chunk may end inside a number, e.g. after "1.5e" or "-"
+    body = b'{"recordsets": [12345, 1.5e10, -0.5, true,null ,"x"]}'
+    decoder = JsonArrayStream("recordsets")
+    items = []
+    for position in range(0, len(body), chunk_size):
+        items.extend(decoder.feed(body[position : position + chunk_size]))
+    decoder.close()
+    assert items == [12345, 1.5e10, -0.5, True, None, "x"]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'{"links": {}}',
+        b'{"recordsets": [{"id": 1}',
+    ],
+)
+def test_json_array_stream_incomplete(body):
+    decoder = JsonArrayStream("recordsets")
+    decoder.feed(body)
+    with pytest.raises(ValueError):
+        decoder.close()
+
+
+def test_json_array_stream_not_array():
+    with pytest.raises(ValueError):
+        JsonArrayStream("recordsets").feed(b'{"recordsets": {}}')
@@ -0,0 +1,61 @@
+import pytest
+
+from feihua.recordset import Recordset
+from feihua.sync import plan_changes
+
+
+@pytest.fixture
+def current(data_recordsets_function):
+    recordsets = [Recordset(**row) for row in data_recordsets_function["data_list_recordsets"]["recordsets"]]
+    system = {**data_recordsets_function["data_list_recordsets"]["recordsets"][0]}
+    system.update({"id": "system", "name": "example.", "type": "SOA", "default": True})
+    return recordsets + [Recordset(**system)]
+
+
+def test_plan_changes(current):
+    desired = [
+        {"name": "AUTO.example.", "type": "a", "records": ["10.200.200.1"], "ttl": 3600},
+        {"name": "auto-2.example.", "type": "A", "records": ["10.200.200.20"]},
+        {"name": "new.example.", "type": "TXT", "records": ['"text"']},
+    ]
+    operations, unchanged = plan_changes(current, desired)
+    assert [recordset.id for recordset in unchanged] == ["904c7bb028272c846572c0e08b8cb290"]
+    assert operations == [
+        {
+            "action": "update",
+            "recordset_id": "3b1aa56287852a83840405477fa476aa",
+            "data": {"records": ["10.200.200.20"]},
+        },
+        {"action": "create", "data": desired[2]},
+    ]
+
+
+def test_plan_changes_records_order(current):
+    desired = [{"name": "auto.example.", "type": "A", "records": ["10.200.200.1"], "ttl": 3600}]
+    current[0].records = ["10.200.200.1"]
+    operations, unchanged = plan_changes(current, desired)
+    assert operations == []
+    assert len(unchanged) == 1
+
+
+def test_plan_changes_prune(current):
+    desired = [{"name": "auto.example.", "type": "A"}]
+    operations, unchanged = plan_changes(current, desired, prune=True)
+    assert len(unchanged) == 1
+    assert operations == [
+        {"action": "delete", "recordset_id": "3b1aa56287852a83840405477fa476aa"},
+        {"action": "delete", "recordset_id": "95c4466986d2b66987688ac786025370"},
+    ]
+
+
+def test_plan_changes_duplicate_desired(current):
+    desired = [{"name": "auto.example.", "type": "A"}, {"name": "auto.example.", "type": "A"}]
+    with pytest.raises(ValueError):
+        plan_changes(current, desired)
+
+
+def test_plan_changes_trailing_dot(current):
+    desired = [{"name": "Auto.Example", "type": "A", "records": ["10.200.200.1"], "ttl": 3600}]
+    operations, unchanged = plan_changes(current, desired, prune=True)
+    assert [recordset.id for recordset in unchanged] == ["904c7bb028272c846572c0e08b8cb290"]
+    assert all(operation["action"] == "delete" for operation in operations)
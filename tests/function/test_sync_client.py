@@ -0,0 +1,80 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from aiohttp import web
+
+from feihua.exceptions import ClientError
+from feihua.fake_server import add_recordset, make_app
+from feihua.sync_client import SyncClient
+
+ZONE_ID = "2c9eb155587194ec01587224c9f90149"
+ZONE_NAME = "example.com."
+
+
+@pytest.fixture
+def server():
+    """The stand-in server running in its own thread and event loop."""
+    app = make_app(credentials={"key": "secret"}, zones={ZONE_ID: ZONE_NAME})
+    for index in range(15):
+        add_recordset(app, ZONE_ID, {"name": f"host-{index}.{ZONE_NAME}", "type": "A", "records": ["192.0.2.1"]})
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", 0).start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield runner.addresses[0][1]
+    asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def _sync_client(port, **kwargs):
+    return SyncClient("key", "secret", host="127.0.0.1", port=port, scheme="http", **kwargs)
+
+
+def test_sync_client_methods(server):
+    with _sync_client(server) as client:
+        created, status = client.recordsets.create_record(
+            ZONE_ID, {"name": f"www.{ZONE_NAME}", "type": "A", "records": ["192.0.2.2"]}
+        )
+        assert status == 202
+        response, _ = client.recordsets.find_records(ZONE_ID, {"name": "www"})
+        assert [recordset.id for recordset in response["recordsets"]] == [created.id]
+
+        names = [recordset.name for recordset in client.recordsets.iter(ZONE_ID, page_size=4)]
+        assert len(names) == 16
+
+        with pytest.raises(ClientError) as e:
+            client.recordsets.delete_record(ZONE_ID, "missing")
+        assert e.value.status == 404
+
+
+def test_sync_client_iterator_closed_early(server):
+    with _sync_client(server) as client:
+        iterator = client.recordsets.iter(ZONE_ID, page_size=2)
+        assert next(iterator).name == f"host-0.{ZONE_NAME}"
+        iterator.close()
+        response, _ = client.recordsets.list(ZONE_ID)
+        assert len(response["recordsets"]) == 15
+
+
+def test_sync_client_threads_share_session(server):
+    with _sync_client(server) as client:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: client.recordsets.list(ZONE_ID), range(32)))
+        assert all(status == 200 for _, status in results)
+        stats = client.pool_stats()
+        assert stats["in_use"] == 0
+        assert 1 <= stats["idle"] <= 8
+
+
+def test_sync_client_close():
+    client = _sync_client(1)
+    client.close()
+    client.close()
+    with pytest.raises(RuntimeError):
+        client.recordsets.list(ZONE_ID)
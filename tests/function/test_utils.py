@@ -1,6 +1,8 @@
+import json
+
 import pytest
 
-from feihua.utils import parse_content_type
+from feihua.utils import parse_content_type, parse_result
 
 
 @pytest.mark.parametrize(
@@ -23,3 +25,29 @@ def test_parse_content_type(content_type, main_type, sub_type, option, error):
         assert mt == main_type
         assert st == sub_type
         assert opts == option
+
+
+class MockResponse:
+    def __init__(self, body, headers):
+        self._body = body
+        self.headers = headers
+
+    async def json(self, **kwargs):
+        return json.loads(self._body)
+
+    async def read(self):
+        return self._body
+
+
+@pytest.mark.parametrize(
+    "body, loads, expected",
+    [
+        (b'{"a": [1, 2]}', None, {"a": [1, 2]}),
+        (b'{"a": [1, 2]}', json.loads, {"a": [1, 2]}),
+        (b"  ", json.loads, None),
+    ],
+)
+@pytest.mark.asyncio
+async def test_parse_result_json(body, loads, expected):
+    response = MockResponse(body, headers={"content-type": "application/json; charset=utf-8"})
+    assert await parse_result(response, loads=loads) == expected
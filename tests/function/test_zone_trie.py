@@ -0,0 +1,58 @@
+import pytest
+
+from feihua.zone import Zone, ZoneTrie
+
+
+@pytest.fixture
+def trie():
+    return ZoneTrie(
+        [
+            Zone(id="1", name="example.com."),
+            Zone(id="2", name="b.example.com."),
+            Zone(id="3", name="example.org."),
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    "fqdn, zone_id",
+    [
+        ("example.com.", "1"),
+        ("www.example.com.", "1"),
+        ("a.b.c.example.com.", "1"),
+        ("a.b.example.com.", "2"),
+        ("B.Example.COM", "2"),
+        ("example.org", "3"),
+        ("com.", None),
+        ("example.net.", None),
+        ("notexample.com.", None),
+    ],
+)
+def test_zone_trie_match(trie, fqdn, zone_id):
+    zone = trie.match(fqdn)
+    assert (zone and zone.id) == zone_id
+
+
+def test_zone_trie_incremental_updates(trie):
+    assert len(trie) == 3
+    assert "b.example.com." in trie
+    assert "com." not in trie
+
+    assert trie.remove("b.example.com.").id == "2"
+    assert trie.match("a.b.example.com.").id == "1"
+    assert trie.remove("b.example.com.") is None
+    assert trie.remove("example.com.").id == "1"
+    assert trie.match("a.b.example.com.") is None
+    # the empty branches are pruned
+    assert "com" not in trie._root.children
+    assert len(trie) == 1
+
+    trie.add(Zone(id="4", name="Example.com"))
+    trie.add(Zone(id="5", name="example.com."))
+    assert len(trie) == 2
+    assert trie.get("example.com.").id == "5"
+    assert sorted(zone.id for zone in trie) == ["3", "5"]
+
+    trie.clear()
+    assert len(trie) == 0
+    assert trie.match("example.org.") is None
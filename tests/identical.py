@@ -1,7 +1,11 @@
-from feihua.recordset import Recordset
+from feihua.recordset import Recordset, RecordsetList
 
 
 def identical(d1, d2):
+    if isinstance(d1, RecordsetList):
+        d1 = list(d1)
+    if isinstance(d2, RecordsetList):
+        d2 = list(d2)
     if isinstance(d1, Recordset):
         d1 = d1.to_dict()
     if isinstance(d2, Recordset):